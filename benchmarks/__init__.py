@@ -0,0 +1,6 @@
+"""Benchmarks for the civic_digital_twins package.
+
+Each module is a script that can be run using `python -m benchmarks.<name>`.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
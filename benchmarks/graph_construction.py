@@ -0,0 +1,70 @@
+"""Benchmark building large computation graphs.
+
+Run from the repository root using:
+
+    python -m benchmarks.graph_construction
+
+We build graphs similar to the ones generated for models with many zones
+(i.e., sums of products of placeholders and constants), measuring the number
+of nodes we create per second and the memory allocated per node.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import gc
+import time
+import tracemalloc
+
+from civic_digital_twins.dt_model.engine.frontend import graph
+
+_ZONES = 100_000
+"""Number of terms of the generated sum, each one creating several nodes."""
+
+
+def _build(zones: int) -> graph.Node:
+    presence = graph.placeholder("presence")
+    total: graph.Node = graph.constant(0.0)
+    for zone in range(zones):
+        factor = graph.placeholder(f"factor_{zone}")
+        total = total + graph.where(presence > float(zone), presence * factor, graph.constant(0.0))
+    return total
+
+
+def _count(zones: int) -> int:
+    """Return the number of nodes created by _build."""
+    # constants, placeholder and sum, plus, for each zone, the placeholder,
+    # the comparison and its constant, the product, the where and its
+    # constant, and the addition
+    return 2 + zones * 7
+
+
+def main() -> None:
+    """Run the benchmark."""
+    nodes = _count(_ZONES)
+
+    # Note: we disable the garbage collector, which otherwise dominates
+    # the time and makes the measurement noisy
+    gc.collect()
+    gc.disable()
+    try:
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            root = _build(_ZONES)
+            best = min(best, time.perf_counter() - start)
+            del root
+    finally:
+        gc.enable()
+    print(f"{nodes / best:12,.0f} nodes/s")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    root = _build(_ZONES)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{(after - before) / nodes:12.1f} bytes/node (including names and scalars)")
+    del root
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark serializing and deserializing computation graphs.
+
+Run from the repository root using:
+
+    python -m benchmarks.graph_serialization
+
+We compare building the graph of the Molveno model (i.e., importing and
+executing the model code) and building a generated graph with many zones
+against decoding the same graphs using `serialize.loads`, printing the
+encoded size and the time per node.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import gc
+import importlib
+import sys
+import timeit
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, serialize
+
+_ZONES = 20_000
+"""Number of terms of the generated sum, each one creating several nodes."""
+
+_MODEL = "civic_digital_twins.dt_model.reference_models.molveno.overtourism"
+"""Module whose import builds the Molveno model."""
+
+
+def _build(zones: int) -> graph.Node:
+    presence = graph.placeholder("presence")
+    total: graph.Node = graph.constant(0.0)
+    for zone in range(zones):
+        factor = graph.placeholder(f"factor_{zone}")
+        total = total + graph.where(presence > float(zone), presence * factor, graph.constant(0.0))
+    return total
+
+
+def _import_model() -> list[graph.Node]:
+    # Note: we drop the model modules so that each import executes them again
+    for name in [name for name in sys.modules if name.startswith(_MODEL.rsplit(".", 1)[0])]:
+        del sys.modules[name]
+    from civic_digital_twins.dt_model.simulation import plan
+
+    return list(plan.outputs(importlib.import_module(_MODEL).M_Base))
+
+
+def _report(label: str, build, roots: list[graph.Node]) -> None:
+    data = serialize.dumps(*roots)
+    nodes = len(linearize.forest(*roots))
+    built = min(timeit.repeat(build, number=1, repeat=3))
+    dumped = min(timeit.repeat(lambda: serialize.dumps(*roots), number=1, repeat=3))
+    loaded = min(timeit.repeat(lambda: serialize.loads(data), number=1, repeat=3))
+    print(
+        f"{label:8s} {nodes:>8d} nodes {len(data):>10,d} bytes  build {built * 1e3:8.1f} ms  "
+        f"dumps {dumped * 1e3:8.1f} ms  loads {loaded * 1e3:8.1f} ms  speedup: {built / loaded:.1f}x"
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    # Note: we disable the garbage collector, which otherwise dominates
+    # the time and makes the measurement noisy
+    gc.collect()
+    gc.disable()
+    try:
+        _report("molveno", _import_model, _import_model())
+        _report("zones", lambda: _build(_ZONES), [_build(_ZONES)])
+    finally:
+        gc.enable()
+
+
+if __name__ == "__main__":
+    main()
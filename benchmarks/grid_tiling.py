@@ -0,0 +1,47 @@
+"""Benchmark evaluating fine presence grids by tiles using multiple processes.
+
+Run from the repository root using:
+
+    python -m benchmarks.grid_tiling
+
+We evaluate the Molveno model over a 301x301 grid with the full ensemble
+using a single process and using the tiling mode of `Evaluation` (see the
+`simulation.tiling` module) with an increasing number of processes, and we
+check that the fields are identical. Speedups depend on the number of
+available cores, and each evaluation includes starting the processes.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    grid = {PV_tourists: np.linspace(0, 10000, 301), PV_excursionists: np.linspace(0, 10000, 301)}
+    print(f"available cores: {os.cpu_count()}")
+    reference = None
+    for processes in (1, 2, 4, 8):
+        np.random.seed(0)
+        evaluation = Evaluation(model, ensemble, processes=processes)
+        start = time.perf_counter()
+        field = evaluation.evaluate_grid(grid)
+        elapsed = time.perf_counter() - start
+        reference = field if reference is None else reference
+        print(f"processes {processes}: {elapsed * 1e3:8.1f} ms  identical: {np.array_equal(field, reference)}")
+
+
+if __name__ == "__main__":
+    main()
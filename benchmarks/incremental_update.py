@@ -0,0 +1,60 @@
+"""Benchmark updating a presence grid after changing a single index.
+
+Run from the repository root using:
+
+    python -m benchmarks.incremental_update
+
+We evaluate the Molveno model over a 201x201 grid and then change either
+the parking capacity distribution or the tourists beach rotation factor,
+comparing a full `evaluate_grid` call with an `update_grid` call, which only
+re-evaluates the nodes and the field elements depending on the change.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+
+import numpy as np
+from scipy import stats
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    I_C_parking,
+    I_Xo_tourists_beach,
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+_REPEAT = 5
+"""Number of times we repeat each measurement."""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    values = {I_C_parking.name: stats.uniform(loc=350.0, scale=100.0), I_Xo_tourists_beach.name: 2.0}
+    model = InstantiatedModel(M_Base, values=values)
+    evaluation = Evaluation(model, list(Ensemble(model, {})))
+    grid = {PV_tourists: np.linspace(0, 10000, 201), PV_excursionists: np.linspace(0, 10000, 201)}
+    evaluation.evaluate_grid(grid)
+
+    start = time.perf_counter()
+    for _ in range(_REPEAT):
+        evaluation.evaluate_grid(grid)
+    full = (time.perf_counter() - start) / _REPEAT
+    print(f"{'evaluate_grid':<48} {full * 1e3:8.1f} ms")
+
+    for index, new_values in (
+        (I_C_parking, [stats.uniform(loc=300.0 + i, scale=100.0) for i in range(_REPEAT)]),
+        (I_Xo_tourists_beach, [1.5 + 0.1 * i for i in range(_REPEAT)]),
+    ):
+        start = time.perf_counter()
+        for value in new_values:
+            values[index.name] = value
+            evaluation.update_grid(index)
+        elapsed = (time.perf_counter() - start) / _REPEAT
+        print(f"{f'update_grid({index.name})':<48} {elapsed * 1e3:8.1f} ms  speedup: {full / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark sampling the distribution indexes.
+
+Run from the repository root using:
+
+    python -m benchmarks.index_sampling
+
+We compare sampling the uniform, lognorm and triang distributions using the
+SciPy `rvs` method against `symbols.index.sample`, for the small ensembles
+typical of interactive evaluations and for larger ones, and we measure the
+cost of changing the parameters of a distribution index.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import timeit
+
+from scipy import stats
+
+from civic_digital_twins.dt_model import LognormDistIndex
+from civic_digital_twins.dt_model.symbols.index import sample
+
+_DISTRIBUTIONS = {
+    "uniform": stats.uniform(loc=350.0, scale=100.0),
+    "lognorm": stats.lognorm(s=0.125, loc=0.0, scale=5000.0),
+    "triang": stats.triang(c=0.5, loc=0.8, scale=0.4),
+}
+
+
+def _best(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    """Run the benchmark."""
+    for name, distribution in _DISTRIBUTIONS.items():
+        for size in (20, 10_000):
+            scipy = _best(lambda: distribution.rvs(size=size), 200)
+            native = _best(lambda: sample(distribution, size), 200)
+            print(
+                f"{name:8s} size {size:>6d}  scipy {scipy * 1e6:8.1f} us  "
+                f"native {native * 1e6:8.1f} us  speedup: {scipy / native:.1f}x"
+            )
+
+    index = LognormDistIndex("capacity", loc=0.0, scale=5000.0, s=0.125)
+
+    def _update() -> None:
+        index.loc, index.scale, index.s = 1.0, 4000.0, 0.25
+        index.loc, index.scale, index.s = 0.0, 5000.0, 0.125
+        sample(index.value, 20)
+
+    print(f"update three parameters and sample: {_best(_update, 200) / 2 * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark the peak memory usage of the lean evaluation mode.
+
+Run from the repository root using:
+
+    python -m benchmarks.lean_memory
+
+We evaluate the Molveno model over a 101x101 grid with a large ensemble,
+using the default mode and the lean mode, with and without graph
+simplification (which already removes some intermediates). Since the peak
+resident set size (RSS) can only grow, each measurement runs in a fresh
+interpreter and we report the peak RSS increase caused by evaluating.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import resource
+import subprocess
+import sys
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+_REPEAT = 5
+"""Number of times we replicate the ensemble members."""
+
+
+def _peak_rss_mib() -> float:
+    # Note: on Linux ru_maxrss is in KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(lean: bool, optimize: bool) -> None:
+    """Evaluate the model and print the peak RSS increase in MiB."""
+    model = InstantiatedModel(M_Base)
+    # Replicate the full ensemble to make the ensemble axis large
+    members = list(Ensemble(model, {}))
+    ensemble = [(weight / _REPEAT, situation) for weight, situation in members] * _REPEAT
+    grid = {PV_tourists: np.linspace(0, 10000, 101), PV_excursionists: np.linspace(0, 10000, 101)}
+    evaluation = Evaluation(model, ensemble, optimize=optimize, lean=lean)
+    before = _peak_rss_mib()
+    evaluation.evaluate_grid(grid)
+    print(f"{_peak_rss_mib() - before:.1f}")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    for optimize in ("optimize", "no-optimize"):
+        for mode in ("default", "lean"):
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.lean_memory", mode, optimize],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            print(f"{optimize:<12} {mode:<8} peak RSS increase: {result.stdout.strip()} MiB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        measure(sys.argv[1] == "lean", sys.argv[2] == "optimize")
+    else:
+        main()
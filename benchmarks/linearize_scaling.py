@@ -0,0 +1,49 @@
+"""Benchmark linearizing very deep and very wide graphs.
+
+Run from the repository root using:
+
+    python -m benchmarks.linearize_scaling
+
+We linearize graphs with up to 10^6 nodes shaped either as a chain of
+additions (deep, as in the sum over many zones) or as many independent
+expressions passed as separate leaves (wide), printing the time per node.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+
+_SIZES = (10**3, 10**4, 10**5, 10**6)
+"""Approximate number of nodes of each graph."""
+
+
+def _deep(size: int) -> list[graph.Node]:
+    total: graph.Node = graph.placeholder("x")
+    term = graph.constant(1.0)
+    for _ in range(size - 2):
+        total = total + term
+    return [total]
+
+
+def _wide(size: int) -> list[graph.Node]:
+    x = graph.placeholder("x")
+    return [graph.exp(x) for _ in range(size - 1)]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    for shape, build in (("deep", _deep), ("wide", _wide)):
+        for size in _SIZES:
+            leaves = build(size)
+            start = time.perf_counter()
+            plan = linearize.forest(*leaves)
+            elapsed = time.perf_counter() - start
+            assert len(plan) == size
+            print(f"{shape} {size:>8d} nodes {elapsed * 1e3:10.1f} ms {elapsed / size * 1e9:8.0f} ns/node")
+            del leaves, plan
+
+
+if __name__ == "__main__":
+    main()
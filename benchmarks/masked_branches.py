@@ -0,0 +1,66 @@
+"""Benchmark evaluating the branches of conditional nodes lazily.
+
+Run from the repository root using:
+
+    python -m benchmarks.masked_branches
+
+We evaluate a piecewise function over a 1000x1000 grid, whose clauses
+compute expensive expressions, varying the fraction of the elements each
+clause selects, first binding each node using `executor.bind` and then
+scheduling the conditional nodes using `lazy.schedule`.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import timeit
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor, lazy
+
+_SIZE = 1000
+"""Number of rows and columns of the grid."""
+
+
+def _model(x: graph.Node, y: graph.Node, threshold: float) -> graph.Node:
+    expensive = graph.exp(graph.log(x + 1.0) * y) / (graph.power(x, y) + 1.0)
+    other = graph.log(graph.exp(y) + x * x)
+    return graph.multi_clause_where(
+        [(x < threshold, expensive), (x > 1.0 - threshold, other)],
+        graph.constant(0.0),
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    rng = np.random.default_rng(0)
+    values: dict[graph.Node, np.ndarray] = {
+        x: rng.uniform(size=(_SIZE, _SIZE)),
+        y: rng.uniform(size=(1, _SIZE)),
+    }
+    for threshold in (0.0, 0.01, 0.1, 0.3, 0.5):
+        z = _model(x, y, threshold)
+        plan = linearize.forest(z)
+        steps = [executor.bind(node) for node in plan]
+        schedule = lazy.schedule(plan, keep=[z])
+
+        def _run(steps) -> np.ndarray:
+            state = executor.State(dict(values))
+            for step in steps:
+                step(state)
+            return state.values[z]
+
+        assert np.array_equal(_run(steps), _run(schedule.steps))
+        eager = min(timeit.repeat(lambda: _run(steps), number=1, repeat=5))
+        masked = min(timeit.repeat(lambda: _run(schedule.steps), number=1, repeat=5))
+        print(
+            f"selected {2 * threshold:4.0%}  eager {eager * 1e3:8.1f} ms  "
+            f"masked {masked * 1e3:8.1f} ms  speedup: {eager / masked:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
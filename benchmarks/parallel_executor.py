@@ -0,0 +1,41 @@
+"""Benchmark evaluating the Molveno model using multiple threads.
+
+Run from the repository root using:
+
+    python -m benchmarks.parallel_executor
+
+We evaluate the Molveno model over a 101x101 grid with the full ensemble,
+using the sequential executor and the thread-pool executor (see the
+`engine.numpybackend.parallel` module) with an increasing number of workers.
+Speedups depend on the number of available cores.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import timeit
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    grid = {PV_tourists: np.linspace(0, 10000, 101), PV_excursionists: np.linspace(0, 10000, 101)}
+    print(f"available cores: {os.cpu_count()}")
+    for workers in (1, 2, 4, 8):
+        evaluation = Evaluation(model, ensemble, workers=workers)
+        seconds = min(timeit.repeat(lambda: evaluation.evaluate_grid(grid), number=1, repeat=5))
+        print(f"workers {workers}: {seconds * 1e3:8.1f} ms/evaluate_grid")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark the per-call overhead removed by caching the execution plan.
+
+Run from the repository root using:
+
+    python -m benchmarks.plan_cache
+
+We compare rebuilding the plan on every call (what `Evaluation` used to
+do) with fetching the cached plan, and we measure the end-to-end time of
+`Evaluation.evaluate_grid` on a small grid, where the overhead matters.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import timeit
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.internal.sympyke import Symbol
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    CV_season,
+    CV_weather,
+    CV_weekday,
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+from civic_digital_twins.dt_model.simulation import plan
+
+
+def _report(label: str, seconds: float, number: int) -> None:
+    print(f"{label:<40} {seconds / number * 1e6:10.1f} us/call")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    number = 2000
+    _report("plan.build (uncached)", timeit.timeit(lambda: plan.build(M_Base), number=number), number)
+    _report("plan.get (cached)", timeit.timeit(lambda: plan.get(M_Base), number=number), number)
+
+    situation = {CV_weekday: Symbol("monday"), CV_season: Symbol("high"), CV_weather: Symbol("good")}
+    evaluation = Evaluation(InstantiatedModel(M_Base), [(1.0, situation)])
+    grid = {PV_tourists: np.linspace(0, 10000, 11), PV_excursionists: np.linspace(0, 10000, 11)}
+    number = 200
+    _report(
+        "evaluate_grid (11x11, 1 member)", timeit.timeit(lambda: evaluation.evaluate_grid(grid), number=number), number
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Report the accuracy and speed of the precision policies on the Molveno model.
+
+Run from the repository root using:
+
+    python -m benchmarks.precision_accuracy
+
+We evaluate the Molveno model over a 101x101 grid using the float64, mixed and
+float32 policies (see `engine.numpybackend.precision`), seeding the random
+number generator identically such that all runs use the same samples. We
+compare the sustainability field, the sustainable area and the sustainability
+indexes against the default float64 evaluation.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.numpybackend import precision
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+_SEED = 4
+"""Seed for the random number generator."""
+
+
+def _evaluate(policy: precision.Policy | None) -> tuple[Evaluation, float]:
+    np.random.seed(_SEED)
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {})), precision=policy)
+    grid = {PV_tourists: np.linspace(0, 10000, 101), PV_excursionists: np.linspace(0, 10000, 101)}
+    start = time.perf_counter()
+    evaluation.evaluate_grid(grid)
+    return evaluation, time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark."""
+    presences = [
+        (tourists, excursionists) for tourists in range(0, 10001, 500) for excursionists in range(0, 10001, 500)
+    ]
+    reference, elapsed = _evaluate(None)
+    assert reference.field is not None and reference.field_elements is not None
+    area = reference.compute_sustainable_area()
+    index = reference.compute_sustainability_index(presences)
+    indexes = reference.compute_sustainability_index_per_constraint(presences)
+    print(f"{'default':<8} {elapsed * 1e3:8.1f} ms  area {area:.6e}  index {index:.6f}")
+
+    for label, policy in (("float64", precision.FLOAT64), ("mixed", precision.MIXED), ("float32", precision.FLOAT32)):
+        evaluation, elapsed = _evaluate(policy)
+        assert evaluation.field is not None and evaluation.field_elements is not None
+        field_error = np.abs(evaluation.field - reference.field).max()
+        element_error = max(
+            np.abs(evaluation.field_elements[c] - reference.field_elements[c]).max() for c in reference.field_elements
+        )
+        area_error = abs(evaluation.compute_sustainable_area() - area) / area
+        index_error = abs(evaluation.compute_sustainability_index(presences) - index)
+        got = evaluation.compute_sustainability_index_per_constraint(presences)
+        indexes_error = max(abs(got[c] - indexes[c]) for c in indexes)
+        print(
+            f"{label:<8} {elapsed * 1e3:8.1f} ms  max field error {field_error:.2e}  "
+            f"max field element error {element_error:.2e}  relative area error {area_error:.2e}  "
+            f"index error {index_error:.2e}  max constraint index error {indexes_error:.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
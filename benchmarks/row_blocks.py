@@ -0,0 +1,46 @@
+"""Benchmark splitting large elementwise operations into row blocks.
+
+Run from the repository root using:
+
+    python -m benchmarks.row_blocks
+
+We evaluate the Molveno model over a 101x101 grid with a replicated ensemble,
+without and with a `blocks.Splitter` using an increasing number of threads.
+Speedups depend on the number of available cores.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import timeit
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.numpybackend import blocks
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+_REPEAT = 5
+"""Number of times we replicate the ensemble members."""
+
+
+def main() -> None:
+    """Run the benchmark."""
+    model = InstantiatedModel(M_Base)
+    members = list(Ensemble(model, {}))
+    ensemble = [(weight / _REPEAT, situation) for weight, situation in members] * _REPEAT
+    grid = {PV_tourists: np.linspace(0, 10000, 101), PV_excursionists: np.linspace(0, 10000, 101)}
+    print(f"available cores: {os.cpu_count()}")
+    for workers in (None, 2, 4, 8):
+        splitter = blocks.Splitter(workers=workers) if workers is not None else None
+        evaluation = Evaluation(model, ensemble, blocks=splitter)
+        seconds = min(timeit.repeat(lambda: evaluation.evaluate_grid(grid), number=1, repeat=3))
+        print(f"{'no splitter' if workers is None else f'{workers} threads':<12} {seconds * 1e3:8.1f} ms/evaluate_grid")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark the executor dispatch overhead on scalar-sized graphs.
+
+Run from the repository root using:
+
+    python -m benchmarks.scalar_dispatch
+
+We build a graph with thousands of small nodes operating on scalars, where
+the NumPy work is negligible, and we compare evaluating each node using
+`executor.evaluate`, invoking the callables returned by `executor.bind`,
+and calling the function generated by `codegenbackend.compiler`.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import timeit
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.codegenbackend import compiler
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor
+
+
+def _build(chains: int, depth: int) -> tuple[graph.placeholder, list[graph.Node]]:
+    # Note: we use many short chains because `linearize.forest` is recursive
+    x = graph.placeholder("x")
+    leaves: list[graph.Node] = []
+    for chain in range(chains):
+        node: graph.Node = x + float(chain)
+        for index in range(depth):
+            match index % 4:
+                case 0:
+                    node = node * 1.0001
+                case 1:
+                    node = graph.exp(node * 0.001)
+                case 2:
+                    node = graph.maximum(node, x) - 0.5
+                case _:
+                    node = graph.log(node + 1.0)
+        node = graph.where(node > 0.5, node, x)
+        node = graph.project_using_sum(graph.expand_dims(node, axis=0), axis=0)
+        leaves.append(node)
+    return x, leaves
+
+
+def main() -> None:
+    """Run the benchmark."""
+    x, leaves = _build(chains=200, depth=20)
+    plan = linearize.forest(*leaves)
+    steps = [executor.bind(node) for node in plan]
+    program = compiler.compile(plan, outputs=leaves)
+    value = np.asarray(0.25)
+
+    def run_evaluate() -> None:
+        state = executor.State({x: value})
+        for node in plan:
+            executor.evaluate(state, node)
+
+    def run_bound() -> None:
+        state = executor.State({x: value})
+        for step in steps:
+            step(state)
+
+    def run_compiled() -> None:
+        program.function(value)
+
+    number = 20
+    results = {run_evaluate: [], run_bound: [], run_compiled: []}
+    for _ in range(30):
+        # Note: we interleave the measurements to reduce the impact of noise
+        for func, seconds in results.items():
+            seconds.append(timeit.timeit(func, number=number) / number)
+    print(f"nodes: {len(plan)}")
+    for label, func in (
+        ("executor.evaluate", run_evaluate),
+        ("executor.bind steps", run_bound),
+        ("codegenbackend", run_compiled),
+    ):
+        best = min(results[func])
+        print(f"{label:<22} {best * 1e3:8.2f} ms/graph  {best / len(plan) * 1e9:8.0f} ns/node")
+
+
+if __name__ == "__main__":
+    main()
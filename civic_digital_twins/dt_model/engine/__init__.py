@@ -2,6 +2,8 @@
 
 Modules:
     frontend: Graph construction and manipulation frontend.
+    numpybackend: Interpreter evaluating graphs using NumPy.
+    codegenbackend: Compiler translating graphs into Python functions.
 """
 
 # SPDX-License-Identifier: Apache-2.0
@@ -1,9 +1,12 @@
 """The atomic module provides thread-safe atomic operations for integer values.
 
-It implements an atomic integer counter class similar to Go's atomic.Int64.
+It implements an atomic integer counter class similar to Go's atomic.Int64,
+and a lock-free counter for allocating unique identifiers.
 """
 
+import itertools
 import threading
+from typing import Callable
 
 
 class Int:
@@ -45,3 +48,26 @@ class Int:
         """
         with self.__lock:
             return self.__value
+
+
+class Counter:
+    """
+    A thread-safe, lock-free counter allocating increasing integers.
+
+    Unlike `Int`, this class does not take a lock. It relies on
+    `itertools.count`, whose `__next__` method is implemented in C and
+    therefore executes atomically while holding the GIL. Use it on hot
+    paths that only need unique values (e.g., allocating node IDs).
+
+    Args:
+        start: The first value to return.
+
+    Attributes
+    ----------
+        next: Return the next value.
+    """
+
+    __slots__ = ("next",)
+
+    def __init__(self, start: int = 0) -> None:
+        self.next: Callable[[], int] = itertools.count(start).__next__
@@ -0,0 +1,45 @@
+"""Provide a code-generating backend for evaluating computation graphs.
+
+Like the NumPy backend, this package evaluates linearized computation graphs
+using NumPy. However, rather than interpreting the plan node by node, it
+emits straight-line Python source code with one local variable per node and
+compiles such code once into a Python function. Evaluating the resulting
+function avoids the dictionary lookups, flag checks and type dispatch
+that the interpreter performs for each node.
+
+Key Components
+--------------
+
+- compiler: Contains the `compile` function that translates a plan into a
+  `Program` and the `Program` class wrapping the generated function.
+
+Usage Example:
+-------------
+```python
+from civic_digital_twins.dt_model.engine.codegenbackend import compiler
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+
+import numpy as np
+
+# Create a graph
+x = graph.placeholder("x")
+y = graph.placeholder("y")
+z = graph.add(x, y)
+
+# Compile the linearized graph
+program = compiler.compile(linearize.forest(z), outputs=[z])
+
+# Execute the program
+result = program({x: np.array(2), y: np.array(3)})[z]  # array(5)
+```
+
+Implementation Details
+----------------------
+
+The generated code calls the same functions listed in the NumPy backend
+dispatch tables, in the same order, so the results are the same values
+the NumPy backend executor would compute. The generated source only depends
+on the structure of the plan, so callers can inspect, log, or cache it.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
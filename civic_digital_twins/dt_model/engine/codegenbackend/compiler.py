@@ -0,0 +1,278 @@
+"""Compile linearized computation graphs into Python functions.
+
+Given a plan produced by `frontend.linearize.forest`, the `compile` function
+emits the source code of a function taking the placeholder values as
+arguments and returning the values of the output nodes. For example:
+
+    >>> from civic_digital_twins.dt_model.engine.codegenbackend import compiler
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+    >>> x = graph.placeholder("x")
+    >>> y = graph.exp(x * 2.0)
+    >>> print(compiler.compile(linearize.forest(y), outputs=[y]).source)
+    def program(n0):
+        n1 = asarray(k1)
+        n2 = f_multiply(n0, n1)
+        del n0, n1
+        n3 = f_exp(n2)
+        del n2
+        return (n3,)
+
+Each node becomes a local variable named after its position in the plan,
+so the same plan structure always produces the same source. Constant
+values, dispatch functions and flagged nodes are passed to the generated
+code through its global namespace. We delete each local variable as soon
+as no later statement needs it, such that large intermediate arrays do not
+outlive their last use.
+
+Nodes carrying debug flags (or all nodes, when compiling with flags) get
+tracing and breakpoint statements equivalent to the ones the NumPy backend
+executor performs at runtime.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import builtins
+import itertools
+import linecache
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Sequence, cast
+
+import numpy as np
+
+from ..frontend import graph, liveness, rewrite
+from ..numpybackend import debug, dispatch, executor
+
+
+@dataclass(frozen=True)
+class Program:
+    """
+    A compiled computation graph.
+
+    Attributes
+    ----------
+        source: The generated Python source code.
+        inputs: The nodes whose values the function takes, in order.
+        outputs: The nodes whose values the function returns, in order.
+        function: The compiled function.
+    """
+
+    source: str
+    inputs: tuple[graph.Node, ...]
+    outputs: tuple[graph.Node, ...]
+    function: Callable[..., tuple[np.ndarray, ...]]
+
+    def __call__(self, values: Mapping[graph.Node, np.ndarray]) -> dict[graph.Node, np.ndarray]:
+        """Evaluate the program.
+
+        Args:
+            values: The values of the input nodes. Placeholders without
+                a value use their default value.
+
+        Returns
+        -------
+            A dictionary mapping each output node to its value.
+
+        Raises
+        ------
+            executor.PlaceholderValueNotProvided: If a placeholder has
+                no value and no default value.
+            executor.NodeValueNotFound: If another input node has no value.
+        """
+        args = [_input_value(node, values) for node in self.inputs]
+        return dict(zip(self.outputs, self.function(*args)))
+
+
+def compile(
+    plan: Sequence[graph.Node],
+    outputs: Iterable[graph.Node] | None = None,
+    inputs: Iterable[graph.Node] | None = None,
+    flags: int = 0,
+) -> Program:
+    """Compile a linearized plan into a program.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        outputs: The nodes whose values the program returns. By default,
+            we return the values of the nodes no other node depends on.
+        inputs: The nodes whose values the program takes as arguments rather
+            than computing them, which allows overriding the value of any
+            node (like the executor state does). By default, the placeholders.
+        flags: Debug flags applying to all nodes (e.g., graph.NODE_FLAG_TRACE).
+
+    Returns
+    -------
+        The compiled program.
+
+    Raises
+    ------
+        ValueError: If an output or input node is not part of the plan.
+        executor.UnsupportedNodeType: If a node type is not supported.
+        executor.UnsupportedOperation: If a specific operation is not supported.
+    """
+    names = {node: f"n{index}" for index, node in enumerate(plan)}
+    if outputs is None:
+        consumed = {dep for node in plan for dep in rewrite.inputs(node)}
+        outputs = [node for node in plan if node not in consumed]
+    outputs = tuple(outputs)
+    if inputs is None:
+        inputs = [node for node in plan if isinstance(node, graph.placeholder)]
+    arguments = set(inputs)
+    for node in itertools.chain(outputs, arguments):
+        if node not in names:
+            raise ValueError(f"codegenbackend: node '{node.name}' is not part of the plan")
+
+    emitter = _Emitter()
+    body: list[str] = []
+    for node, dead in zip(plan, liveness.releases(plan, keep=outputs)):
+        name = names[node]
+        if node in arguments:
+            if flags & graph.NODE_FLAG_TRACE != 0:
+                body.append(f"print_graph_node({emitter.node(node)})")
+                body.append(f"print_evaluated_node({name}, cached=True)")
+        else:
+            body.extend(_statements(emitter, node, name, names, node.flags | flags))
+        if dead:
+            body.append("del " + ", ".join(names[item] for item in dead))
+
+    returned = "".join(f"{names[node]}, " for node in outputs).rstrip(" ")
+    ordered = tuple(node for node in plan if node in arguments)
+    lines = [f"def program({', '.join(names[node] for node in ordered)}):"]
+    lines.extend(f"    {statement}" for statement in body)
+    lines.append(f"    return ({returned})")
+    source = "\n".join(lines) + "\n"
+
+    # Register the source with linecache, such that tracebacks show the generated
+    # code, and drop it when the function is collected (linecache never evicts
+    # entries without a modification time)
+    filename = f"<codegenbackend-{next(_counter)}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(keepends=True), filename)
+    exec(builtins.compile(source, filename, "exec"), emitter.namespace)
+    function = cast(Callable[..., tuple[np.ndarray, ...]], emitter.namespace["program"])
+    weakref.finalize(function, linecache.cache.pop, filename, None)
+    return Program(source=source, inputs=ordered, outputs=outputs, function=function)
+
+
+_counter = itertools.count()
+"""Generates unique file names for the compiled sources."""
+
+
+class _Emitter:
+    """Collects the global namespace of the generated code."""
+
+    def __init__(self) -> None:
+        self.namespace: dict[str, object] = {
+            "asarray": np.asarray,
+            "print_graph_node": debug.print_graph_node,
+            "print_evaluated_node": debug.print_evaluated_node,
+        }
+        self._functions: dict[int, str] = {}
+
+    def function(self, func: Callable) -> str:
+        """Return the global name referring to the given function."""
+        name = self._functions.get(id(func))
+        if name is None:
+            base = "f_" + getattr(func, "__name__", "func").lstrip("_")
+            name = base
+            for index in itertools.count(1):
+                if name not in self.namespace:
+                    break
+                name = f"{base}_{index}"
+            self.namespace[name] = func
+            self._functions[id(func)] = name
+        return name
+
+    def value(self, name: str, value: object) -> str:
+        """Bind the value to the given global name and return the name."""
+        self.namespace[name] = value
+        return name
+
+    def node(self, node: graph.Node) -> str:
+        """Return the global name referring to the given node."""
+        return self.value(f"g{node.id}", node)
+
+
+def _statements(
+    emitter: _Emitter,
+    node: graph.Node,
+    name: str,
+    names: dict[graph.Node, str],
+    flags: int,
+) -> list[str]:
+    result: list[str] = []
+    tracing = flags & graph.NODE_FLAG_TRACE != 0
+    if tracing:
+        result.append(f"print_graph_node({emitter.node(node)})")
+
+    result.append(f"{name} = {_expression(emitter, node, name, names)}")
+
+    if tracing:
+        result.append(f"print_evaluated_node({name}, cached=False)")
+    if flags & graph.NODE_FLAG_BREAK != 0:
+        result.append('input("executor: press any key to continue...")')
+        result.append('print("")')
+    return result
+
+
+def _expression(emitter: _Emitter, node: graph.Node, name: str, names: dict[graph.Node, str]) -> str:
+    if isinstance(node, graph.constant):
+        return f"asarray({emitter.value('k' + name[1:], node.value)})"
+
+    if isinstance(node, graph.placeholder):
+        # Note: we only get here for placeholders that are not inputs
+        if node.default_value is None:
+            raise executor.PlaceholderValueNotProvided(
+                f"codegenbackend: placeholder '{node.name}' is not an input and has no default value"
+            )
+        return f"asarray({emitter.value('k' + name[1:], node.default_value)})"
+
+    if isinstance(node, graph.BinaryOp):
+        func = dispatch.binary_operations.get(type(node))
+        if func is None:
+            raise executor.UnsupportedOperation(f"codegenbackend: unsupported binary operation: {type(node)}")
+        return f"{emitter.function(func)}({names[node.left]}, {names[node.right]})"
+
+    if isinstance(node, graph.UnaryOp):
+        func = dispatch.unary_operations.get(type(node))
+        if func is None:
+            raise executor.UnsupportedOperation(f"codegenbackend: unsupported unary operation: {type(node)}")
+        return f"{emitter.function(func)}({names[node.node]})"
+
+    if isinstance(node, graph.where):
+        args = ", ".join(names[item] for item in (node.condition, node.then, node.otherwise))
+        return f"{emitter.function(np.where)}({args})"
+
+    if isinstance(node, graph.multi_clause_where):
+        conditions = "".join(f"{names[cond]}, " for cond, _ in node.clauses)
+        values = "".join(f"{names[value]}, " for _, value in node.clauses)
+        default = names[node.default_value]
+        return f"{emitter.function(np.select)}([{conditions.rstrip(', ')}], [{values.rstrip(', ')}], default={default})"
+
+    if isinstance(node, graph.take):
+        table = emitter.value("t" + name[1:], np.asarray(node.table))
+        return f'{emitter.function(np.take)}({table}, {names[node.indices]}, mode="clip")'
+
+    if isinstance(node, graph.AxisOp):
+        func = dispatch.axes_operations.get(type(node))
+        if func is None:
+            raise executor.UnsupportedOperation(f"codegenbackend: unsupported axis operation: {type(node)}")
+        axis = emitter.value("a" + name[1:], node.axis)
+        return f"{emitter.function(func)}({names[node.node]}, {axis})"
+
+    raise executor.UnsupportedNodeType(f"codegenbackend: unsupported node type: {type(node)}")
+
+
+def _input_value(node: graph.Node, values: Mapping[graph.Node, np.ndarray]) -> np.ndarray:
+    try:
+        return values[node]
+    except KeyError:
+        pass
+    if not isinstance(node, graph.placeholder):
+        raise executor.NodeValueNotFound(f"codegenbackend: no value provided for input node '{node.name}'")
+    if node.default_value is not None:
+        return np.asarray(node.default_value)
+    raise executor.PlaceholderValueNotProvided(
+        f"codegenbackend: no value provided for placeholder '{node.name}' and no default value is set"
+    )
@@ -2,6 +2,18 @@
 
 Modules:
     graph: Graph construction and manipulation.
+    linearize: Topological sorting of graphs into execution plans.
+    pretty: Formatting graphs as readable strings.
+    rewrite: Building blocks for graph optimization passes.
+    cse: Common-subexpression elimination pass.
+    simplify: Constant folding and algebraic simplification pass.
+    lookup: Compilation of categorical piecewise functions into table lookups.
+    liveness: Liveness analysis for releasing intermediate values.
+    dirty: Dirty propagation for incremental re-evaluation.
+    shapes: Static shape and dtype inference.
+    operations: Interface to the functions implementing the operations.
+    serialize: Binary serialization of graphs and linearized plans.
+    fingerprint: Stable structural hashing of graphs.
 """
 
 # SPDX-License-Identifier: Apache-2.0
@@ -0,0 +1,118 @@
+"""Common-subexpression elimination for computation graphs.
+
+Models built through operator overloading and `sympyke.Piecewise` often
+contain structurally identical subtrees (e.g., `ensure_node` creates a new
+`constant` node for each scalar, and each `Eq(cv, Symbol("bad"))` creates
+a new `equal` node). Without this pass, the executor evaluates each copy
+separately, even though they compute the same value.
+
+This module hash-conses the graph: we visit the nodes in topological order
+and we compute a structural key for each node, consisting of the node type,
+its attributes, and the identity of its (already deduplicated) inputs. The
+first node with a given key becomes the canonical node and all subsequent
+nodes with the same key are replaced by it.
+
+The pass does not merge:
+
+1. placeholders, because each placeholder is a distinct input;
+
+2. named constants (e.g., the nodes of constant indexes), because callers
+may override their values (e.g., through `InstantiatedModel` values);
+
+3. nodes with debug flags, to keep tracepoints and breakpoints intact;
+
+4. the nodes passed using `keep` (e.g., formula indexes, whose values
+callers may override), with any other node.
+
+Like other passes (see `rewrite`), this pass does not mutate the graph
+and returns a mapping from the original nodes to their replacements:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import cse, graph, linearize
+    >>> x = graph.placeholder("x")
+    >>> y = (x + 1) * (x + 1)
+    >>> mapping = cse.forest(y)
+    >>> len(linearize.forest(mapping[y]))
+    4
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import Hashable, Iterable
+
+import numpy as np
+
+from . import graph, linearize, rewrite
+
+
+def forest(*leaves: graph.Node, keep: Iterable[graph.Node] = ()) -> rewrite.Mapping:
+    """Eliminate common subexpressions from the forest rooted at the given leaves.
+
+    Args:
+        *leaves: The output nodes of the computation forest.
+        keep: Nodes that must not be merged with any other node.
+
+    Returns
+    -------
+        A mapping from each node reachable from the leaves to the canonical node
+        replacing it. Nodes that do not need replacing map to themselves.
+
+    Raises
+    ------
+        ValueError: If a cycle is detected in the graph.
+        TypeError: If an unknown node type is encountered.
+    """
+    mapping: rewrite.Mapping = {}
+    canonical: dict[Hashable, graph.Node] = {}
+    kept = set(keep)
+
+    for node in linearize.forest(*leaves):
+        new_inputs = [mapping[dep] for dep in rewrite.inputs(node)]
+        key = None if node in kept else _key(node, new_inputs)
+        if key is not None and key in canonical:
+            mapping[node] = canonical[key]
+            continue
+        replacement = rewrite.rebuild(node, new_inputs)
+        if key is not None:
+            canonical[key] = replacement
+        mapping[node] = replacement
+
+    return mapping
+
+
+def _key(node: graph.Node, inputs: list[graph.Node]) -> Hashable | None:
+    """Compute the structural key of a node, or None if it must not be merged."""
+    if node.flags != 0 or isinstance(node, graph.placeholder):
+        return None
+
+    # Note: we include the value type because, e.g., 1 == 1.0 == True
+    # and they also have the same hash, but they're different constants,
+    # and we key floats by their hex representation because 0.0 == -0.0
+    # while, e.g., 1 / 0.0 and 1 / -0.0 differ.
+    if isinstance(node, graph.constant):
+        if node.name:
+            return None
+        return (graph.constant, type(node.value), _scalar_key(node.value))
+
+    # Note: we use the object identity rather than `Node.id` because nodes
+    # unpickled in another process may share ids with locally created nodes,
+    # while the mapping keeps all the inputs alive for the whole pass
+    input_ids = tuple(id(inp) for inp in inputs)
+
+    if isinstance(node, graph.AxisOp):
+        axis = node.axis if isinstance(node.axis, int) else tuple(node.axis)
+        return (type(node), axis, input_ids)
+
+    if isinstance(node, graph.multi_clause_where):
+        return (graph.multi_clause_where, len(node.clauses), input_ids)
+
+    if isinstance(node, graph.take):
+        return (graph.take, tuple((type(value), _scalar_key(value)) for value in node.table), input_ids)
+
+    return (type(node), input_ids)
+
+
+def _scalar_key(value: graph.Scalar) -> Hashable:
+    """Return a key distinguishing the given scalar from all the other scalars of its type."""
+    return float(value).hex() if isinstance(value, (float, np.floating)) else value
@@ -0,0 +1,49 @@
+"""Dirty propagation for linearized computation graphs.
+
+When an analyst changes the value of a single placeholder (e.g., the
+distribution of a capacity index), most of the nodes computed by the
+previous evaluation still have the same value. The `propagate` function
+computes which steps of a linearized plan depend on the changed nodes, such
+that executors only need to re-evaluate such steps:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import dirty, graph, linearize
+    >>> x = graph.placeholder("x")
+    >>> y = graph.placeholder("y")
+    >>> z = graph.exp(x) + graph.log(y)
+    >>> plan = linearize.forest(z)
+    >>> [plan[index].name for index in dirty.propagate(plan, [x])]
+    ['x', '', '']
+
+Here, changing `x` requires re-evaluating `x`, `exp(x)` and the sum,
+while the value of `log(y)` is still valid.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from . import graph, rewrite
+
+
+def propagate(plan: Sequence[graph.Node], changed: Iterable[graph.Node]) -> list[int]:
+    """Compute the steps whose value depends on the changed nodes.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        changed: The nodes whose value has changed.
+
+    Returns
+    -------
+        The sorted indexes of the steps evaluating either a changed node
+        or a node depending, directly or indirectly, on a changed node.
+    """
+    # Note: we use a set because nodes override `==`
+    dirty = set(changed)
+    result: list[int] = []
+    for index, node in enumerate(plan):
+        if node in dirty or any(dep in dirty for dep in rewrite.inputs(node)):
+            dirty.add(node)
+            result.append(index)
+    return result
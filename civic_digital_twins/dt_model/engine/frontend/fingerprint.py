@@ -0,0 +1,127 @@
+"""Stable structural hashing of computation graphs.
+
+Node ids come from a process-wide counter (see `graph.Node`), so the same
+model gets different ids in different processes and runs, which makes them
+unsuitable as cache keys. This module computes a content digest for each
+node from its type, its attributes and the digests of its inputs, such
+that structurally identical graphs have the same digests regardless of
+the process that built them:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import fingerprint, graph
+    >>> x = graph.placeholder("x")
+    >>> first = fingerprint.forest(graph.exp(x) + 1)
+    >>> second = fingerprint.forest(graph.exp(x) + 1)
+    >>> list(first.values()) == list(second.values())
+    True
+
+The digest covers what determines the computed values:
+
+1. the type of each node and the digests of its inputs, in order;
+
+2. the value and type of constants (e.g., `1`, `1.0` and `True` differ);
+
+3. the name and default value of placeholders, since the name identifies
+the value the caller provides for them, except for the placeholders of
+symbols, whose default value is a code depending on the order in which
+the process interned them (see `internal.sympyke.symbol`), hence we only
+include their name (pass them to `forest` using `symbols`);
+
+4. the axis of axis operations and the table of lookups.
+
+We do not include the names of the other nodes and the debug flags,
+which do not change the computed values.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+import numpy as np
+
+from . import graph, linearize, rewrite
+
+DIGEST_SIZE = 16
+"""Size of the digests in bytes (hence, they have twice as many hex digits)."""
+
+
+def forest(*leaves: graph.Node, symbols: Iterable[graph.Node] = ()) -> dict[graph.Node, str]:
+    """Compute the digest of each node reachable from the given leaves.
+
+    Args:
+        *leaves: The output nodes of the computation forest.
+        symbols: The placeholders of symbols, which we identify by name only.
+
+    Returns
+    -------
+        A mapping from each node reachable from the leaves to its
+        digest, as a string of hex digits.
+
+    Raises
+    ------
+        ValueError: If a cycle is detected in the graph.
+        TypeError: If an unknown node type is encountered.
+    """
+    # Note: we use a set because nodes override `==`
+    named = set(symbols)
+    digests: dict[graph.Node, str] = {}
+    for node in linearize.forest(*leaves):
+        digests[node] = digest(
+            type(node).__name__,
+            *(["symbol", node.name] if node in named else _attributes(node)),
+            *(digests[dep] for dep in rewrite.inputs(node)),
+        )
+    return digests
+
+
+def digest(*parts: str | graph.Scalar | None) -> str:
+    """Compute the digest of a sequence of strings and scalars.
+
+    We encode each part along with its type, such that, e.g., `"1"`, `1`,
+    `1.0` and `True` produce different digests.
+
+    Returns
+    -------
+        The digest, as a string of hex digits.
+    """
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        encoded = _encode(part).encode("utf-8")
+        hasher.update(len(encoded).to_bytes(8, "little"))
+        hasher.update(encoded)
+    return hasher.hexdigest()
+
+
+def _attributes(node: graph.Node) -> list[str | graph.Scalar | None]:
+    if isinstance(node, graph.constant):
+        return [node.value]
+
+    if isinstance(node, graph.placeholder):
+        return [node.name, node.default_value]
+
+    if isinstance(node, graph.AxisOp):
+        return [node.axis] if isinstance(node.axis, int) else [len(node.axis), *node.axis]
+
+    if isinstance(node, graph.multi_clause_where):
+        return [len(node.clauses)]
+
+    if isinstance(node, graph.take):
+        return [len(node.table), *node.table]
+
+    return []
+
+
+def _encode(part: str | graph.Scalar | None) -> str:
+    # Note: we check for bool first since bool is a subclass of int, and we
+    # also accept NumPy scalars, which constant folding may produce
+    if part is None:
+        return "none"
+    if isinstance(part, str):
+        return f"str:{part}"
+    if isinstance(part, (bool, np.bool_)):
+        return f"bool:{bool(part)}"
+    if isinstance(part, (int, np.integer)):
+        return f"int:{int(part)}"
+    return f"float:{float(part).hex()}"
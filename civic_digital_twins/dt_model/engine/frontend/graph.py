@@ -13,8 +13,9 @@ This module provides:
 5. Mathematical operations (exp, power, log)
 6. Shape manipulation operations (expand_dims, squeeze)
 7. Reduction operations (sum, mean)
-8. Built-in debug operations (tracepoint, breakpoint)
-9. Support for infix and unary operators (e.g., `a + b`, `~a`)
+8. Lookup operations (take)
+9. Built-in debug operations (tracepoint, breakpoint)
+10. Support for infix and unary operators (e.g., `a + b`, `~a`)
 
 The nodes form a directed acyclic graph (DAG) that represents computations
 to be performed. Each node implements a specific operation and stores its
@@ -128,8 +129,8 @@ NODE_FLAG_BREAK = 1 << 1
 """Inserts a breakpoint at the corresponding graph node."""
 
 
-_id_generator = atomic.Int()
-"""Atomic integer generator for unique node IDs."""
+_next_id = atomic.Counter(start=1).next
+"""Returns the next unique node ID without taking locks (see `atomic.Counter`)."""
 
 
 def ensure_node(value: Node | Scalar) -> Node:
@@ -153,12 +154,20 @@ class Node:
         - Nodes carry flags for debugging (trace/break)
         - Names for better error reporting
         - Extensible flag system for future debug features
+
+    3. Compact Layout:
+        - Node classes declare their attributes using `__slots__`, so
+          nodes do not carry a `__dict__`, which matters for generated
+          models containing hundreds of thousands of nodes
+        - Subclasses must declare `__slots__` (possibly empty) as well
     """
 
+    __slots__ = ("name", "flags", "id")
+
     def __init__(self, name: str = "") -> None:
         self.name = name
         self.flags = 0
-        self.id = _id_generator.add(1)
+        self.id = _next_id()
 
     def __hash__(self) -> int:
         """Override hash to use identity-based hashing.
@@ -264,6 +273,8 @@ class constant(Node):
         value: The scalar value to store in this node.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value: Scalar, name: str = "") -> None:
         super().__init__(name)
         self.value = value
@@ -277,6 +288,8 @@ class placeholder(Node):
         placeholder if no type is provided at evaluation time.
     """
 
+    __slots__ = ("default_value",)
+
     def __init__(self, name: str, default_value: Scalar | None = None) -> None:
         super().__init__(name)
         self.default_value = default_value
@@ -290,6 +303,8 @@ class BinaryOp(Node):
         right: Second input node
     """
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left: Node, right: Node) -> None:
         super().__init__()
         self.left = left
@@ -302,18 +317,26 @@ class BinaryOp(Node):
 class add(BinaryOp):
     """Element-wise addition of two tensors."""
 
+    __slots__ = ()
+
 
 class subtract(BinaryOp):
     """Element-wise subtraction of two tensors."""
 
+    __slots__ = ()
+
 
 class multiply(BinaryOp):
     """Element-wise multiplication of two tensors."""
 
+    __slots__ = ()
+
 
 class divide(BinaryOp):
     """Element-wise division of two tensors."""
 
+    __slots__ = ()
+
 
 # Comparison operations
 
@@ -321,26 +344,38 @@ class divide(BinaryOp):
 class equal(BinaryOp):
     """Element-wise equality comparison of two tensors."""
 
+    __slots__ = ()
+
 
 class not_equal(BinaryOp):
     """Element-wise inequality comparison of two tensors."""
 
+    __slots__ = ()
+
 
 class less(BinaryOp):
     """Element-wise less-than comparison of two tensors."""
 
+    __slots__ = ()
+
 
 class less_equal(BinaryOp):
     """Element-wise less-than-or-equal comparison of two tensors."""
 
+    __slots__ = ()
+
 
 class greater(BinaryOp):
     """Element-wise greater-than comparison of two tensors."""
 
+    __slots__ = ()
+
 
 class greater_equal(BinaryOp):
     """Element-wise greater-than-or-equal comparison of two tensors."""
 
+    __slots__ = ()
+
 
 # Logical operations
 
@@ -348,14 +383,20 @@ class greater_equal(BinaryOp):
 class logical_and(BinaryOp):
     """Element-wise logical AND of two boolean tensors."""
 
+    __slots__ = ()
+
 
 class logical_or(BinaryOp):
     """Element-wise logical OR of two boolean tensors."""
 
+    __slots__ = ()
+
 
 class logical_xor(BinaryOp):
     """Element-wise logical XOR of two boolean tensors."""
 
+    __slots__ = ()
+
 
 class UnaryOp(Node):
     """Base class for unary operations.
@@ -364,6 +405,8 @@ class UnaryOp(Node):
         node: Input node
     """
 
+    __slots__ = ("node",)
+
     def __init__(self, node: Node) -> None:
         super().__init__()
         self.node = node
@@ -372,6 +415,8 @@ class UnaryOp(Node):
 class logical_not(UnaryOp):
     """Element-wise logical NOT of a boolean tensor."""
 
+    __slots__ = ()
+
 
 # Math operations
 
@@ -379,10 +424,14 @@ class logical_not(UnaryOp):
 class exp(UnaryOp):
     """Element-wise exponential of a tensor."""
 
+    __slots__ = ()
+
 
 class power(BinaryOp):
     """Element-wise power operation (first tensor raised to power of second)."""
 
+    __slots__ = ()
+
 
 pow = power
 """Name alias for power, for compatibility with NumPy naming."""
@@ -391,10 +440,14 @@ pow = power
 class log(UnaryOp):
     """Element-wise natural logarithm of a tensor."""
 
+    __slots__ = ()
+
 
 class maximum(BinaryOp):
     """Element-wise maximum of two tensors."""
 
+    __slots__ = ()
+
 
 # Conditional operations
 
@@ -408,6 +461,8 @@ class where(Node):
         otherwise: Values to use where condition is False
     """
 
+    __slots__ = ("condition", "then", "otherwise")
+
     def __init__(self, condition: Node, then: Node, otherwise: Node) -> None:
         super().__init__()
         self.condition = condition
@@ -423,12 +478,36 @@ class multi_clause_where(Node):
         default_value: Value to use when no condition is met
     """
 
+    __slots__ = ("clauses", "default_value")
+
     def __init__(self, clauses: Sequence[tuple[Node, Node]], default_value: Node) -> None:
         super().__init__()
         self.clauses = clauses
         self.default_value = default_value
 
 
+# Lookup operations
+
+
+class take(Node):
+    """Gathers elements from a table of scalars using integer indices.
+
+    Like `np.take` with `mode="clip"`, the result has the shape of the
+    indices, and indices past the end of the table select its last element.
+
+    Args:
+        table: The scalars to gather
+        indices: Integer tensor containing positions within the table
+    """
+
+    __slots__ = ("table", "indices")
+
+    def __init__(self, table: Sequence[Scalar], indices: Node) -> None:
+        super().__init__()
+        self.table = tuple(table)
+        self.indices = indices
+
+
 # Shape-changing operations
 
 
@@ -444,6 +523,8 @@ class AxisOp(Node):
         axis: Axis specification
     """
 
+    __slots__ = ("node", "axis")
+
     def __init__(self, node: Node, axis: Axis) -> None:
         super().__init__()
         self.node = node
@@ -456,10 +537,14 @@ class expand_dims(AxisOp):
     This expands the tensor to a higher-dimensional space.
     """
 
+    __slots__ = ()
+
 
 class squeeze(AxisOp):
     """Removes axes of size 1 from a tensor's shape."""
 
+    __slots__ = ()
+
 
 class project_using_sum(AxisOp):
     """Computes sum of tensor elements along specified axes.
@@ -467,6 +552,8 @@ class project_using_sum(AxisOp):
     This projects the tensor to a lower-dimensional space.
     """
 
+    __slots__ = ()
+
 
 reduce_sum = project_using_sum
 """Name alias for project_using_sum, for compatibility with yakof, which still
@@ -480,6 +567,8 @@ class project_using_mean(AxisOp):
     This projects the tensor to a lower-dimensional space.
     """
 
+    __slots__ = ()
+
 
 reduce_mean = project_using_mean
 """Name alias for project_using_mean, for compatibility with yakof, which
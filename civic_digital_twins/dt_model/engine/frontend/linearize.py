@@ -7,6 +7,10 @@ While we could directly rely on the node's creation ID to perform sorting on
 the graph, relying on topological sorting makes the code slightly more robust
 because it allows us to detect loops at sorting time.
 
+We traverse the graph using an explicit stack rather than recursion, hence
+we can linearize arbitrarily deep graphs (e.g., the sum of thousands of
+terms) without exceeding Python's recursion limit.
+
 The linearization process:
 1. Starts from output nodes and traverses the graph
 2. Ensures all dependencies are scheduled before their dependents
@@ -28,6 +32,8 @@ not equality comparison (`==`).
 
 from __future__ import annotations
 
+from typing import Iterator
+
 from . import graph
 
 
@@ -83,11 +89,14 @@ def forest(*leaves: graph.Node) -> list[graph.Node]:
     # visited caches the nodes we've already visited
     visited: set[graph.Node] = set()
 
-    def _visit(node: graph.Node) -> None:
-        # Ensure we only visit a node at most once
-        if node in visited:
-            return
+    # We use an explicit stack rather than recursion, such that very deep
+    # graphs (e.g., long chains of additions) do not exceed the recursion
+    # limit. Each entry contains a node we're visiting and an iterator over
+    # the dependencies we still need to visit, which yields the same order
+    # as visiting the dependencies recursively.
+    stack: list[tuple[graph.Node, Iterator[graph.Node]]] = []
 
+    def _enter(node: graph.Node) -> None:
         # Ensure there are no cycles (the input should be a DAG anyway)
         if node in visiting:
             raise ValueError(
@@ -96,26 +105,34 @@ def forest(*leaves: graph.Node) -> list[graph.Node]:
 
         # Register that we're visiting this node
         visiting.add(node)
+        stack.append((node, iter(_get_dependencies(node))))
 
-        # Get dependent nodes based on this node's type
-        deps = _get_dependencies(node)
+    # Start visiting from the leaf nodes
+    for leaf in leaves:
+        # Ensure we only visit a node at most once
+        if leaf in visited:
+            continue
+        _enter(leaf)
 
-        # Visit all dependencies first
-        for dep in deps:
-            _visit(dep)
+        while stack:
+            node, deps = stack[-1]
 
-        # We are not visiting this node anymore
-        visiting.remove(node)
+            # Visit the next dependency that we have not visited yet
+            dep = next(deps, None)
+            if dep is not None:
+                if dep not in visited:
+                    _enter(dep)
+                continue
 
-        # We have visited this node
-        visited.add(node)
+            # All dependencies are visited, so we are not visiting this node anymore
+            stack.pop()
+            visiting.remove(node)
 
-        # We can append this node to the final plan
-        plan.append(node)
+            # We have visited this node
+            visited.add(node)
 
-    # Start visiting from the leaf nodes
-    for node in leaves:
-        _visit(node)
+            # We can append this node to the final plan
+            plan.append(node)
 
     # Return the linearized plan to the caller
     return plan
@@ -156,6 +173,9 @@ def _get_dependencies(node: graph.Node) -> list[graph.Node]:
     if isinstance(node, graph.AxisOp):
         return [node.node]
 
+    if isinstance(node, graph.take):
+        return [node.indices]
+
     if isinstance(node, (graph.constant, graph.placeholder)):
         return []
 
@@ -0,0 +1,70 @@
+"""Liveness analysis for linearized computation graphs.
+
+When evaluating a linearized plan, the value of a node is only needed until
+its last consumer has been evaluated. Executors may use this information to
+drop intermediate values as soon as possible, thus reducing the peak memory
+usage, which matters when the values are large arrays (e.g., when evaluating
+a model over a fine presence grid and a large ensemble).
+
+The main entry point is the `releases` function:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, linearize, liveness
+    >>> x = graph.placeholder("x")
+    >>> y = graph.exp(x)
+    >>> z = graph.log(y)
+    >>> plan = linearize.forest(z)
+    >>> [[n.name for n in step] for step in liveness.releases(plan, keep=[z])]
+    [[], ['x'], ['']]
+
+Here `x` can be dropped after evaluating `exp(x)` and `exp(x)` can be
+dropped after evaluating `log(exp(x))`.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from . import graph, rewrite
+
+
+def last_uses(plan: Sequence[graph.Node]) -> dict[graph.Node, int]:
+    """Compute the index of the last step using the value of each node.
+
+    A node is used by the steps evaluating its consumers. Nodes without
+    consumers within the plan are only used by the step evaluating them.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+
+    Returns
+    -------
+        A mapping from each node in the plan to the index of its last use.
+    """
+    result: dict[graph.Node, int] = {}
+    for index, node in enumerate(plan):
+        result[node] = index
+        for dep in rewrite.inputs(node):
+            result[dep] = index
+    return result
+
+
+def releases(plan: Sequence[graph.Node], keep: Iterable[graph.Node] = ()) -> list[tuple[graph.Node, ...]]:
+    """Compute the nodes whose values are not needed after each step.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        keep: Nodes that must never be released (e.g., the outputs).
+
+    Returns
+    -------
+        A list containing, for each step in the plan, the nodes whose
+        value can be released after evaluating such a step.
+    """
+    kept = set(keep)
+    result: list[list[graph.Node]] = [[] for _ in plan]
+    for node, index in last_uses(plan).items():
+        if node not in kept:
+            result[index].append(node)
+    return [tuple(step) for step in result]
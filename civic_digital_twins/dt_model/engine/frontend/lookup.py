@@ -0,0 +1,126 @@
+"""Compile categorical piecewise functions into lookup tables.
+
+Models often map the value of a categorical context variable to a constant
+using piecewise functions, e.g., `Piecewise((0.55, Eq(CV_weather.node,
+Symbol("bad"))), (0.80, True))`. Evaluating the resulting `multi_clause_where`
+allocates a full-size boolean mask for each clause and then calls `np.select`.
+When the categories are integer codes (see `internal.sympyke.symbol`), we can
+compute the same result using a single `graph.take` gathering from a table
+indexed by code.
+
+This pass rewrites the `multi_clause_where` nodes such that:
+
+1. all the values and the default value are constants of the same type;
+
+2. each condition is `equal(subject, symbol)` or `equal(symbol, subject)`,
+where `symbol` is a node with a known integer code, and `subject` is the same
+node for all the conditions, which the caller knows to evaluate to codes
+(e.g., a categorical context variable). We leave the other subjects alone,
+since a float or string subject would fail in `np.take` or select the wrong
+row of the table.
+
+The table contains, for each known code, the value of the first clause
+matching that code, or the default value, followed by the default value,
+which `graph.take` selects for codes past the end of the table.
+
+Like other passes (see `rewrite`), this pass does not mutate the graph
+and returns a mapping from the original nodes to their replacements:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, lookup, pretty
+    >>> cv = graph.placeholder("cv")
+    >>> good, bad = graph.placeholder("good", 0), graph.placeholder("bad", 1)
+    >>> y = graph.multi_clause_where([(graph.equal(cv, bad), graph.constant(0.55))], graph.constant(0.8))
+    >>> mapping = lookup.forest(y, codes={good: 0, bad: 1}, subjects=[cv])
+    >>> print(pretty.format(mapping[y]))
+    take([0.8, 0.55, 0.8], cv)
+
+The caller is responsible for ensuring that the given codes are the values
+the symbols evaluate to.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+
+from . import graph, linearize, rewrite
+
+
+def forest(*leaves: graph.Node, codes: Mapping[graph.Node, int], subjects: Iterable[graph.Node]) -> rewrite.Mapping:
+    """Replace categorical piecewise functions in the forest with table lookups.
+
+    Args:
+        *leaves: The output nodes of the computation forest.
+        codes: The integer code of each symbol node.
+        subjects: The nodes evaluating to codes (e.g., categorical context variables).
+
+    Returns
+    -------
+        A mapping from each node reachable from the leaves to the node
+        replacing it. Nodes that do not need replacing map to themselves.
+
+    Raises
+    ------
+        ValueError: If a cycle is detected in the graph.
+        TypeError: If an unknown node type is encountered.
+    """
+    size = max(codes.values(), default=-1) + 1
+    # Note: we use a set because nodes override `==`
+    categorical = set(subjects)
+    mapping: rewrite.Mapping = {}
+    for node in linearize.forest(*leaves):
+        new_inputs = [mapping[dep] for dep in rewrite.inputs(node)]
+        replacement = None
+        if isinstance(node, graph.multi_clause_where) and node.flags == 0:
+            replacement = _lookup(node, new_inputs, codes, categorical, size)
+        mapping[node] = replacement if replacement is not None else rewrite.rebuild(node, new_inputs)
+    return mapping
+
+
+def _lookup(
+    node: graph.multi_clause_where,
+    inputs: list[graph.Node],
+    codes: Mapping[graph.Node, int],
+    subjects: set[graph.Node],
+    size: int,
+) -> graph.take | None:
+    """Return the lookup replacing the node, or None if the node is not categorical."""
+    conditions, values, default = inputs[0:-1:2], inputs[1:-1:2], inputs[-1]
+
+    # 1. make sure that all the values are constants of the same type
+    constants = [*values, default]
+    if not all(isinstance(value, graph.constant) for value in constants):
+        return None
+    scalars = [value.value for value in constants if isinstance(value, graph.constant)]
+    if len({type(scalar) for scalar in scalars}) != 1:
+        return None
+
+    # 2. make sure that each condition compares the same subject with a symbol
+    subject: graph.Node | None = None
+    matches: list[int] = []
+    for condition in conditions:
+        if not isinstance(condition, graph.equal) or condition.flags != 0:
+            return None
+        left, right = condition.left, condition.right
+        if right in codes and left not in codes:
+            candidate, code = left, codes[right]
+        elif left in codes and right not in codes:
+            candidate, code = right, codes[left]
+        else:
+            return None
+        if subject is not None and candidate is not subject:
+            return None
+        subject = candidate
+        matches.append(code)
+    if subject is None or subject not in subjects:
+        return None
+
+    # 3. fill the table, such that the first matching clause wins
+    table = [scalars[-1]] * (size + 1)
+    for code, value in reversed(list(zip(matches, scalars[:-1]))):
+        table[code] = value
+
+    result = graph.take(table, subject)
+    result.name = node.name
+    return result
@@ -0,0 +1,39 @@
+"""Interface to the functions implementing the graph operations.
+
+Some frontend passes need to know what the operations compute: constant
+folding (see `simplify`) evaluates them on constant inputs, and shape
+inference (see `shapes`) evaluates them on empty arrays to obtain dtypes.
+The frontend does not depend on any backend, hence the caller passes the
+functions implementing the operations using the `Operations` interface
+(e.g., `engine.numpybackend.dispatch.operations`), such that these passes
+compute the same values the backend computes.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from . import graph
+
+
+@dataclass(frozen=True)
+class Operations:
+    """
+    Functions implementing the graph operations, indexed by node type.
+
+    Each function takes and returns arrays, following NumPy semantics.
+
+    Attributes
+    ----------
+        binary: The functions implementing the binary operations.
+        unary: The functions implementing the unary operations.
+        axes: The functions implementing the axis operations, which
+            also take the axis of the node.
+    """
+
+    binary: Mapping[type[graph.BinaryOp], Callable]
+    unary: Mapping[type[graph.UnaryOp], Callable]
+    axes: Mapping[type[graph.AxisOp], Callable]
@@ -45,16 +45,37 @@ Design Decisions
    - Follows standard mathematical conventions
    - Allows easy addition of new operators
 
-2. Recursive Implementation:
-   - Handles nested expressions naturally
-   - Passes precedence information down the tree
-   - Enables context-aware formatting decisions
+2. Iterative Implementation:
+   - Each node produces a list of fragments, i.e., strings and children
+   - Parents decide whether to parenthesize children based on precedence
+   - Expanding the fragments uses an explicit stack, so deep graphs do
+     not exceed Python's recursion limit
 
 3. Special Cases:
    - Function-like operations use function call syntax
    - Named nodes show assignment syntax
    - Placeholders use angle bracket notation for visibility
 
+Shared Subexpressions
+---------------------
+
+Because `format` expands each reference to an anonymous node, the output
+grows exponentially with the number of nested shared nodes (e.g., after
+CSE). The `format_dag` function instead binds each anonymous node used more
+than once to a fresh name, which it defines using a `let` line, and runs in
+linear time with respect to the number of nodes:
+
+    >>> t = graph.exp(x)
+    >>> u = t * t
+    >>> print(pretty.format_dag(u + u))
+    let t1 = exp(x)
+    let t2 = t1 * t1
+    t2 + t2
+
+Like `format`, `format_dag` stops at named nodes, unless `expand_names` is
+True, in which case it also binds named nodes using their names, thus
+formatting the whole graph the node depends on.
+
 Implementation Notes
 --------------------
 
@@ -64,7 +85,69 @@ visitor pattern, which keeps the code simple and maintains extensibility.
 
 # SPDX-License-Identifier: Apache-2.0
 
-from . import graph
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from . import graph, linearize
+
+_PRECEDENCE: dict[type[graph.Node], int] = {
+    # Function-like operators without corresponding infix operators
+    graph.exp: 100,  # exp(x)
+    graph.log: 100,  # log(x)
+    # Unary operations
+    graph.logical_not: 50,  # ~x
+    # Binary operations
+    graph.power: 40,  # x ** y
+    graph.multiply: 30,  # x * y
+    graph.divide: 30,  # x / y
+    graph.add: 20,  # x + y
+    graph.subtract: 20,  # x - y
+    # Comparisons
+    graph.less: 10,  # x < y
+    graph.less_equal: 10,  # x <= y
+    graph.greater: 10,  # x > y
+    graph.greater_equal: 10,  # x >= y
+    graph.equal: 10,  # x == y
+    graph.not_equal: 10,  # x != y
+    # Logical operations
+    graph.logical_and: 5,  # x & y
+    graph.logical_xor: 4,  # x ^ y
+    graph.logical_or: 3,  # x | y
+}
+"""Precedence of the operators (higher binds tighter)."""
+
+_INFIX: dict[type[graph.Node], str] = {
+    graph.add: "+",
+    graph.subtract: "-",
+    graph.multiply: "*",
+    graph.divide: "/",
+    graph.power: "**",
+    graph.logical_and: "&",
+    graph.logical_or: "|",
+    graph.logical_xor: "^",
+    graph.less: "<",
+    graph.less_equal: "<=",
+    graph.greater: ">",
+    graph.greater_equal: ">=",
+    graph.equal: "==",
+    graph.not_equal: "!=",
+}
+"""Symbols of the binary operators using infix notation."""
+
+_FUNCTIONS: dict[type[graph.Node], str] = {
+    graph.maximum: "maximum",
+    graph.exp: "exp",
+    graph.log: "log",
+    graph.expand_dims: "expand_dims",
+    graph.squeeze: "squeeze",
+    graph.reduce_sum: "reduce_sum",
+    graph.reduce_mean: "reduce_mean",
+}
+"""Names of the operators using function call notation."""
+
+_Fragment = str | graph.Node
+"""A fragment of a formatted node: either text or a child to format."""
 
 
 def format(node: graph.Node) -> str:
@@ -85,142 +168,160 @@ def format(node: graph.Node) -> str:
         >>> print(pretty.format(y))
         x * 2 + 1
     """
-    expr = _format(node, True, 0)  # Start with lowest precedence
+    # Note: we stop formatting at named nodes and use their names, which
+    # means we're printing formulae aligned with what the user has written
+    # inside the input program/model
+    expr = _expand(node, lambda child: child.name or None)
     if node.name:
         expr = f"{node.name} = {expr}"
     return expr
 
 
-def _format(node: graph.Node, toplevel: bool, parent_precedence: int) -> str:
-    # If we're not at top-level and we have a named node,
-    # stop formatting and return the node name, which means
-    # we're printing formulae aligned with what the user
-    # has written inside the input program/model
-    if not toplevel and node.name:
-        return node.name
-
-    # Immediately flip toplevel to False after the first
-    # iteration to avoid printing the whole graph
-    toplevel = False
-
-    # Precedence rules (higher binds tighter)
-    PRECEDENCE = {
-        # Function-like operators without corresponding infix operators
-        graph.exp: 100,  # exp(x)
-        graph.log: 100,  # log(x)
-        # Unary operations
-        graph.logical_not: 50,  # ~x
-        # Binary operations
-        graph.power: 40,  # x ** y
-        graph.multiply: 30,  # x * y
-        graph.divide: 30,  # x / y
-        graph.add: 20,  # x + y
-        graph.subtract: 20,  # x - y
-        # Comparisons
-        graph.less: 10,  # x < y
-        graph.less_equal: 10,  # x <= y
-        graph.greater: 10,  # x > y
-        graph.greater_equal: 10,  # x >= y
-        graph.equal: 10,  # x == y
-        graph.not_equal: 10,  # x != y
-        # Logical operations
-        graph.logical_and: 5,  # x & y
-        graph.logical_xor: 4,  # x ^ y
-        graph.logical_or: 3,  # x | y
-    }
-
-    def needs_parens(expr_node: graph.Node) -> bool:
-        """Determine if expression needs parentheses."""
-        return PRECEDENCE.get(type(expr_node), 0) < parent_precedence
-
-    def wrap(expr_node: graph.Node, expr: str) -> str:
-        """Wrap expression in parentheses if needed."""
-        return f"({expr})" if needs_parens(expr_node) else expr
+def format_dag(node: graph.Node, *, expand_names: bool = False) -> str:
+    """Format a computation graph node binding shared subexpressions to names.
+
+    Each anonymous node used more than once gets a fresh name (e.g., `t1`)
+    and a `let` line defining it, which precedes the lines using it. The last
+    line contains the expression of the node itself. The time and the output
+    size are linear in the number of nodes.
+
+    Args:
+        node: The node to format.
+        expand_names: Whether to also define the named nodes the node depends
+            on using `let` lines, rather than stopping at them.
+
+    Returns
+    -------
+        The `let` lines followed by the node expression, separated by newlines.
+    """
+    # 1. collect the nodes to format, in topological order, and count their uses
+    #
+    # Note: we use dicts because nodes override `==`
+    uses: dict[graph.Node, int] = {node: 0}
+    order: list[graph.Node] = []
+    stack: list[tuple[graph.Node, Iterator[graph.Node]]] = [(node, iter(_inputs(node)))]
+    while stack:
+        current, deps = stack[-1]
+        dep = next(deps, None)
+        if dep is None:
+            stack.pop()
+            order.append(current)
+            continue
+        if dep in uses:
+            uses[dep] += 1
+            continue
+        uses[dep] = 1
+        if expand_names or not dep.name:
+            stack.append((dep, iter(_inputs(dep))))
+
+    # 2. decide the name of each node we do not expand inline, numbering
+    # the bound anonymous nodes in topological order
+    taken = {other.name for other in uses if other.name}
+    names: dict[graph.Node, str] = {}
+    for other in uses:
+        if other.name and other is not node:
+            names[other] = other.name
+    counter = 0
+    for other in order:
+        if other is node or other.name or uses[other] < 2:
+            continue
+        if isinstance(other, (graph.constant, graph.placeholder)):
+            continue
+        counter += 1
+        while f"t{counter}" in taken:
+            counter += 1
+        names[other] = f"t{counter}"
+
+    # 3. define the bound nodes in topological order and then format the node
+    lines: list[str] = []
+    for other in order:
+        if other in names and not isinstance(other, graph.placeholder):
+            lines.append(f"let {names[other]} = {_expand(other, names.get)}")
+    expr = _expand(node, names.get)
+    lines.append(f"{node.name} = {expr}" if node.name else expr)
+    return "\n".join(lines)
+
+
+def _inputs(node: graph.Node) -> list[graph.Node]:
+    """Return the inputs of the node, or no inputs if we do not know the node type."""
+    try:
+        return linearize._get_dependencies(node)
+    except TypeError:
+        return []
+
+
+def _expand(node: graph.Node, name_of: Callable[[graph.Node], str | None]) -> str:
+    """Format the node, using the name returned by name_of for each child not to expand."""
+    output: list[str] = []
+    stack: list[Iterator[_Fragment]] = [iter(_fragments(node, name_of))]
+    while stack:
+        fragment = next(stack[-1], None)
+        if fragment is None:
+            stack.pop()
+        elif isinstance(fragment, str):
+            output.append(fragment)
+        else:
+            name = name_of(fragment)
+            if name is not None:
+                output.append(name)
+            else:
+                stack.append(iter(_fragments(fragment, name_of)))
+    return "".join(output)
+
+
+def _fragments(node: graph.Node, name_of: Callable[[graph.Node], str | None]) -> list[_Fragment]:
+    """Return the fragments formatting the node."""
+
+    def operand(child: graph.Node, parent_precedence: int) -> list[_Fragment]:
+        """Return the child, wrapped in parentheses if needed."""
+        wraps = type(child) in _INFIX or isinstance(child, graph.logical_not)
+        if wraps and name_of(child) is None and _PRECEDENCE.get(type(child), 0) < parent_precedence:
+            return ["(", child, ")"]
+        return [child]
 
     # Base cases
     if isinstance(node, graph.constant):
-        return str(node.value)
+        return [str(node.value)]
     if isinstance(node, graph.placeholder):
-        return node.name
+        return [node.name]
+
+    precedence = _PRECEDENCE.get(type(node), 0)
 
     # Binary operations
     if isinstance(node, graph.BinaryOp):
-        op_precedence = PRECEDENCE.get(type(node), 0)
-        left = _format(node.left, toplevel, op_precedence)
-        right = _format(node.right, toplevel, op_precedence)
-
-        # Arithmetic operators
-        if isinstance(node, graph.add):
-            return wrap(node, f"{left} + {right}")
-        if isinstance(node, graph.subtract):
-            return wrap(node, f"{left} - {right}")
-        if isinstance(node, graph.multiply):
-            return wrap(node, f"{left} * {right}")
-        if isinstance(node, graph.divide):
-            return wrap(node, f"{left} / {right}")
-        if isinstance(node, graph.power):
-            return wrap(node, f"{left} ** {right}")
-        if isinstance(node, graph.maximum):
-            return f"maximum({left}, {right})"
-        if isinstance(node, graph.logical_and):
-            return wrap(node, f"{left} & {right}")
-        if isinstance(node, graph.logical_or):
-            return wrap(node, f"{left} | {right}")
-        if isinstance(node, graph.logical_xor):
-            return wrap(node, f"{left} ^ {right}")
-
-        # Comparison operators
-        if isinstance(node, graph.less):
-            return wrap(node, f"{left} < {right}")
-        if isinstance(node, graph.less_equal):
-            return wrap(node, f"{left} <= {right}")
-        if isinstance(node, graph.greater):
-            return wrap(node, f"{left} > {right}")
-        if isinstance(node, graph.greater_equal):
-            return wrap(node, f"{left} >= {right}")
-        if isinstance(node, graph.equal):
-            return wrap(node, f"{left} == {right}")
-        if isinstance(node, graph.not_equal):
-            return wrap(node, f"{left} != {right}")
+        left = operand(node.left, precedence)
+        right = operand(node.right, precedence)
+        if type(node) in _INFIX:
+            return [*left, f" {_INFIX[type(node)]} ", *right]
+        if type(node) in _FUNCTIONS:
+            return [f"{_FUNCTIONS[type(node)]}(", *left, ", ", *right, ")"]
 
     # Unary operations
     if isinstance(node, graph.UnaryOp):
-        op_precedence = PRECEDENCE.get(type(node), 0)
-        inner = _format(node.node, toplevel, op_precedence)
-
+        inner = operand(node.node, precedence)
         if isinstance(node, graph.logical_not):
-            return wrap(node, f"~{inner}")
-        if isinstance(node, graph.exp):
-            return f"exp({inner})"
-        if isinstance(node, graph.log):
-            return f"log({inner})"
+            return ["~", *inner]
+        if type(node) in _FUNCTIONS:
+            return [f"{_FUNCTIONS[type(node)]}(", *inner, ")"]
 
     # Conditional operations
     if isinstance(node, graph.where):
-        condition = _format(node.condition, toplevel, 0)
-        then_expr = _format(node.then, toplevel, 0)
-        else_expr = _format(node.otherwise, toplevel, 0)
-        return f"where({condition}, {then_expr}, {else_expr})"
+        return ["where(", node.condition, ", ", node.then, ", ", node.otherwise, ")"]
 
     if isinstance(node, graph.multi_clause_where):
-        clauses_str = ", ".join(
-            f"({_format(cond, toplevel, 0)}, {_format(val, toplevel, 0)})" for cond, val in node.clauses
-        )
-        default_str = _format(node.default_value, toplevel, 0)
-        return f"multi_clause_where([{clauses_str}], {default_str})"
+        result: list[_Fragment] = ["multi_clause_where(["]
+        for index, (cond, value) in enumerate(node.clauses):
+            result.extend((", (" if index > 0 else "(", cond, ", ", value, ")"))
+        result.extend(("], ", node.default_value, ")"))
+        return result
+
+    if isinstance(node, graph.take):
+        table_str = ", ".join(str(value) for value in node.table)
+        return [f"take([{table_str}], ", node.indices, ")"]
 
     # Shape operations
-    if isinstance(node, graph.AxisOp):
-        inner = _format(node.node, toplevel, 0)
+    if isinstance(node, graph.AxisOp) and type(node) in _FUNCTIONS:
         axis_str = str(node.axis) if isinstance(node.axis, int) else str(tuple(node.axis))
+        return [f"{_FUNCTIONS[type(node)]}(", node.node, f", {axis_str})"]
 
-        if isinstance(node, graph.expand_dims):
-            return f"expand_dims({inner}, {axis_str})"
-        if isinstance(node, graph.squeeze):
-            return f"squeeze({inner}, {axis_str})"
-        if isinstance(node, graph.reduce_sum):
-            return f"reduce_sum({inner}, {axis_str})"
-        if isinstance(node, graph.reduce_mean):
-            return f"reduce_mean({inner}, {axis_str})"
-
-    return f"<unknown:{type(node).__name__}>"
+    return [f"<unknown:{type(node).__name__}>"]
@@ -0,0 +1,121 @@
+"""Support for rewriting computation graphs.
+
+Graph optimization passes (e.g., `cse`) never mutate the nodes they are
+given. Rather, they produce a mapping from each original node to the node
+that should replace it. This module contains the building blocks shared
+by such passes:
+
+1. `inputs` returns the direct inputs of a node.
+
+2. `rebuild` creates a copy of a node using different inputs.
+
+3. `Mapping` is the type of the mapping that passes return.
+
+4. `substitute` replaces given nodes within a graph, and `compose` chains
+the mappings of consecutive passes.
+
+Because nodes override equality operators to build computation graphs,
+mappings use the identity-based node hashing and callers must use the
+`is` operator when comparing nodes.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from . import graph, linearize
+
+Mapping = dict[graph.Node, graph.Node]
+"""Maps each original node to the node replacing it."""
+
+
+def inputs(node: graph.Node) -> list[graph.Node]:
+    """Return the direct inputs of the given node.
+
+    Raises
+    ------
+        TypeError: If the node type is unknown.
+    """
+    return linearize._get_dependencies(node)
+
+
+def rebuild(node: graph.Node, new_inputs: Sequence[graph.Node]) -> graph.Node:
+    """Create a copy of the node using the given inputs.
+
+    The inputs must be in the same order returned by `inputs`. If all the
+    new inputs are the original inputs, we return the original node.
+
+    The copy has the same type, name and flags of the original node.
+
+    Raises
+    ------
+        TypeError: If the node type is unknown.
+    """
+    old_inputs = inputs(node)
+    if len(old_inputs) != len(new_inputs):
+        raise ValueError(f"rewrite: expected {len(old_inputs)} inputs, got {len(new_inputs)}")
+    if all(old is new for old, new in zip(old_inputs, new_inputs)):
+        return node
+
+    copy: graph.Node
+    if isinstance(node, graph.BinaryOp):
+        copy = type(node)(new_inputs[0], new_inputs[1])
+    elif isinstance(node, graph.UnaryOp):
+        copy = type(node)(new_inputs[0])
+    elif isinstance(node, graph.AxisOp):
+        copy = type(node)(new_inputs[0], node.axis)
+    elif isinstance(node, graph.where):
+        copy = graph.where(new_inputs[0], new_inputs[1], new_inputs[2])
+    elif isinstance(node, graph.multi_clause_where):
+        clauses = [(new_inputs[2 * i], new_inputs[2 * i + 1]) for i in range(len(node.clauses))]
+        copy = graph.multi_clause_where(clauses, new_inputs[-1])
+    elif isinstance(node, graph.take):
+        copy = graph.take(node.table, new_inputs[0])
+    else:
+        raise TypeError(f"rewrite: unknown node type: {type(node)}")
+
+    copy.name = node.name
+    copy.flags = node.flags
+    return copy
+
+
+def apply(mapping: Mapping, nodes: Sequence[graph.Node]) -> list[graph.Node]:
+    """Return the replacement of each node, or the node itself if not mapped."""
+    return [mapping.get(node, node) for node in nodes]
+
+
+def substitute(replacements: Mapping, *leaves: graph.Node) -> Mapping:
+    """Replace the given nodes in the forest rooted at the given leaves.
+
+    Args:
+        replacements: The node replacing each node to substitute.
+        *leaves: The output nodes of the computation forest.
+
+    Returns
+    -------
+        A mapping from each node reachable from the leaves to the node
+        replacing it. Nodes that do not need replacing map to themselves.
+
+    Raises
+    ------
+        ValueError: If a cycle is detected in the graph.
+        TypeError: If an unknown node type is encountered.
+    """
+    mapping: Mapping = {}
+    for node in linearize.forest(*leaves):
+        replacement = replacements.get(node)
+        if replacement is None:
+            replacement = rebuild(node, [mapping[dep] for dep in inputs(node)])
+        mapping[node] = replacement
+    return mapping
+
+
+def compose(first: Mapping, second: Mapping) -> Mapping:
+    """Return the mapping applying first and then second.
+
+    We drop the nodes whose replacement according to first is not mapped
+    by second (e.g., because no output of the second pass depends on it).
+    """
+    return {node: second[image] for node, image in first.items() if image in second}
@@ -0,0 +1,469 @@
+"""Serialize computation graphs into a compact binary format.
+
+Building the graph of a model requires executing the model code (e.g.,
+importing `reference_models.molveno.overtourism`), which each worker process
+would otherwise repeat. This module encodes graphs into bytes, which we can
+cache on disk and decode in a fraction of the time:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, serialize
+    >>> x = graph.placeholder("x")
+    >>> y = graph.exp(x)
+    >>> z = y * y
+    >>> (loaded,) = serialize.loads(serialize.dumps(z))
+    >>> loaded.left is loaded.right
+    True
+
+Decoding preserves the sharing of nodes (i.e., each node reachable from
+several roots or through several paths is decoded once), as well as the
+type, name, flags and attributes of each node. Decoded nodes are new nodes,
+hence they have new IDs.
+
+Use `dumps_plan` and `loads_plan` to encode a linearized plan (see
+`linearize.forest`) preserving the order of its nodes.
+
+The default value of the placeholders of symbols is a code depending on the
+order in which the process interned them (see `internal.sympyke.symbol`),
+hence we encode them by name only (pass them to `dumps` using `symbols`),
+and decoding re-interns them by name in the current process (pass the
+function returning the placeholder of each symbol to `loads` using `intern`).
+
+We preserve the type of NumPy scalars (e.g., float32 constants folded
+under the float32 precision policy) using their dtype.
+
+Format
+------
+
+All integers are unsigned LEB128 varints, where signed integers use the
+zigzag encoding. The data contains:
+
+1. the `MAGIC` bytes and the `VERSION` as a little-endian 16 bit integer;
+
+2. the string table, i.e., the number of strings followed by each string
+as its length and its UTF-8 bytes (the first string is always empty);
+
+3. the number of nodes followed by each node in topological order, i.e.,
+the index of its type within `_TYPES`, its flags, the index of its name
+within the string table, and its type-specific payload, which refers to
+the inputs using their indexes within the nodes;
+
+4. the number of roots followed by the index of each root.
+
+Scalars start with a tag: `None`, `False` and `True` only consist of the
+tag, Python integers continue with a varint, Python floats with a
+little-endian double, NumPy scalars with the length and the ASCII bytes of
+their dtype string followed by their raw bytes, and the default value of the
+placeholders of symbols only consists of a tag.
+
+We only append new types to `_TYPES`, such that changing the format only
+requires bumping `VERSION` when the encoding of existing types changes.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import struct
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+
+from . import graph, linearize
+
+MAGIC = b"DTMG"
+"""Bytes identifying serialized graphs."""
+
+VERSION = 2
+"""Version of the format written by `dumps` and `dumps_plan`."""
+
+_TYPES: tuple[type[graph.Node], ...] = (
+    graph.constant,
+    graph.placeholder,
+    graph.add,
+    graph.subtract,
+    graph.multiply,
+    graph.divide,
+    graph.equal,
+    graph.not_equal,
+    graph.less,
+    graph.less_equal,
+    graph.greater,
+    graph.greater_equal,
+    graph.logical_and,
+    graph.logical_or,
+    graph.logical_xor,
+    graph.logical_not,
+    graph.exp,
+    graph.power,
+    graph.log,
+    graph.maximum,
+    graph.where,
+    graph.multi_clause_where,
+    graph.take,
+    graph.expand_dims,
+    graph.squeeze,
+    graph.project_using_sum,
+    graph.project_using_mean,
+)
+"""Serializable node types, indexed by their code (append only)."""
+
+_CODES: dict[type[graph.Node], int] = {node_type: code for code, node_type in enumerate(_TYPES)}
+"""Code of each serializable node type."""
+
+# Tags of the encoded scalars
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _NUMPY, _SYMBOL = range(7)
+
+_DOUBLE = struct.Struct("<d")
+_HEADER = struct.Struct("<4sH")
+
+
+class FormatError(Exception):
+    """Raised when the data is not a valid serialized graph."""
+
+
+def dumps(*roots: graph.Node, symbols: Iterable[graph.Node] = ()) -> bytes:
+    """Serialize the graph reachable from the given roots.
+
+    Args:
+        *roots: The nodes to serialize along with their dependencies.
+        symbols: The placeholders of symbols, which we encode by name only.
+
+    Raises
+    ------
+        TypeError: If a node type is not serializable.
+        ValueError: If a cycle is detected in the graph.
+    """
+    return _encode(linearize.forest(*roots), roots, symbols)
+
+
+def loads(data: bytes, *, intern: Callable[[str], graph.Node] | None = None) -> tuple[graph.Node, ...]:
+    """Deserialize the roots serialized using `dumps`.
+
+    Args:
+        data: The serialized graph.
+        intern: The function returning the placeholder of the symbol with
+            the given name (e.g., `lambda name: symbol.Symbol(name).node`).
+
+    Raises
+    ------
+        FormatError: If the data is not a valid serialized graph, or if it
+            contains symbols and intern is None.
+    """
+    nodes, roots = _decode(data, intern)
+    return tuple(nodes[index] for index in roots)
+
+
+def dumps_plan(plan: Sequence[graph.Node], symbols: Iterable[graph.Node] = ()) -> bytes:
+    """Serialize a linearized plan preserving the order of its nodes.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        symbols: The placeholders of symbols, which we encode by name only.
+
+    Raises
+    ------
+        TypeError: If a node type is not serializable.
+        ValueError: If a node depends on a node not preceding it in the plan.
+    """
+    return _encode(plan, plan, symbols)
+
+
+def loads_plan(data: bytes, *, intern: Callable[[str], graph.Node] | None = None) -> list[graph.Node]:
+    """Deserialize a plan serialized using `dumps_plan`.
+
+    Args:
+        data: The serialized plan.
+        intern: The function returning the placeholder of the symbol with
+            the given name (see `loads`).
+
+    Raises
+    ------
+        FormatError: If the data is not a valid serialized graph, or if it
+            contains symbols and intern is None.
+    """
+    nodes, roots = _decode(data, intern)
+    return [nodes[index] for index in roots]
+
+
+def _encode(nodes: Sequence[graph.Node], roots: Sequence[graph.Node], symbols: Iterable[graph.Node]) -> bytes:
+    # Note: we key by id since nodes override `==` and hashing them
+    # calls back into Python (the sequence keeps the nodes alive)
+    named = {id(node) for node in symbols}
+    indexes: dict[int, int] = {}
+    strings: dict[str, int] = {"": 0}
+    body = bytearray()
+
+    def _index(node: graph.Node) -> int:
+        try:
+            return indexes[id(node)]
+        except KeyError:
+            raise ValueError(f"serialize: node {node.name or node.id} does not precede its consumers")
+
+    for node in nodes:
+        try:
+            code = _CODES[type(node)]
+        except KeyError:
+            raise TypeError(f"serialize: unsupported node type: {type(node)}")
+        _write_uint(body, code)
+        _write_uint(body, node.flags)
+        _write_uint(body, strings.setdefault(node.name, len(strings)))
+
+        if isinstance(node, graph.constant):
+            _write_scalar(body, node.value)
+        elif isinstance(node, graph.placeholder):
+            if id(node) in named:
+                body.append(_SYMBOL)
+            else:
+                _write_scalar(body, node.default_value)
+        elif isinstance(node, graph.BinaryOp):
+            _write_uint(body, _index(node.left))
+            _write_uint(body, _index(node.right))
+        elif isinstance(node, graph.UnaryOp):
+            _write_uint(body, _index(node.node))
+        elif isinstance(node, graph.where):
+            for dep in (node.condition, node.then, node.otherwise):
+                _write_uint(body, _index(dep))
+        elif isinstance(node, graph.multi_clause_where):
+            _write_uint(body, len(node.clauses))
+            for condition, value in node.clauses:
+                _write_uint(body, _index(condition))
+                _write_uint(body, _index(value))
+            _write_uint(body, _index(node.default_value))
+        elif isinstance(node, graph.take):
+            _write_uint(body, len(node.table))
+            for value in node.table:
+                _write_scalar(body, value)
+            _write_uint(body, _index(node.indices))
+        elif isinstance(node, graph.AxisOp):
+            _write_uint(body, _index(node.node))
+            if isinstance(node.axis, int):
+                _write_uint(body, 0)
+                _write_int(body, node.axis)
+            else:
+                _write_uint(body, 1 + len(node.axis))
+                for axis in node.axis:
+                    _write_int(body, axis)
+
+        indexes[id(node)] = len(indexes)
+
+    output = bytearray(_HEADER.pack(MAGIC, VERSION))
+    _write_uint(output, len(strings))
+    for string in strings:
+        encoded = string.encode("utf-8")
+        _write_uint(output, len(encoded))
+        output += encoded
+    _write_uint(output, len(indexes))
+    output += body
+    _write_uint(output, len(roots))
+    for root in roots:
+        _write_uint(output, _index(root))
+    return bytes(output)
+
+
+def _decode(data: bytes, intern: Callable[[str], graph.Node] | None) -> tuple[list[graph.Node], list[int]]:
+    if len(data) < _HEADER.size:
+        raise FormatError("serialize: truncated data")
+    magic, version = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise FormatError("serialize: not a serialized graph")
+    if version != VERSION:
+        raise FormatError(f"serialize: unsupported version: {version}")
+
+    reader = _Reader(data, _HEADER.size, intern)
+    try:
+        strings = [reader.bytes(reader.uint()).decode("utf-8") for _ in range(reader.uint())]
+        nodes: list[graph.Node] = []
+        for _ in range(reader.uint()):
+            nodes.append(_decode_node(reader, strings, nodes))
+        roots = [reader.uint() for _ in range(reader.uint())]
+    except (IndexError, UnicodeDecodeError) as exc:
+        raise FormatError(f"serialize: corrupted data: {exc}") from exc
+    if reader.offset != len(data):
+        raise FormatError("serialize: trailing data")
+    if any(index >= len(nodes) for index in roots):
+        raise FormatError("serialize: corrupted data: root out of range")
+    return nodes, roots
+
+
+def _decode_node(reader: _Reader, strings: list[str], nodes: list[graph.Node]) -> graph.Node:
+    node_type = _TYPES[reader.uint()]
+    flags = reader.uint()
+    name = strings[reader.uint()]
+    if node_type is graph.placeholder and reader.data[reader.offset] == _SYMBOL:
+        return _decode_symbol(reader, name, flags)
+    node = _DECODERS[node_type](node_type, reader, name, nodes)
+    node.name = name
+    node.flags = flags
+    return node
+
+
+def _decode_symbol(reader: _Reader, name: str, flags: int) -> graph.Node:
+    # Note: the interned placeholders are shared by the whole process,
+    # hence we check their attributes rather than overwriting them
+    reader.offset += 1
+    if reader.intern is None:
+        raise FormatError(f"serialize: cannot decode symbol {name} without intern")
+    node = reader.intern(name)
+    if node.name != name or node.flags != flags:
+        raise FormatError(f"serialize: symbol {name} does not match the interned symbol")
+    return node
+
+
+def _decode_constant(_: type, reader: _Reader, name: str, __: list[graph.Node]) -> graph.Node:
+    return graph.constant(reader.scalar(), name)
+
+
+def _decode_placeholder(_: type, reader: _Reader, name: str, __: list[graph.Node]) -> graph.Node:
+    return graph.placeholder(name, reader.optional_scalar())
+
+
+def _decode_binary(node_type: type, reader: _Reader, _: str, nodes: list[graph.Node]) -> graph.Node:
+    left = nodes[reader.uint()]
+    return node_type(left, nodes[reader.uint()])
+
+
+def _decode_unary(node_type: type, reader: _Reader, _: str, nodes: list[graph.Node]) -> graph.Node:
+    return node_type(nodes[reader.uint()])
+
+
+def _decode_where(_: type, reader: _Reader, __: str, nodes: list[graph.Node]) -> graph.Node:
+    condition = nodes[reader.uint()]
+    then = nodes[reader.uint()]
+    return graph.where(condition, then, nodes[reader.uint()])
+
+
+def _decode_multi_clause_where(_: type, reader: _Reader, __: str, nodes: list[graph.Node]) -> graph.Node:
+    clauses = [(nodes[reader.uint()], nodes[reader.uint()]) for _ in range(reader.uint())]
+    return graph.multi_clause_where(clauses, nodes[reader.uint()])
+
+
+def _decode_take(_: type, reader: _Reader, __: str, nodes: list[graph.Node]) -> graph.Node:
+    table = [reader.scalar() for _ in range(reader.uint())]
+    return graph.take(table, nodes[reader.uint()])
+
+
+def _decode_axis(node_type: type, reader: _Reader, _: str, nodes: list[graph.Node]) -> graph.Node:
+    operand = nodes[reader.uint()]
+    count = reader.uint()
+    axis: graph.Axis = reader.int() if count == 0 else tuple(reader.int() for _ in range(count - 1))
+    return node_type(operand, axis)
+
+
+def _decoder(node_type: type[graph.Node]) -> Callable[[type, _Reader, str, list[graph.Node]], graph.Node]:
+    if node_type is graph.constant:
+        return _decode_constant
+    if node_type is graph.placeholder:
+        return _decode_placeholder
+    if issubclass(node_type, graph.BinaryOp):
+        return _decode_binary
+    if issubclass(node_type, graph.UnaryOp):
+        return _decode_unary
+    if node_type is graph.where:
+        return _decode_where
+    if node_type is graph.multi_clause_where:
+        return _decode_multi_clause_where
+    if node_type is graph.take:
+        return _decode_take
+    assert issubclass(node_type, graph.AxisOp)
+    return _decode_axis
+
+
+_DECODERS: dict[type[graph.Node], Callable[[type, _Reader, str, list[graph.Node]], graph.Node]] = {
+    node_type: _decoder(node_type) for node_type in _TYPES
+}
+"""Function decoding the payload of each serializable node type."""
+
+
+def _write_uint(output: bytearray, value: int) -> None:
+    while value >= 0x80:
+        output.append((value & 0x7F) | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def _write_int(output: bytearray, value: int) -> None:
+    _write_uint(output, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def _write_scalar(output: bytearray, value: graph.Scalar | None) -> None:
+    # Note: we encode the NumPy scalars, which constant folding may produce,
+    # along with their dtype, and we check for bool before int since bool
+    # is a subclass of int
+    if value is None:
+        output.append(_NONE)
+    elif isinstance(value, np.generic):
+        dtype = value.dtype.str.encode("ascii")
+        output.append(_NUMPY)
+        _write_uint(output, len(dtype))
+        output += dtype
+        output += value.tobytes()
+    elif isinstance(value, bool):
+        output.append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        output.append(_INT)
+        _write_int(output, value)
+    else:
+        output.append(_FLOAT)
+        output += _DOUBLE.pack(value)
+
+
+class _Reader:
+    """Read values from the serialized data, raising IndexError when truncated."""
+
+    def __init__(self, data: bytes, offset: int, intern: Callable[[str], graph.Node] | None = None) -> None:
+        self.data = data
+        self.offset = offset
+        self.intern = intern
+
+    def uint(self) -> int:
+        data = self.data
+        byte = data[self.offset]
+        self.offset += 1
+        if byte < 0x80:
+            return byte
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[self.offset]
+            self.offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def int(self) -> int:
+        value = self.uint()
+        return (value >> 1) if value & 1 == 0 else -((value + 1) >> 1)
+
+    def bytes(self, count: int) -> bytes:
+        if self.offset + count > len(self.data):
+            raise IndexError("string out of range")
+        result = self.data[self.offset : self.offset + count]
+        self.offset += count
+        return result
+
+    def optional_scalar(self) -> graph.Scalar | None:
+        if self.data[self.offset] == _NONE:
+            self.offset += 1
+            return None
+        return self.scalar()
+
+    def scalar(self) -> graph.Scalar:
+        tag = self.data[self.offset]
+        self.offset += 1
+        if tag in (_FALSE, _TRUE):
+            return tag == _TRUE
+        if tag == _INT:
+            return self.int()
+        if tag == _FLOAT:
+            if self.offset + _DOUBLE.size > len(self.data):
+                raise IndexError("float out of range")
+            (value,) = _DOUBLE.unpack_from(self.data, self.offset)
+            self.offset += _DOUBLE.size
+            return value
+        if tag == _NUMPY:
+            try:
+                dtype = np.dtype(self.bytes(self.uint()).decode("ascii"))
+            except TypeError as exc:
+                raise IndexError(f"invalid dtype: {exc}") from exc
+            return np.frombuffer(self.bytes(dtype.itemsize), dtype=dtype)[0]
+        raise IndexError(f"unknown scalar tag: {tag}")
@@ -0,0 +1,207 @@
+"""Static shape and dtype inference for computation graphs.
+
+Executing a plan is the only way to learn the shape of each node value, which
+prevents planning memory usage, chunking or preallocating buffers ahead
+of time. This module propagates the shape and the dtype of the placeholders
+(and of the constants) through a linearized plan, without evaluating it:
+
+    >>> import numpy as np
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, linearize, shapes
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import dispatch
+    >>> x = graph.placeholder("x")
+    >>> y = graph.placeholder("y")
+    >>> z = graph.project_using_sum(x * y > 0.5, axis=0)
+    >>> specs = shapes.infer(
+    ...     linearize.forest(z),
+    ...     {x: shapes.Spec((100, 1), np.dtype(np.float64)), y: shapes.Spec((1, 10), np.dtype(np.float32))},
+    ...     dispatch.operations,
+    ... )
+    >>> specs[z]
+    Spec(shape=(10,), dtype=dtype('int64'))
+    >>> specs[z].nbytes
+    80
+
+Inference follows the NumPy semantics: we broadcast shapes like NumPy does
+and we obtain dtypes by invoking the functions implementing the operations,
+which the caller passes (see `operations`), on empty arrays, so the inferred
+dtypes are the ones the backend produces (e.g., when passing the NumPy
+backend `dispatch.operations`). Incompatible shapes cause `infer` to raise a
+`ShapeError` naming the offending node, before any computation takes place.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Mapping, Sequence
+
+import numpy as np
+
+from . import graph, pretty
+from .operations import Operations
+
+
+class ShapeError(Exception):
+    """Raised when we cannot infer the shape or the dtype of a node."""
+
+
+@dataclass(frozen=True)
+class Spec:
+    """
+    Shape and dtype of a node value.
+
+    Attributes
+    ----------
+        shape: The shape of the value.
+        dtype: The dtype of the value.
+    """
+
+    shape: tuple[int, ...]
+    dtype: np.dtype
+
+    @property
+    def size(self) -> int:
+        """Return the number of elements of the value."""
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def nbytes(self) -> int:
+        """Return the estimated size in bytes of the value."""
+        return self.size * self.dtype.itemsize
+
+    @classmethod
+    def of(cls, value: np.ndarray | graph.Scalar) -> Spec:
+        """Return the spec of the given value."""
+        value = np.asarray(value)
+        return cls(value.shape, value.dtype)
+
+
+def infer(
+    plan: Sequence[graph.Node],
+    inputs: Mapping[graph.Node, Spec],
+    operations: Operations,
+) -> dict[graph.Node, Spec]:
+    """Infer the shape and dtype of each node in the plan.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        inputs: The specs of the placeholders. Like the executor state, this
+            mapping may also override the spec of any other node. Placeholders
+            without a spec use the spec of their default value.
+        operations: The functions implementing the operations.
+
+    Returns
+    -------
+        A mapping from each node in the plan to its spec.
+
+    Raises
+    ------
+        ShapeError: If a placeholder has no spec and no default value, if the
+            shapes of the operands of a node are not compatible, or if
+            the operations do not include the node.
+    """
+    specs: dict[graph.Node, Spec] = dict(inputs)
+    for node in plan:
+        if node not in specs:
+            specs[node] = _infer(node, specs, operations)
+    return specs
+
+
+def nbytes(specs: Mapping[graph.Node, Spec]) -> dict[graph.Node, int]:
+    """Return the estimated size in bytes of the value of each node."""
+    return {node: spec.nbytes for node, spec in specs.items()}
+
+
+def _infer(node: graph.Node, specs: Mapping[graph.Node, Spec], operations: Operations) -> Spec:
+    if isinstance(node, graph.constant):
+        return Spec.of(node.value)
+
+    if isinstance(node, graph.placeholder):
+        if node.default_value is None:
+            raise ShapeError(f"shapes: no spec provided for placeholder '{node.name}' and no default value is set")
+        return Spec.of(node.default_value)
+
+    if isinstance(node, graph.BinaryOp):
+        func = operations.binary.get(type(node))
+        if func is None:
+            raise ShapeError(f"shapes: unsupported binary operation: {type(node)}")
+        return _elementwise(node, func, [specs[node.left], specs[node.right]])
+
+    if isinstance(node, graph.UnaryOp):
+        func = operations.unary.get(type(node))
+        if func is None:
+            raise ShapeError(f"shapes: unsupported unary operation: {type(node)}")
+        return _elementwise(node, func, [specs[node.node]])
+
+    if isinstance(node, graph.where):
+        operands = [specs[node.condition], specs[node.then], specs[node.otherwise]]
+        return _elementwise(node, np.where, operands)
+
+    if isinstance(node, graph.multi_clause_where):
+        conditions = [specs[cond] for cond, _ in node.clauses]
+        values = [specs[value] for _, value in node.clauses]
+        default = specs[node.default_value]
+
+        def select(*arrays: np.ndarray) -> np.ndarray:
+            count = len(conditions)
+            return np.select(list(arrays[:count]), list(arrays[count:-1]), default=arrays[-1])
+
+        return _elementwise(node, select, conditions + values + [default])
+
+    if isinstance(node, graph.AxisOp):
+        return _axis(node, specs[node.node], operations)
+
+    if isinstance(node, graph.take):
+        indices = specs[node.indices]
+        if indices.dtype.kind not in "iu":
+            raise ShapeError(f"shapes: non-integer indices for '{_describe(node)}'")
+        return Spec(indices.shape, np.asarray(node.table).dtype)
+
+    raise ShapeError(f"shapes: unsupported node type: {type(node)}")
+
+
+def _elementwise(node: graph.Node, func: Callable, operands: list[Spec]) -> Spec:
+    try:
+        shape = np.broadcast_shapes(*(spec.shape for spec in operands))
+    except ValueError:
+        shapes = ", ".join(str(spec.shape) for spec in operands)
+        raise ShapeError(f"shapes: cannot broadcast operands with shapes {shapes} in '{_describe(node)}'")
+    return Spec(shape, _probe(node, func, [np.empty(0, spec.dtype) for spec in operands]))
+
+
+def _axis(node: graph.AxisOp, operand: Spec, operations: Operations) -> Spec:
+    func = operations.axes.get(type(node))
+    if func is None:
+        raise ShapeError(f"shapes: unsupported axis operation: {type(node)}")
+
+    # Apply the operation to a single-element array with the operand's rank
+    # to validate the axis and obtain the result rank and dtype
+    ones = _probe_value(node, func, np.zeros((1,) * len(operand.shape), operand.dtype), node.axis)
+
+    # When the operation returns a view, applying it to a zero-strided
+    # array with the operand's shape gives us the result shape for free
+    if isinstance(node, graph.expand_dims):
+        dummy = np.broadcast_to(np.zeros((), operand.dtype), operand.shape)
+        return Spec(func(dummy, node.axis).shape, ones.dtype)
+
+    # Otherwise, we are reducing, so we remove the reduced axes
+    axes = np.lib.array_utils.normalize_axis_tuple(node.axis, len(operand.shape))
+    shape = tuple(size for index, size in enumerate(operand.shape) if index not in axes)
+    return Spec(shape, ones.dtype)
+
+
+def _probe(node: graph.Node, func: Callable, arrays: list[np.ndarray]) -> np.dtype:
+    return _probe_value(node, func, *arrays).dtype
+
+
+def _probe_value(node: graph.Node, func: Callable, *args) -> np.ndarray:
+    try:
+        with np.errstate(all="ignore"):
+            return np.asarray(func(*args))
+    except (TypeError, ValueError, np.exceptions.AxisError) as exc:
+        raise ShapeError(f"shapes: invalid operands for '{_describe(node)}': {exc}") from exc
+
+
+def _describe(node: graph.Node) -> str:
+    return node.name or pretty.format(node)
@@ -0,0 +1,257 @@
+"""Constant folding and algebraic simplification for computation graphs.
+
+Models often contain subexpressions that only depend on constants (e.g.,
+products of constant indexes) or that can be expressed more cheaply. Without
+this pass, the executor recomputes them as NumPy operations on every evaluation.
+
+This pass performs the following rewrites:
+
+1. constant folding: nodes whose inputs are all constants become constants;
+
+2. identities: `x * 1`, `1 * x`, `x + 0`, `0 + x`, `x - 0`, `x / 1` and
+`x ** 1` become `x`, while `x ** 2` becomes `x * x`;
+
+3. division by a constant `c` becomes multiplication by `1 / c`;
+
+4. products are re-associated such that all their constant factors are
+combined into a single constant, which we multiply with the first non-constant
+factor, before the result is broadcast against the other factors.
+
+We only re-associate through multiplications that have a single consumer, because
+otherwise we would need to compute the shared product twice.
+
+Note that (2) assumes that the identity does not change the dtype of `x`
+(e.g., `x * 1.0` produces a float array when `x` is an integer array) and that
+(3) and (4) may change results by a few units in the last place, because
+floating-point arithmetic is not associative.
+
+We fold constants using the functions implementing the operations, which the
+caller passes (see `operations`), such that folded values are the same values
+the backend would have computed. We never fold or
+simplify nodes carrying debug flags, to keep tracepoints and breakpoints intact,
+nor the nodes passed using `keep` (e.g., formula indexes, whose values callers
+may override), which we only rebuild using the simplified inputs.
+
+Like other passes (see `rewrite`), this pass does not mutate the graph
+and returns a mapping from the original nodes to their replacements:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, pretty, simplify
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import dispatch
+    >>> x = graph.placeholder("x")
+    >>> y = x * 2.0 / (graph.constant(4.0) * 5.0)
+    >>> mapping = simplify.forest(y, operations=dispatch.operations)
+    >>> print(pretty.format(mapping[y]))
+    x * 0.1
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from . import graph, linearize, rewrite
+from .operations import Operations
+
+
+@dataclass(frozen=True)
+class _Product:
+    """Flattened representation of a single-consumer product."""
+
+    factors: tuple[graph.Node, ...]
+    constant: graph.Scalar | None
+
+
+def forest(*leaves: graph.Node, operations: Operations, keep: Iterable[graph.Node] = ()) -> rewrite.Mapping:
+    """Simplify the forest rooted at the given leaves.
+
+    Args:
+        *leaves: The output nodes of the computation forest.
+        operations: The functions implementing the operations, which we use to fold constants.
+        keep: Nodes that must not be folded or simplified.
+
+    Returns
+    -------
+        A mapping from each node reachable from the leaves to the node
+        replacing it. Nodes that do not need replacing map to themselves.
+
+    Raises
+    ------
+        ValueError: If a cycle is detected in the graph.
+        TypeError: If an unknown node type is encountered.
+    """
+    plan = linearize.forest(*leaves)
+
+    # Count the consumers of each node, considering outputs as consumers
+    uses: dict[graph.Node, int] = {}
+    for node in plan:
+        for dep in rewrite.inputs(node):
+            uses[dep] = uses.get(dep, 0) + 1
+    for node in leaves:
+        uses[node] = uses.get(node, 0) + 1
+
+    mapping: rewrite.Mapping = {}
+    products: dict[graph.Node, _Product] = {}
+    kept = set(keep)
+    for node in plan:
+        new_inputs = [mapping[dep] for dep in rewrite.inputs(node)]
+        if node in kept:
+            mapping[node] = rewrite.rebuild(node, new_inputs)
+            continue
+        replacement = _simplify(node, new_inputs, products, operations)
+        mapping[node] = replacement
+
+        # Remember single-consumer products such that consumers can flatten them
+        if replacement in products and (uses[node] > 1 or replacement.flags != 0):
+            del products[replacement]
+
+    return mapping
+
+
+def _simplify(
+    node: graph.Node,
+    inputs: list[graph.Node],
+    products: dict[graph.Node, _Product],
+    operations: Operations,
+) -> graph.Node:
+    if node.flags != 0:
+        return rewrite.rebuild(node, inputs)
+
+    folded = _fold(node, inputs, operations)
+    if folded is not None:
+        return folded
+
+    if isinstance(node, graph.multiply):
+        return _product(node, inputs[0], inputs[1], None, products)
+
+    if isinstance(node, graph.divide):
+        divisor = _numeric_value(inputs[1])
+        if divisor is not None and divisor != 0:
+            reciprocal = _call(np.divide, [1.0, divisor])
+            return _product(node, inputs[0], None, reciprocal, products)
+
+    if isinstance(node, graph.add):
+        if _numeric_value(inputs[1]) == 0:
+            return inputs[0]
+        if _numeric_value(inputs[0]) == 0:
+            return inputs[1]
+
+    if isinstance(node, graph.subtract):
+        if _numeric_value(inputs[1]) == 0:
+            return inputs[0]
+
+    if isinstance(node, graph.power):
+        exponent = _numeric_value(inputs[1])
+        if exponent == 1:
+            return inputs[0]
+        if exponent == 2:
+            return _product(node, inputs[0], inputs[0], None, products)
+
+    return rewrite.rebuild(node, inputs)
+
+
+def _product(
+    node: graph.Node,
+    left: graph.Node,
+    right: graph.Node | None,
+    constant: graph.Scalar | None,
+    products: dict[graph.Node, _Product],
+) -> graph.Node:
+    # 1. collect the factors and the constants
+    factors: list[graph.Node] = []
+    constants: list[graph.Scalar] = [] if constant is None else [constant]
+    for operand in (left, right):
+        if operand is None:
+            continue
+        value = _numeric_value(operand)
+        if value is not None:
+            constants.append(value)
+            continue
+        product = products.get(operand)
+        if product is None:
+            factors.append(operand)
+            continue
+        factors.extend(product.factors)
+        if product.constant is not None:
+            constants.append(product.constant)
+
+    # 2. combine the constants and drop the constant if it's one
+    combined: graph.Scalar | None = None
+    for value in constants:
+        combined = value if combined is None else _call(np.multiply, [combined, value])
+    if combined is not None and combined == 1:
+        combined = None
+
+    # 3. handle the degenerate cases
+    if not factors:
+        assert combined is not None
+        return graph.constant(combined, node.name)
+    if len(factors) == 1 and combined is None:
+        return factors[0]
+
+    # 4. avoid creating new nodes when there are no constants to combine
+    if not constants and right is not None:
+        if isinstance(node, graph.multiply):
+            result = rewrite.rebuild(node, [left, right])
+        else:
+            result = graph.multiply(left, right)
+            result.name = node.name
+        products[result] = _Product(tuple(factors), None)
+        return result
+
+    # 5. multiply the combined constant with the first factor and then
+    # multiply the result by all the other factors
+    result = factors[0]
+    if combined is not None:
+        result = graph.multiply(result, graph.constant(combined))
+    for factor in factors[1:]:
+        result = graph.multiply(result, factor)
+    result.name = node.name
+    products[result] = _Product(tuple(factors), combined)
+    return result
+
+
+def _fold(node: graph.Node, inputs: list[graph.Node], operations: Operations) -> graph.constant | None:
+    """Return the folded constant, or None if the node cannot be folded."""
+    if not inputs or not all(isinstance(inp, graph.constant) for inp in inputs):
+        return None
+    values = [inp.value for inp in inputs if isinstance(inp, graph.constant)]
+
+    if isinstance(node, graph.BinaryOp):
+        func = operations.binary.get(type(node))
+        if func is None:
+            return None
+        return graph.constant(_call(func, values), node.name)
+
+    if isinstance(node, graph.UnaryOp):
+        func = operations.unary.get(type(node))
+        if func is None:
+            return None
+        return graph.constant(_call(func, values), node.name)
+
+    if isinstance(node, graph.where):
+        return graph.constant(_call(np.where, values), node.name)
+
+    if isinstance(node, graph.multi_clause_where):
+        conditions = [np.asarray(value) for value in values[0:-1:2]]
+        choices = [np.asarray(value) for value in values[1:-1:2]]
+        return graph.constant(np.select(conditions, choices, default=np.asarray(values[-1])).item(), node.name)
+
+    # Note: we do not fold axis operations because they change the shape
+    return None
+
+
+def _call(func, values: list) -> graph.Scalar:
+    """Call the NumPy function with the scalar values and return a scalar."""
+    with np.errstate(all="ignore"):
+        return np.asarray(func(*[np.asarray(value) for value in values])).item()
+
+
+def _numeric_value(node: graph.Node) -> graph.Scalar | None:
+    """Return the value of a non-boolean constant node, or None."""
+    if isinstance(node, graph.constant) and not isinstance(node.value, bool):
+        return node.value
+    return None
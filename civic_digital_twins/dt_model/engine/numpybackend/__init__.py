@@ -14,6 +14,22 @@ Key Components
 - dispatch: Maps symbolic operations from the frontend graph to their
   corresponding NumPy implementations through dispatch tables.
 
+- memory: Provides a pool recycling the buffers of released intermediate
+  values, such that ufuncs can write their results into them.
+
+- parallel: Evaluates independent nodes concurrently using a thread pool.
+
+- precision: Defines floating-point precision policies (e.g., float32).
+
+- blocks: Splits large elementwise operations into row blocks computed
+  concurrently by a thread pool.
+
+- lazy: Evaluates the branches of conditional nodes only where their
+  conditions select them, skipping the branches no element selects.
+
+- profiling: Records the wall time, shape, dtype and allocated bytes of
+  each evaluated node, exporting them as a table or a Chrome trace.
+
 - debug: Provides utilities for tracing and visualizing graph execution,
   helping with troubleshooting and performance analysis.
 
@@ -0,0 +1,185 @@
+"""Intra-operation parallelism for large elementwise operations.
+
+A single NumPy call (e.g., `np.multiply` over a grid x grid x ensemble array)
+runs on a single core. Since elementwise operations compute each output
+element independently, we can partition the output along its leading axis
+into row blocks and compute the blocks concurrently using threads, given
+that NumPy releases the GIL while operating on large arrays.
+
+The `Splitter` class implements this strategy for the binary and unary
+ufuncs in the dispatch tables, as well as for `where` and `multi_clause_where`,
+and for arbitrary elementwise functions (e.g., scipy distribution cdfs).
+Operands whose leading axis is broadcast (i.e., of size one, or missing)
+are passed whole to each block. Outputs smaller than a threshold take the
+usual single-threaded path, because, for them, the overhead of
+dispatching blocks to threads would dominate.
+
+To enable row-block parallelism, create the executor state with a splitter:
+
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import blocks, executor
+    >>> state = executor.State(values={x: np.zeros((1000, 1000))}, blocks=blocks.Splitter(workers=8))
+
+The results are identical to the ones of the single-threaded path, since each
+output element is computed by the same function using the same inputs.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 1 << 20
+"""Minimum size in bytes of the outputs we split into row blocks."""
+
+
+class Splitter:
+    """
+    Splits large elementwise operations into row blocks computed by threads.
+
+    Attributes
+    ----------
+        workers: The number of threads (and of row blocks).
+        threshold: Minimum size in bytes of the outputs we split.
+    """
+
+    def __init__(self, workers: int | None = None, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.threshold = threshold
+
+    def ufunc(self, func: Callable, operands: Sequence[np.ndarray], out: np.ndarray | None = None) -> np.ndarray | None:
+        """Compute func(*operands) by row blocks, optionally writing into out.
+
+        Returns None if func is not a ufunc or the result is too small to
+        split, in which case the caller should invoke func directly.
+        """
+        if not isinstance(func, np.ufunc) or func.nout != 1:
+            return None
+        try:
+            dtype = func.resolve_dtypes(tuple(operand.dtype for operand in operands) + (None,))[-1]
+        except (TypeError, ValueError):
+            return None
+        shape = self._shape(operands, dtype)
+        if shape is None:
+            return None
+        if out is None:
+            out = np.empty(shape, dtype)
+        self._run(lambda block, lo, hi: func(*self._slice(operands, shape, lo, hi), out=block), out)
+        return out
+
+    def where(self, condition: np.ndarray, then: np.ndarray, otherwise: np.ndarray) -> np.ndarray | None:
+        """Compute np.where(condition, then, otherwise) by row blocks, or return None."""
+        dtype = np.where(np.empty(0, bool), np.empty(0, then.dtype), np.empty(0, otherwise.dtype)).dtype
+        operands = (condition, then, otherwise)
+        shape = self._shape(operands, dtype)
+        if shape is None:
+            return None
+
+        def compute(block: np.ndarray, lo: int, hi: int) -> None:
+            cond, yes, no = self._slice(operands, shape, lo, hi)
+            block[...] = np.where(cond, yes, no)
+
+        out = np.empty(shape, dtype)
+        self._run(compute, out)
+        return out
+
+    def select(
+        self,
+        conditions: Sequence[np.ndarray],
+        values: Sequence[np.ndarray],
+        default: np.ndarray,
+    ) -> np.ndarray | None:
+        """Compute np.select(conditions, values, default=default) by row blocks, or return None."""
+        empty = [np.empty(0, operand.dtype) for operand in values]
+        dtype = np.select([np.empty(0, bool)] * len(empty), empty, default=np.empty(0, default.dtype)).dtype
+        operands = (*conditions, *values, default)
+        shape = self._shape(operands, dtype)
+        if shape is None:
+            return None
+        count = len(conditions)
+
+        def compute(block: np.ndarray, lo: int, hi: int) -> None:
+            sliced = self._slice(operands, shape, lo, hi)
+            block[...] = np.select(sliced[:count], sliced[count:-1], default=sliced[-1])
+
+        out = np.empty(shape, dtype)
+        self._run(compute, out)
+        return out
+
+    def map(self, func: Callable[[np.ndarray], np.ndarray], value: np.ndarray) -> np.ndarray:
+        """Compute the elementwise function func(value) by row blocks.
+
+        Use this method for elementwise functions outside the dispatch
+        tables (e.g., the cdf of a scipy distribution). Small values take
+        the single-threaded path.
+        """
+        value = np.asarray(value)
+        if self._shape([value], value.dtype) is None:
+            return func(value)
+        pool = _thread_pool(self.workers)
+        futures = [pool.submit(func, value[lo:hi]) for lo, hi in self._bounds(value.shape[0])]
+        return np.concatenate([np.asarray(future.result()) for future in futures])
+
+    def _shape(self, operands: Sequence[np.ndarray], dtype: np.dtype) -> tuple[int, ...] | None:
+        """Return the output shape, or None if we should not split the operation."""
+        try:
+            shape = np.broadcast_shapes(*(operand.shape for operand in operands))
+        except ValueError:
+            # Let NumPy report the error on the single-threaded path
+            return None
+        if self.workers < 2 or len(shape) == 0 or shape[0] < 2 or dtype.hasobject:
+            return None
+        if int(np.prod(shape, dtype=np.int64)) * dtype.itemsize < self.threshold:
+            return None
+        return shape
+
+    @staticmethod
+    def _slice(operands: Sequence[np.ndarray], shape: tuple[int, ...], lo: int, hi: int) -> list[np.ndarray]:
+        """Return the rows [lo, hi) of each operand, leaving broadcast operands whole."""
+        return [
+            operand[lo:hi] if operand.ndim == len(shape) and operand.shape[0] != 1 else operand for operand in operands
+        ]
+
+    def _run(self, compute: Callable[[np.ndarray, int, int], object], out: np.ndarray) -> None:
+        """Invoke compute for each row block of out, using the thread pool."""
+        pool = _thread_pool(self.workers)
+        futures = [pool.submit(compute, out[lo:hi], lo, hi) for lo, hi in self._bounds(out.shape[0])]
+        for future in futures:
+            future.result()
+
+    def _bounds(self, rows: int) -> list[tuple[int, int]]:
+        """Partition the given number of rows into evenly sized blocks."""
+        count = min(self.workers, rows)
+        bounds = [rows * index // count for index in range(count + 1)]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+
+_thread_pools: dict[int, ThreadPoolExecutor] = {}
+"""Thread pools shared by all the splitters, indexed by number of workers."""
+
+_thread_pools_lock = threading.Lock()
+"""Protects access to the _thread_pools."""
+
+
+def _reset_after_fork() -> None:
+    # Note: the threads of the pools do not survive forking
+    global _thread_pools_lock
+    _thread_pools.clear()
+    _thread_pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _thread_pool(workers: int) -> ThreadPoolExecutor:
+    with _thread_pools_lock:
+        pool = _thread_pools.get(workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="numpybackend-blocks")
+            _thread_pools[workers] = pool
+        return pool
@@ -11,7 +11,15 @@ def print_graph_node(node: graph.Node) -> None:
     print(f"name: {node.name}")
     print(f"id: {node.id}")
     print(f"type: {node.__class__}")
-    print(f"formula: {pretty.format(node)}")
+    # Note: format_dag takes linear time even when the graph shares
+    # many subexpressions, which keeps tracing large models usable
+    lines = pretty.format_dag(node).splitlines()
+    if len(lines) == 1:
+        print(f"formula: {lines[0]}")
+        return
+    print("formula:")
+    for line in lines:
+        print(f"    {line}")
 
 
 def print_evaluated_node(value: np.ndarray, cached: bool = False) -> None:
@@ -10,6 +10,7 @@ from typing import Callable, TypeAlias
 import numpy as np
 
 from ..frontend import graph
+from ..frontend.operations import Operations
 
 # Type aliases for operation function signatures
 BinaryOpFunc: TypeAlias = Callable[[np.ndarray, np.ndarray], np.ndarray]
@@ -110,3 +111,7 @@ transformations that affect the array's dimensionality or reduce values
 along the specified axis.
 
 Add entries to this table to support more axis operations."""
+
+
+operations = Operations(binary=binary_operations, unary=unary_operations, axes=axes_operations)
+"""The dispatch tables, for the frontend passes evaluating operations (see `frontend.operations`)."""
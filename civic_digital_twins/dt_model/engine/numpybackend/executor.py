@@ -12,18 +12,25 @@ This approach offers several advantages over walking the AST:
 
 The executor expects all placeholder values to be provided in the initial
 state and evaluates each node exactly once, storing results for later reuse.
+
+Callers evaluating the same nodes many times may use `bind` to resolve the
+dispatch of each node once, obtaining a flat list of callables to invoke.
 """
 
+from __future__ import annotations
+
+import time
 from dataclasses import dataclass
 from typing import (
     Callable,
+    Iterable,
     cast,
 )
 
 import numpy as np
 
 from ..frontend import graph
-from . import debug, dispatch
+from . import blocks, debug, dispatch, memory, precision, profiling
 
 
 class NodeValueNotFound(Exception):
@@ -57,13 +64,27 @@ class State:
     ----------
         values: A dictionary caching the result of the computation.
         flags: Bitmask containing debug flags (e.g., graph.NODE_FLAG_BREAK).
+        pool: Optional pool for reusing the buffers of released values.
+        precision: Optional floating-point precision policy. When set, we
+            cast the floating-point values provided to the constructor.
+        blocks: Optional splitter computing large elementwise operations
+            by row blocks using multiple threads.
+        hook: Optional callable invoked after evaluating each node (e.g., a
+            `profiling.Profiler` measuring the time spent in each node).
     """
 
     values: dict[graph.Node, np.ndarray]
     flags: int = 0
+    pool: memory.Pool | None = None
+    precision: precision.Policy | None = None
+    blocks: blocks.Splitter | None = None
+    hook: profiling.Hook | None = None
 
     def __post_init__(self):
-        """Print the placeholder values provided to the constructor."""
+        """Apply the precision policy and print the values provided to the constructor."""
+        if self.precision is not None:
+            for node, value in self.values.items():
+                self.values[node] = self.precision.cast(value)
         if self.flags & graph.NODE_FLAG_TRACE != 0:
             nodes = sorted(self.values.keys(), key=lambda n: n.id)
             for node in nodes:
@@ -121,8 +142,13 @@ def evaluate(state: State, node: graph.Node) -> np.ndarray:
     if tracing:
         debug.print_graph_node(node)
 
-    # 3. evaluate the node proper
-    result = _evaluate(state, node)
+    # 3. evaluate the node proper, possibly measuring the time it takes
+    if state.hook is None:
+        result = _evaluate(state, node)
+    else:
+        start = time.perf_counter_ns()
+        result = _evaluate(state, node)
+        state.hook(node, result, start, time.perf_counter_ns())
 
     # 4. check whether we need to print the computation result
     if tracing:
@@ -135,13 +161,35 @@ def evaluate(state: State, node: graph.Node) -> np.ndarray:
 
     # 6. store the node result in the state
     state.values[node] = result
+    if state.pool is not None:
+        state.pool.track(result)
 
     # 7. return the result
     return result
 
 
+def release(state: State, nodes: Iterable[graph.Node]) -> None:
+    """Drop the values of the given nodes from the state.
+
+    Use this function along with `frontend.liveness.releases` to drop
+    intermediate values as soon as no later node needs them, thus reducing
+    the peak memory usage. Nodes without a value are ignored. If the state
+    has a pool, the pool may reuse the buffers of the released values.
+
+    Args:
+        state: The current executor state.
+        nodes: The nodes whose values to drop.
+    """
+    for node in nodes:
+        value = state.values.pop(node, None)
+        if value is not None and state.pool is not None:
+            state.pool.release(value)
+
+
 def _eval_constant_op(state: State, node: graph.Node) -> np.ndarray:
     node = cast(graph.constant, node)
+    if state.precision is not None:
+        return state.precision.constant(node.value)
     return np.asarray(node.value)
 
 
@@ -150,6 +198,8 @@ def _eval_placeholder_default(state: State, node: graph.Node) -> np.ndarray:
     # here it means we didn't find anything in the state.
     node = cast(graph.placeholder, node)
     if node.default_value is not None:
+        if state.precision is not None:
+            return state.precision.cast(np.asarray(node.default_value))
         return np.asarray(node.default_value)
     raise PlaceholderValueNotProvided(
         f"executor: no value provided for placeholder '{node.name}' and no default value is set"
@@ -160,28 +210,25 @@ def _eval_binary_op(state: State, node: graph.Node) -> np.ndarray:
     node = cast(graph.BinaryOp, node)
     left = state.get_node_value(node.left)
     right = state.get_node_value(node.right)
-    try:
-        return dispatch.binary_operations[type(node)](left, right)
-    except KeyError:
-        raise UnsupportedOperation(f"executor: unsupported binary operation: {type(node)}")
+    return _apply(state, _binary_func(node), left, right)
 
 
 def _eval_unary_op(state: State, node: graph.Node) -> np.ndarray:
     node = cast(graph.UnaryOp, node)
     operand = state.get_node_value(node.node)
-    try:
-        return dispatch.unary_operations[type(node)](operand)
-    except KeyError:
-        raise UnsupportedOperation(f"executor: unsupported unary operation: {type(node)}")
+    return _apply(state, _unary_func(node), operand)
 
 
 def _eval_where_op(state: State, node: graph.Node) -> np.ndarray:
     node = cast(graph.where, node)
-    return np.where(
-        state.get_node_value(node.condition),
-        state.get_node_value(node.then),
-        state.get_node_value(node.otherwise),
-    )
+    condition = state.get_node_value(node.condition)
+    then = state.get_node_value(node.then)
+    otherwise = state.get_node_value(node.otherwise)
+    if state.blocks is not None:
+        result = state.blocks.where(condition, then, otherwise)
+        if result is not None:
+            return result
+    return np.where(condition, then, otherwise)
 
 
 def _eval_multi_clause_where_op(state: State, node: graph.Node) -> np.ndarray:
@@ -192,18 +239,75 @@ def _eval_multi_clause_where_op(state: State, node: graph.Node) -> np.ndarray:
         conditions.append(state.get_node_value(cond))
         values.append(state.get_node_value(value))
     default = state.get_node_value(node.default_value)
+    if state.blocks is not None:
+        result = state.blocks.select(conditions, values, default)
+        if result is not None:
+            return result
     return np.select(conditions, values, default=default)
 
 
+def _eval_take_op(state: State, node: graph.Node) -> np.ndarray:
+    node = cast(graph.take, node)
+    table = np.asarray(node.table)
+    if state.precision is not None:
+        table = state.precision.cast(table)
+    return np.take(table, state.get_node_value(node.indices), mode="clip")
+
+
 def _eval_axis_op(state: State, node: graph.Node) -> np.ndarray:
     node = cast(graph.AxisOp, node)
     operand = state.get_node_value(node.node)
+    return _apply_axis(state, type(node), _axis_func(node), operand, node.axis)
+
+
+def _binary_func(node: graph.BinaryOp) -> Callable:
+    try:
+        return dispatch.binary_operations[type(node)]
+    except KeyError:
+        raise UnsupportedOperation(f"executor: unsupported binary operation: {type(node)}")
+
+
+def _unary_func(node: graph.UnaryOp) -> Callable:
+    try:
+        return dispatch.unary_operations[type(node)]
+    except KeyError:
+        raise UnsupportedOperation(f"executor: unsupported unary operation: {type(node)}")
+
+
+def _axis_func(node: graph.AxisOp) -> Callable:
     try:
-        return dispatch.axes_operations[type(node)](operand, node.axis)
+        return dispatch.axes_operations[type(node)]
     except KeyError:
         raise UnsupportedOperation(f"executor: unsupported axis operation: {type(node)}")
 
 
+def _apply(state: State, func: Callable, *operands: np.ndarray) -> np.ndarray:
+    """Call func with the operands, writing into a pooled buffer and splitting into row blocks if possible."""
+    out = state.pool.output(func, *operands) if state.pool is not None else None
+    if state.blocks is not None:
+        result = state.blocks.ufunc(func, operands, out)
+        if result is not None:
+            return result
+    if out is not None:
+        return func(*operands, out=out)
+    return func(*operands)
+
+
+def _apply_axis(
+    state: State,
+    node_type: type[graph.AxisOp],
+    func: Callable,
+    operand: np.ndarray,
+    axis: graph.Axis,
+) -> np.ndarray:
+    """Call func with the operand and axis, honouring the precision policy for reductions."""
+    if state.precision is not None:
+        result = state.precision.reduce(node_type, operand, axis)
+        if result is not None:
+            return result
+    return func(operand, axis)
+
+
 _EvaluatorFunc = Callable[[State, graph.Node], np.ndarray]
 
 _evaluators: tuple[tuple[type[graph.Node], _EvaluatorFunc], ...] = (
@@ -214,14 +318,137 @@ _evaluators: tuple[tuple[type[graph.Node], _EvaluatorFunc], ...] = (
     (graph.where, _eval_where_op),
     (graph.multi_clause_where, _eval_multi_clause_where_op),
     (graph.AxisOp, _eval_axis_op),
+    (graph.take, _eval_take_op),
 )
 
+_evaluators_by_type: dict[type[graph.Node], _EvaluatorFunc | None] = {}
+"""Caches the evaluator resolved for each concrete node type."""
+
+
+def _evaluator(node_type: type[graph.Node]) -> _EvaluatorFunc | None:
+    try:
+        return _evaluators_by_type[node_type]
+    except KeyError:
+        pass
+    # Resolve the evaluator walking the table once per node type
+    result = None
+    for base, evaluator in _evaluators:
+        if issubclass(node_type, base):
+            result = evaluator
+            break
+    _evaluators_by_type[node_type] = result
+    return result
+
 
 def _evaluate(state: State, node: graph.Node) -> np.ndarray:
-    # Attempt to match with every possible evaluator
-    for node_type, evaluator in _evaluators:
-        if isinstance(node, node_type):
-            return evaluator(state, node)
+    evaluator = _evaluator(type(node))
+    if evaluator is None:
+        raise UnsupportedNodeType(f"executor: unsupported node type: {type(node)}")
+    return evaluator(state, node)
+
+
+Step = Callable[[State], np.ndarray]
+"""Evaluates a specific node given the current state (see `bind`)."""
+
+
+def bind(node: graph.Node) -> Step:
+    """Return a callable evaluating the given node.
 
-    # Otherwise, just bail
-    raise UnsupportedNodeType(f"executor: unsupported node type: {type(node)}")
+    The returned callable behaves like `evaluate(state, node)`, except that
+    we resolve the NumPy function implementing the node and its operands
+    ahead of time. Therefore, a plan can bind each node once and evaluate
+    it repeatedly without any dispatch overhead, which matters for graphs
+    with many small nodes. Nodes carrying debug flags, as well as states
+    with debug flags, fall back to `evaluate`, to honour the flags.
+
+    Binding never fails: if the node is not supported, evaluating the returned
+    callable raises the same exceptions `evaluate` would raise.
+
+    Args:
+        node: The node to bind.
+
+    Returns
+    -------
+        A callable taking the executor state and returning the node value.
+    """
+    try:
+        compute = _bind_compute(node)
+    except (UnsupportedNodeType, UnsupportedOperation):
+        compute = None
+    if compute is None:
+        return lambda state: evaluate(state, node)
+
+    def step(state: State) -> np.ndarray:
+        values = state.values
+        if node in values:
+            return values[node]
+        if node.flags | state.flags != 0:
+            return evaluate(state, node)
+        if state.hook is None:
+            result = compute(state)
+        else:
+            start = time.perf_counter_ns()
+            result = compute(state)
+            state.hook(node, result, start, time.perf_counter_ns())
+        values[node] = result
+        if state.pool is not None:
+            state.pool.track(result)
+        return result
+
+    return step
+
+
+def _bind_compute(node: graph.Node) -> Step | None:
+    """Return a callable computing the node value, or None to use `evaluate`."""
+    if isinstance(node, graph.constant):
+        value = node.value
+        return lambda state: np.asarray(value) if state.precision is None else state.precision.constant(value)
+
+    if isinstance(node, graph.BinaryOp):
+        binary = _binary_func(node)
+        left, right = node.left, node.right
+
+        def compute_binary(state: State) -> np.ndarray:
+            values = state.values
+            if left in values and right in values:
+                if state.pool is None and state.blocks is None:
+                    return binary(values[left], values[right])
+                return _apply(state, binary, values[left], values[right])
+            # Raise the appropriate exception
+            return _apply(state, binary, state.get_node_value(left), state.get_node_value(right))
+
+        return compute_binary
+
+    if isinstance(node, graph.UnaryOp):
+        unary = _unary_func(node)
+        operand = node.node
+
+        def compute_unary(state: State) -> np.ndarray:
+            values = state.values
+            if operand in values and state.pool is None and state.blocks is None:
+                return unary(values[operand])
+            return _apply(state, unary, state.get_node_value(operand))
+
+        return compute_unary
+
+    if isinstance(node, graph.AxisOp):
+        axis_func = _axis_func(node)
+        operand, axis, node_type = node.node, node.axis, type(node)
+        return lambda state: _apply_axis(state, node_type, axis_func, state.get_node_value(operand), axis)
+
+    if isinstance(node, graph.take):
+        table, indices = np.asarray(node.table), node.indices
+
+        def compute_take(state: State) -> np.ndarray:
+            values = table if state.precision is None else state.precision.cast(table)
+            return np.take(values, state.get_node_value(indices), mode="clip")
+
+        return compute_take
+
+    if isinstance(node, (graph.where, graph.multi_clause_where)):
+        evaluator = _evaluator(type(node))
+        assert evaluator is not None
+        return lambda state: evaluator(state, node)
+
+    # Note: placeholders without a value use the generic path
+    return None
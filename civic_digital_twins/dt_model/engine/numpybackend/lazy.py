@@ -0,0 +1,310 @@
+"""Masked, lazy evaluation of conditional nodes.
+
+The executor evaluates `where` and `multi_clause_where` nodes by computing
+each branch over the full arrays and then selecting the elements. Therefore,
+expensive branches (e.g., `exp` or `log` over the grid) run even where their
+condition is false. This module provides an alternative evaluation strategy
+computing each branch only where its mask is true.
+
+A node is private to a branch when only that branch (directly or through
+other private nodes) needs its value. The `schedule` function removes such
+nodes from the plan and binds each conditional node to a step that:
+
+1. computes the mask of each branch (for `multi_clause_where`, the first
+true clause wins, and the default value applies where no clause is true);
+
+2. skips the branches whose mask is all false, evaluates the branches whose
+mask is all true over the full arrays, and evaluates the other branches over
+the compressed elements selected by their mask;
+
+3. scatters the value of each branch into the result.
+
+Because we compress the values by broadcasting them to the result shape,
+only elementwise nodes (see `ELEMENTWISE`) may be private, while all the
+other nodes (e.g., reductions) remain in the plan:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import executor, lazy
+    >>> x = graph.placeholder("x")
+    >>> y = graph.where(x > 0, graph.log(x), graph.constant(0.0))
+    >>> schedule = lazy.schedule(linearize.forest(y), keep=[y])
+    >>> state = executor.State(values={x: np.array([-1.0, 1.0, np.e])})
+    >>> for step in schedule.steps:
+    ...     step(state)
+    >>> state.values[y]
+    array([0., 0., 1.])
+
+Here, `log(x)` is private to the `then` branch, so we only compute it for
+the positive elements, and we never store its value into the state.
+
+The results are identical to the ones of the executor, except that we do not
+compute branches that the executor would compute and then discard (e.g., we
+do not warn about the logarithm of negative numbers in the example above).
+When the state has a hook (see `profiling`), the hook observes the nodes
+private to the branches, evaluated over the compressed elements, while the
+conditional nodes only report the time spent outside their branches (i.e.,
+computing the masks and compressing and scattering the values), such that
+the profile does not count the time of the branches twice.
+
+Compressing the values has a cost, therefore we only evaluate lazily the
+conditional nodes having a private branch computing something, and we
+evaluate the other ones using `executor.bind`.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from ..frontend import graph, liveness, rewrite
+from . import executor
+
+ELEMENTWISE: tuple[type[graph.Node], ...] = (
+    graph.constant,
+    graph.BinaryOp,
+    graph.UnaryOp,
+    graph.where,
+    graph.multi_clause_where,
+    graph.take,
+)
+"""Node types whose value we can compute over compressed elements."""
+
+_Scope = tuple[graph.Node, int]
+"""A branch of a conditional node, identified by the node and the branch index."""
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    Plan evaluating conditional nodes lazily.
+
+    Attributes
+    ----------
+        nodes: The nodes evaluated using `steps`, in topological order.
+        releases: The nodes that are not needed anymore after each step.
+        steps: The callables evaluating each node. The steps evaluating
+            conditional nodes also evaluate the nodes private to their branches.
+    """
+
+    nodes: tuple[graph.Node, ...]
+    releases: tuple[tuple[graph.Node, ...], ...]
+    steps: tuple[executor.Step, ...]
+
+
+def schedule(plan: Sequence[graph.Node], keep: Iterable[graph.Node] = ()) -> Schedule:
+    """Schedule the given plan evaluating conditional nodes lazily.
+
+    Args:
+        plan: The topologically sorted nodes (see `linearize.forest`).
+        keep: Nodes whose value must be stored into the state (e.g., the
+            outputs), which therefore cannot be private to a branch.
+    """
+    owners = _owners(plan, set(keep))
+
+    # Note: we use dicts because nodes override `==`
+    private: dict[_Scope, list[graph.Node]] = {}
+    for node, scope in owners.items():
+        private.setdefault(scope, []).append(node)
+
+    # Evaluating branches only containing constants lazily is not worth
+    # it, hence we move their nodes to the enclosing scope
+    lazy = {scope[0] for scope, nodes in private.items() if not all(isinstance(n, graph.constant) for n in nodes)}
+    for node, scope in list(owners.items()):
+        while scope is not None and scope[0] not in lazy:
+            scope = owners.get(scope[0])
+        if scope is None:
+            del owners[node]
+        else:
+            owners[node] = scope
+
+    private = {}
+    for node in plan:
+        scope = owners.get(node)
+        if scope is not None:
+            private.setdefault(scope, []).append(node)
+
+    nodes: list[graph.Node] = []
+    steps: dict[graph.Node, executor.Step] = {}
+    for node in plan:
+        branches = _branches(node)
+        scopes = [(node, index) for index in range(len(branches))]
+        if any(scope in private for scope in scopes):
+            members = [private.get(scope, []) for scope in scopes]
+            steps[node] = _bind(node, list(zip(branches, members)), steps, owners)
+        else:
+            steps[node] = executor.bind(node)
+        if node not in owners:
+            nodes.append(node)
+
+    return Schedule(
+        nodes=tuple(nodes),
+        releases=tuple(liveness.releases(nodes, keep=keep)),
+        steps=tuple(steps[node] for node in nodes),
+    )
+
+
+def _conditions(node: graph.Node) -> list[graph.Node]:
+    """Return the conditions of a conditional node."""
+    if isinstance(node, graph.where):
+        return [node.condition]
+    if isinstance(node, graph.multi_clause_where):
+        return [condition for condition, _ in node.clauses]
+    return []
+
+
+def _branches(node: graph.Node) -> list[graph.Node]:
+    """Return the value of each branch of a conditional node."""
+    if isinstance(node, graph.where):
+        return [node.then, node.otherwise]
+    if isinstance(node, graph.multi_clause_where):
+        return [value for _, value in node.clauses] + [node.default_value]
+    return []
+
+
+def _owners(plan: Sequence[graph.Node], keep: set[graph.Node]) -> dict[graph.Node, _Scope]:
+    """Compute the branch each private node belongs to.
+
+    We walk the plan backwards, such that we know the scope of each consumer
+    before its inputs. A node used by several branches belongs to their
+    innermost common enclosing branch, if any.
+    """
+    consumers: dict[graph.Node, list[graph.Node]] = {node: [] for node in plan}
+    for node in plan:
+        for dep in rewrite.inputs(node):
+            consumers[dep].append(node)
+
+    owners: dict[graph.Node, _Scope] = {}
+    for node in reversed(plan):
+        if node in keep or not isinstance(node, ELEMENTWISE) or not consumers[node]:
+            continue
+        scopes = [_scope(consumer, node, owners) for consumer in consumers[node]]
+        scope = _common(scopes, owners)
+        if scope is not None:
+            owners[node] = scope
+    return owners
+
+
+def _scope(consumer: graph.Node, node: graph.Node, owners: dict[graph.Node, _Scope]) -> _Scope | None:
+    """Return the scope in which the consumer needs the value of the node."""
+    branches = [index for index, value in enumerate(_branches(consumer)) if value is node]
+    if len(branches) == 1 and all(condition is not node for condition in _conditions(consumer)):
+        return (consumer, branches[0])
+    return owners.get(consumer)
+
+
+def _common(scopes: list[_Scope | None], owners: dict[graph.Node, _Scope]) -> _Scope | None:
+    """Return the innermost scope enclosing all the given scopes."""
+
+    def _chain(scope: _Scope | None) -> list[_Scope]:
+        result = []
+        while scope is not None:
+            result.append(scope)
+            scope = owners.get(scope[0])
+        return result
+
+    chains = [_chain(scope) for scope in scopes]
+    for candidate in chains[0]:
+        if all(candidate in chain for chain in chains[1:]):
+            return candidate
+    return None
+
+
+def _bind(
+    node: graph.Node,
+    branches: list[tuple[graph.Node, list[graph.Node]]],
+    steps: dict[graph.Node, executor.Step],
+    owners: dict[graph.Node, _Scope],
+) -> executor.Step:
+    """Return a step evaluating the conditional node and the nodes private to its branches."""
+    conditions = _conditions(node)
+
+    # Resolve, for each branch, the steps to run and the values it reads,
+    # which exclude the values private to nested conditional nodes
+    plans: list[tuple[graph.Node, tuple[executor.Step, ...], tuple[graph.Node, ...]]] = []
+    for value, nodes in branches:
+        members = set(nodes)
+        leaves: dict[graph.Node, None] = {}
+        for member in nodes:
+            for dep in rewrite.inputs(member):
+                scope = owners.get(dep)
+                if dep not in members and (scope is None or scope[0] not in members):
+                    leaves[dep] = None
+        if value not in members:
+            leaves[value] = None
+        plans.append((value, tuple(steps[member] for member in nodes), tuple(leaves)))
+
+    def compute(state: executor.State) -> tuple[np.ndarray, int]:
+        """Return the value of the node and the nanoseconds spent evaluating the branches."""
+        values = [np.asarray(state.get_node_value(condition)).astype(bool, copy=False) for condition in conditions]
+        shapes = [value.shape for value in values]
+        for _, _, leaves in plans:
+            shapes.extend(np.shape(state.get_node_value(leaf)) for leaf in leaves)
+        shape = np.broadcast_shapes(*shapes)
+
+        # 1. compute the mask of each branch
+        masks: list[np.ndarray] = []
+        if isinstance(node, graph.where):
+            mask = np.broadcast_to(values[0], shape)
+            masks = [mask, ~mask]
+        else:
+            taken = np.zeros(shape, dtype=bool)
+            for value in values:
+                mask = value & ~taken
+                taken |= mask
+                masks.append(mask)
+            masks.append(~taken)
+
+        # 2. evaluate each branch where its mask is true
+        pieces: list[tuple[np.ndarray, np.ndarray, bool]] = []
+        spent = 0
+        for mask, (value, steps, leaves) in zip(masks, plans):
+            count = np.count_nonzero(mask)
+            full = count == mask.size
+            inputs: dict[graph.Node, np.ndarray] = {}
+            for leaf in leaves:
+                array = np.asarray(state.values[leaf])
+                if full:
+                    inputs[leaf] = array
+                elif count == 0:
+                    # Note: we still evaluate the branch over empty arrays,
+                    # which costs nothing, to obtain the dtype of its value
+                    inputs[leaf] = np.empty((0,), dtype=array.dtype)
+                else:
+                    inputs[leaf] = np.broadcast_to(array, shape)[mask]
+            branch = executor.State(inputs, flags=state.flags, precision=state.precision, hook=state.hook)
+            begin = time.perf_counter_ns()
+            for step in steps:
+                step(branch)
+            spent += time.perf_counter_ns() - begin
+            pieces.append((mask, branch.get_node_value(value), full))
+
+        # 3. scatter the value of each branch into the result
+        result = np.empty(shape, dtype=np.result_type(*(piece for _, piece, _ in pieces)))
+        for mask, piece, full in pieces:
+            if full:
+                np.copyto(result, piece)
+            elif piece.size > 0:
+                result[mask] = piece
+        return result, spent
+
+    def step(state: executor.State) -> np.ndarray:
+        values = state.values
+        if node in values:
+            return values[node]
+        if state.hook is None:
+            result, _ = compute(state)
+        else:
+            # Note: the hook already observed the nodes private to the branches,
+            # hence we only report the time spent outside of them
+            start = time.perf_counter_ns()
+            result, spent = compute(state)
+            state.hook(node, result, start + spent, time.perf_counter_ns())
+        values[node] = result
+        return result
+
+    return step
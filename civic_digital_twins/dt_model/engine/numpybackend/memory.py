@@ -0,0 +1,126 @@
+"""Buffer reuse for the NumPy backend.
+
+By default, each operation allocates a fresh output array. When evaluating
+models over large grids, most intermediate arrays have the same broadcast
+shape and dtype, and allocating them (and faulting in their pages) dominates
+the profiles. The `Pool` defined in this module recycles the buffers of
+intermediate values that are no longer needed, such that subsequent
+operations can write their results into them using the ufunc `out=` argument.
+
+The pool cooperates with the executor as follows:
+
+1. the executor asks the pool for an output buffer before invoking a ufunc
+from `dispatch.binary_operations` or `dispatch.unary_operations`;
+
+2. the executor tells the pool about each value it stores into the state,
+including views (e.g., `expand_dims` results) of pooled buffers;
+
+3. when `executor.release` drops a value from the state, the pool recycles
+its buffer once no other value in the state refers to such a buffer.
+
+The pool is thread safe, such that parallel executors can share it.
+
+Therefore, the pool only reuses buffers when the caller releases values as
+soon as they are not needed (see `frontend.liveness`). Buffers smaller than
+a threshold are not pooled, since allocating them is cheap.
+
+To enable buffer reuse, create the executor state with a pool:
+
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import executor, memory
+    >>> state = executor.State(values={x: np.zeros(1 << 20)}, pool=memory.Pool())
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 1 << 16
+"""Minimum size in bytes of the buffers managed by the pool."""
+
+
+class Pool:
+    """
+    Pool of reusable output buffers.
+
+    Attributes
+    ----------
+        threshold: Minimum size in bytes of the buffers we manage.
+        allocations: Number of buffers we allocated.
+        reuses: Number of times we reused a buffer.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.threshold = threshold
+        self.allocations = 0
+        self.reuses = 0
+        self._free: dict[tuple[tuple[int, ...], np.dtype], list[np.ndarray]] = {}
+        self._owned: dict[int, np.ndarray] = {}
+        self._refs: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def output(self, func: Callable, *operands: np.ndarray) -> np.ndarray | None:
+        """Return a buffer for the result of calling func with the given operands.
+
+        Returns None if func is not a ufunc, if we cannot determine the
+        output shape and dtype, or if the result would be too small.
+        """
+        if not isinstance(func, np.ufunc) or func.nout != 1:
+            return None
+        try:
+            shape = np.broadcast_shapes(*(operand.shape for operand in operands))
+            dtypes = func.resolve_dtypes(tuple(operand.dtype for operand in operands) + (None,))
+        except (TypeError, ValueError):
+            return None
+        dtype = dtypes[-1]
+        if dtype.hasobject or int(np.prod(shape)) * dtype.itemsize < self.threshold:
+            return None
+        return self.empty(shape, dtype)
+
+    def empty(self, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Return an uninitialized buffer with the given shape and dtype."""
+        with self._lock:
+            free = self._free.get((shape, dtype))
+            if free:
+                self.reuses += 1
+                return free.pop()
+            buffer = np.empty(shape, dtype)
+            self.allocations += 1
+            self._owned[id(buffer)] = buffer
+            self._refs[id(buffer)] = 0
+            return buffer
+
+    def track(self, value: np.ndarray) -> None:
+        """Register that the state contains a value that may refer to a pooled buffer."""
+        with self._lock:
+            root = self._root(value)
+            if root is not None:
+                self._refs[id(root)] += 1
+
+    def release(self, value: np.ndarray) -> None:
+        """Register that the state no longer contains the given value.
+
+        When no tracked value refers to the underlying buffer anymore, the
+        buffer becomes available for reuse.
+        """
+        with self._lock:
+            root = self._root(value)
+            if root is None:
+                return
+            refs = self._refs[id(root)] - 1
+            self._refs[id(root)] = max(refs, 0)
+            if refs == 0:
+                self._free.setdefault((root.shape, root.dtype), []).append(root)
+
+    def _root(self, value: np.ndarray) -> np.ndarray | None:
+        """Return the pooled buffer the value refers to, or None."""
+        current = value
+        while current is not None:
+            if isinstance(current, np.ndarray) and self._owned.get(id(current)) is current:
+                return current
+            current = getattr(current, "base", None)
+        return None
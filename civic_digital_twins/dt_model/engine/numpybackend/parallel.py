@@ -0,0 +1,113 @@
+"""Parallel evaluation of computation graphs using a thread pool.
+
+The `executor` module evaluates the nodes of a plan one at a time, in the
+order chosen by `frontend.linearize`. However, models often contain mostly
+independent subgraphs (e.g., the usage of each constraint), and NumPy
+releases the GIL while operating on large arrays. Therefore, we can evaluate
+independent nodes concurrently using threads.
+
+The `evaluate` function in this module counts, for each node in the plan, the
+number of dependencies that have not been evaluated yet, and submits the
+nodes whose count is zero to a `concurrent.futures.ThreadPoolExecutor`. When
+a node completes, we decrement the counts of its consumers and submit the
+consumers that became ready. Each node is evaluated using `executor.evaluate`,
+so the results are identical to the ones of the sequential executor:
+
+    >>> from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import executor, parallel
+    >>> x = graph.placeholder("x")
+    >>> y = graph.exp(x) + graph.log(x)
+    >>> state = executor.State(values={x: np.ones(1 << 20)})
+    >>> parallel.evaluate(state, linearize.forest(y), workers=4)
+
+Because threads have a cost, we evaluate constants and placeholders directly
+in the calling thread. Note that debug output (see `graph.tracepoint`) may
+interleave when multiple traced nodes run concurrently, so prefer the
+sequential executor when debugging.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterable, Sequence
+
+from ..frontend import graph, rewrite
+from . import executor
+
+
+def evaluate(
+    state: executor.State,
+    nodes: Sequence[graph.Node],
+    *,
+    workers: int | None = None,
+    keep: Iterable[graph.Node] | None = None,
+) -> None:
+    """Evaluate the given nodes concurrently.
+
+    Args:
+        state: The current executor state.
+        nodes: The nodes to evaluate. They must include all the dependencies
+            that do not already have a value in the state (see `linearize.forest`).
+        workers: The maximum number of threads to use. When None, we use
+            the default of `concurrent.futures.ThreadPoolExecutor`.
+        keep: When not None, we release the value of each node as soon as
+            all its consumers have been evaluated, except for the nodes in
+            `keep` (see `executor.release`).
+
+    Raises
+    ------
+        Any exception raised by `executor.evaluate`. In such a case, we stop
+        submitting nodes and wait for the running ones to complete.
+    """
+    # Note: we use dicts and sets because nodes override `==`
+    consumers: dict[graph.Node, list[graph.Node]] = {node: [] for node in nodes}
+    inputs: dict[graph.Node, set[graph.Node]] = {}
+    for node in nodes:
+        inputs[node] = {dep for dep in rewrite.inputs(node) if dep in consumers}
+        for dep in inputs[node]:
+            consumers[dep].append(node)
+    waiting = {node: len(inputs[node]) for node in nodes}
+    remaining = {node: len(consumers[node]) for node in nodes}
+    kept = set(keep) if keep is not None else None
+
+    ready = deque(node for node in nodes if waiting[node] == 0)
+
+    def _completed(node: graph.Node) -> None:
+        for consumer in consumers[node]:
+            waiting[consumer] -= 1
+            if waiting[consumer] == 0:
+                ready.append(consumer)
+        if kept is None:
+            return
+        dead = [node] if remaining[node] == 0 else []
+        for dep in inputs[node]:
+            remaining[dep] -= 1
+            if remaining[dep] == 0:
+                dead.append(dep)
+        executor.release(state, (item for item in dead if item not in kept))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="numpybackend") as pool:
+        pending: dict[Future, graph.Node] = {}
+        while ready or pending:
+            while ready:
+                node = ready.popleft()
+                if isinstance(node, (graph.constant, graph.placeholder)):
+                    executor.evaluate(state, node)
+                    _completed(node)
+                    continue
+                pending[pool.submit(executor.evaluate, state, node)] = node
+            if not pending:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = pending.pop(future)
+                try:
+                    future.result()
+                except BaseException:
+                    for other in pending:
+                        other.cancel()
+                    raise
+                _completed(node)
@@ -0,0 +1,97 @@
+"""Floating-point precision policies for the NumPy backend.
+
+By default, the executor computes using the dtypes of the values it receives,
+which are typically float64 (e.g., samples from scipy distributions and
+presence grids built using `np.linspace`) and which it derives from Python
+scalars for constants. When the results only need a few significant digits,
+computing in float32 halves the memory footprint and the memory traffic.
+
+A `Policy` tells the executor which floating-point dtype to use for the
+floating-point placeholder values, for the numeric constants, and for
+accumulating reductions:
+
+- `FLOAT64` computes everything in float64;
+
+- `FLOAT32` computes everything in float32;
+
+- `MIXED` computes elementwise operations in float32, but accumulates
+  reductions in float64, before converting the result back to float32,
+  such that sums over many elements do not lose precision.
+
+To use a policy, create the executor state with it:
+
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import executor, precision
+    >>> state = executor.State(values={x: np.zeros(1 << 20)}, precision=precision.MIXED)
+
+Note that the executor casts the placeholder values when creating the state,
+and that integer, boolean and string values are left untouched, while numeric
+constants (including integer ones) use the policy dtype, such that they do
+not promote float32 arrays back to float64.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from ..frontend import graph
+
+reductions: dict[type[graph.AxisOp], Callable[..., np.ndarray]] = {
+    graph.project_using_sum: np.sum,
+    graph.project_using_mean: np.mean,
+}
+"""Maps reducing axis operations to NumPy functions accepting a dtype argument."""
+
+
+@dataclass(frozen=True)
+class Policy:
+    """
+    A floating-point precision policy.
+
+    Attributes
+    ----------
+        dtype: The dtype for placeholder values, constants and results.
+        accumulate: The dtype for accumulating reductions.
+    """
+
+    dtype: np.dtype
+    accumulate: np.dtype
+
+    def cast(self, value: np.ndarray) -> np.ndarray:
+        """Cast a floating-point array to the policy dtype, leaving other arrays unchanged."""
+        value = np.asarray(value)
+        if value.dtype.kind == "f" and value.dtype != self.dtype:
+            return value.astype(self.dtype)
+        return value
+
+    def constant(self, value: graph.Scalar) -> np.ndarray:
+        """Convert a numeric constant to an array with the policy dtype."""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return np.asarray(value, dtype=self.dtype)
+        return np.asarray(value)
+
+    def reduce(self, node_type: type[graph.AxisOp], value: np.ndarray, axis: graph.Axis) -> np.ndarray | None:
+        """Reduce a floating-point array using the accumulate dtype.
+
+        Returns None if node_type is not a reduction or the array is not
+        a floating-point array, in which case the caller should use the
+        NumPy backend dispatch tables instead.
+        """
+        func = reductions.get(node_type)
+        if func is None or value.dtype.kind != "f":
+            return None
+        return np.asarray(func(value, axis=axis, dtype=self.accumulate)).astype(self.dtype, copy=False)
+
+
+FLOAT64 = Policy(dtype=np.dtype(np.float64), accumulate=np.dtype(np.float64))
+"""Compute everything in float64."""
+
+FLOAT32 = Policy(dtype=np.dtype(np.float32), accumulate=np.dtype(np.float32))
+"""Compute everything in float32."""
+
+MIXED = Policy(dtype=np.dtype(np.float32), accumulate=np.dtype(np.float64))
+"""Compute in float32, but accumulate reductions in float64."""
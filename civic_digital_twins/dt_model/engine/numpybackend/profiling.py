@@ -0,0 +1,174 @@
+"""Per-node profiling for the NumPy backend.
+
+Tracepoints (see `graph.tracepoint`) print the values of single nodes, but
+they do not tell which nodes dominate the evaluation time. To find out, create
+the executor state with a hook, which the executor invokes after evaluating
+each node with the node, its value, and the start and end times:
+
+    >>> from civic_digital_twins.dt_model.engine.numpybackend import executor, profiling
+    >>> profiler = profiling.Profiler()
+    >>> state = executor.State(values={x: np.zeros(1 << 20)}, hook=profiler)
+    >>> # ... evaluate the plan ...
+    >>> print(profiler.table(limit=10))
+    >>> profiler.write_trace("trace.json")
+
+The `Profiler` defined in this module records the wall time, the shape, the
+dtype and the bytes allocated for each node. It formats the records as a text
+table sorted by decreasing time and exports them as Chrome `trace_event` JSON,
+which you can load using `chrome://tracing` or https://ui.perfetto.dev.
+
+We count a value as allocated when it owns its memory, therefore views (e.g.,
+`expand_dims` results) count as zero bytes, while we cannot distinguish
+buffers recycled by a `memory.Pool` from newly allocated ones.
+
+To find which outputs dominate the evaluation time, `Profiler.cumulative`
+sums the wall time of all the nodes each output depends on. When the
+evaluated nodes are the rewritten nodes of an optimized plan, pass the
+plan's mapping from the original nodes (see `simulation.plan.Plan.mapping`)
+to attribute the wall time of the nodes that actually ran.
+
+Note that the hook only measures the nodes the executor evaluates, thus
+placeholders provided through the state do not appear in the profile.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+import numpy as np
+
+from ..frontend import graph, linearize
+
+Hook = Callable[[graph.Node, np.ndarray, int, int], None]
+"""Callable invoked with a node, its value, and the start and end times in
+nanoseconds (see `time.perf_counter_ns`) after the executor evaluates the node."""
+
+
+@dataclass(frozen=True)
+class Record:
+    """
+    Profile of the evaluation of a single node.
+
+    Attributes
+    ----------
+        node: The evaluated node.
+        start: The start time in nanoseconds.
+        duration: The wall time in nanoseconds.
+        shape: The shape of the value.
+        dtype: The dtype of the value.
+        nbytes: The bytes allocated for the value.
+        thread: The identifier of the thread that evaluated the node.
+    """
+
+    node: graph.Node
+    start: int
+    duration: int
+    shape: tuple[int, ...]
+    dtype: np.dtype
+    nbytes: int
+    thread: int
+
+    @property
+    def label(self) -> str:
+        """Return a label identifying the node."""
+        kind = type(self.node).__name__
+        return f"{self.node.name} ({kind} #{self.node.id})" if self.node.name else f"{kind} #{self.node.id}"
+
+
+class Profiler:
+    """
+    Hook recording the profile of each evaluated node.
+
+    The profiler is thread safe, such that parallel executors can share it.
+
+    Attributes
+    ----------
+        records: The records, in evaluation order.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[Record] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, node: graph.Node, value: np.ndarray, start: int, end: int) -> None:
+        """Record the evaluation of the given node."""
+        value = np.asarray(value)
+        nbytes = value.nbytes if value.base is None else 0
+        record = Record(node, start, end - start, value.shape, value.dtype, nbytes, threading.get_ident())
+        with self._lock:
+            self.records.append(record)
+
+    def total(self) -> int:
+        """Return the total wall time of the evaluated nodes in nanoseconds."""
+        return sum(record.duration for record in self.records)
+
+    def cumulative(
+        self,
+        roots: Mapping[str, graph.Node],
+        mapping: Mapping[graph.Node, graph.Node] | None = None,
+    ) -> dict[str, int]:
+        """Return the total wall time of the nodes each root depends on in nanoseconds.
+
+        Use this method to find which outputs (e.g., the usage of each
+        constraint) dominate the evaluation time. Nodes shared by several
+        roots count towards each of them.
+
+        Args:
+            roots: The nodes to attribute the wall time to, indexed by name.
+            mapping: The evaluated node computing the value of each root
+                (e.g., `Plan.mapping`), or None if we evaluated the roots.
+        """
+        # Note: we use dicts because nodes override `==`
+        durations: dict[graph.Node, int] = {}
+        for record in self.records:
+            durations[record.node] = durations.get(record.node, 0) + record.duration
+        if mapping is not None:
+            roots = {name: mapping.get(root, root) for name, root in roots.items()}
+        return {name: sum(durations.get(node, 0) for node in linearize.forest(root)) for name, root in roots.items()}
+
+    def table(self, limit: int | None = None) -> str:
+        """Format the records as a text table sorted by decreasing wall time.
+
+        Args:
+            limit: The maximum number of rows, or None to include all records.
+        """
+        records = sorted(self.records, key=lambda record: record.duration, reverse=True)[:limit]
+        total = self.total() or 1
+        lines = [f"{'time (ms)':>10} {'%':>6} {'bytes':>12} {'dtype':>8}  {'shape':<18} node"]
+        for record in records:
+            lines.append(
+                f"{record.duration / 1e6:10.3f} {100 * record.duration / total:6.1f} {record.nbytes:12d} "
+                f"{str(record.dtype):>8}  {str(record.shape):<18} {record.label}"
+            )
+        return "\n".join(lines)
+
+    def trace_events(self) -> dict:
+        """Return the records using the Chrome `trace_event` JSON format."""
+        pid = os.getpid()
+        origin = min((record.start for record in self.records), default=0)
+        events = []
+        for record in self.records:
+            events.append(
+                {
+                    "name": record.label,
+                    "cat": type(record.node).__name__,
+                    "ph": "X",
+                    "ts": (record.start - origin) / 1e3,
+                    "dur": record.duration / 1e3,
+                    "pid": pid,
+                    "tid": record.thread,
+                    "args": {"shape": list(record.shape), "dtype": str(record.dtype), "bytes": record.nbytes},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str) -> None:
+        """Write the records to the given path using the Chrome `trace_event` JSON format."""
+        with open(path, "w") as fp:
+            json.dump(self.trace_events(), fp)
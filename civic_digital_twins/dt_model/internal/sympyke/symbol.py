@@ -2,20 +2,30 @@
 
 This module implements minimal support for sympy-like symbols
 so that we can write dt_model models.
+
+We intern each symbol to a small integer code, which is also the default
+value of the symbol placeholder. Use `asarray` to convert the values of a
+categorical context variable to a compact array of codes, such that
+comparing them with symbols (e.g., `Eq(CV_weather.node, Symbol("bad"))`)
+is an integer comparison. We also accept the names of the symbols as values.
 """
 
 import threading
 from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
 
 from ...engine.frontend import graph
 
 
 @dataclass(frozen=True)
 class SymbolValue:
-    """Contains the symbol graph node and the symbol name."""
+    """Contains the symbol graph node, the symbol name and the symbol integer code."""
 
     node: graph.placeholder
     name: str
+    code: int
 
 
 class _SymbolTable:
@@ -26,7 +36,8 @@ class _SymbolTable:
     def get(self, name: str):
         with self._lock:
             if name not in self._table:
-                self._table[name] = SymbolValue(graph.placeholder(name), name)
+                code = len(self._table)
+                self._table[name] = SymbolValue(graph.placeholder(name, default_value=code), name, code)
             return self._table[name]
 
     def values(self) -> list[SymbolValue]:
@@ -45,3 +56,20 @@ def Symbol(name: str) -> SymbolValue:
     Subsequent invocations with the same name return the same SymbolValue.
     """
     return symbol_table.get(name)
+
+
+def asarray(values: Sequence) -> np.ndarray:
+    """Convert the values of a context variable to an array.
+
+    When all the values are symbols or strings, which we intern as symbols,
+    we return their codes using the narrowest signed integer dtype among
+    int8, int16 and int32. Otherwise, we convert the values using `np.asarray`.
+    """
+    if not values or not all(isinstance(value, (SymbolValue, str)) for value in values):
+        return np.asarray(values)
+    codes = [(value if isinstance(value, SymbolValue) else symbol_table.get(value)).code for value in values]
+    largest = max(codes)
+    for dtype in (np.int8, np.int16, np.int32):
+        if largest <= np.iinfo(dtype).max:
+            return np.array(codes, dtype=dtype)
+    return np.array(codes)
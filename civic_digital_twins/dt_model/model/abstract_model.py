@@ -2,9 +2,17 @@
 
 from __future__ import annotations
 
+from ..engine.frontend import fingerprint, graph
+from ..internal.sympyke import symbol
+from ..internal.sympyke.symbol import SymbolValue
 from ..symbols.constraint import Constraint
-from ..symbols.context_variable import ContextVariable
-from ..symbols.index import Index
+from ..symbols.context_variable import (
+    CategoricalContextVariable,
+    ContextVariable,
+    ContinuousContextVariable,
+    UniformCategoricalContextVariable,
+)
+from ..symbols.index import Distribution, Index
 from ..symbols.presence_variable import PresenceVariable
 
 
@@ -26,3 +34,90 @@ class AbstractModel:
         self.indexes = indexes
         self.capacities = capacities
         self.constraints = constraints
+
+    def fingerprint(self) -> str:
+        """Return a digest of the model that is stable across processes and runs.
+
+        The digest covers the context variables (including their support and
+        their probabilities or distribution), the presence variables, the
+        indexes, the capacities and the constraints, including the structure
+        of their graphs (see `engine.frontend.fingerprint`) and the parameters
+        of the distributions, such that we can use it to key caches of results
+        and compiled artifacts shared between workers.
+
+        We cannot describe the code of the callables computing the distribution
+        of the presence variables, hence we only include their qualified name.
+
+        Raises
+        ------
+        TypeError
+            If an index or a context variable uses a distribution other than
+            a frozen SciPy distribution.
+        """
+        digests = fingerprint.forest(
+            *(index.node for index in self.indexes + self.capacities),
+            *(constraint.usage.node for constraint in self.constraints),
+            *(constraint.capacity.node for constraint in self.constraints),
+            symbols=(entry.node for entry in symbol.symbol_table.values()),
+        )
+        parts: list[str | graph.Scalar | None] = ["cvs", len(self.cvs)]
+        for cv in self.cvs:
+            parts += _context_variable_parts(cv)
+        parts += ["pvs", len(self.pvs)]
+        for pv in self.pvs:
+            distribution = pv.distribution
+            parts += [pv.name, len(pv.cvs), *(cv.name for cv in pv.cvs)]
+            parts += [getattr(distribution, "__module__", None), getattr(distribution, "__qualname__", None)]
+        for kind, indexes in (("indexes", self.indexes), ("capacities", self.capacities)):
+            parts += [kind, len(indexes)]
+            for index in indexes:
+                parts += _index_parts(index, digests)
+        parts += ["constraints", len(self.constraints)]
+        for constraint in self.constraints:
+            parts += [constraint.name, digests[constraint.usage.node]]
+            parts += _index_parts(constraint.capacity, digests)
+        return fingerprint.digest(*parts)
+
+
+def _context_variable_parts(cv: ContextVariable) -> list[str | graph.Scalar | None]:
+    # Note: we describe symbols by name since their codes depend on the process
+    parts: list[str | graph.Scalar | None] = [type(cv).__name__, cv.name]
+    if isinstance(cv, UniformCategoricalContextVariable):
+        parts += [len(cv.values), *(_support_value(value) for value in cv.values)]
+    elif isinstance(cv, CategoricalContextVariable):
+        parts += [len(cv.distribution)]
+        for value, probability in cv.distribution.items():
+            parts += [_support_value(value), probability]
+    elif isinstance(cv, ContinuousContextVariable):
+        parts += _distribution_parts(cv.rvc)
+    else:
+        raise TypeError(f"fingerprint: unsupported context variable: {cv!r}")
+    return parts
+
+
+def _support_value(value: object) -> str | graph.Scalar:
+    if isinstance(value, SymbolValue):
+        return value.name
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    raise TypeError(f"fingerprint: unsupported context variable value: {value!r}")
+
+
+def _index_parts(index: Index, digests: dict[graph.Node, str]) -> list[str | graph.Scalar | None]:
+    # Note: the node of a distribution index is a placeholder, so we
+    # need to include the parameters of the distribution
+    parts: list[str | graph.Scalar | None] = [index.name, digests[index.node]]
+    if isinstance(index.value, Distribution):
+        parts += _distribution_parts(index.value)
+    return parts
+
+
+def _distribution_parts(value: object) -> list[str | graph.Scalar | None]:
+    try:
+        name, args, kwds = value.dist.name, value.args, value.kwds  # type: ignore
+    except AttributeError:
+        raise TypeError(f"fingerprint: unsupported distribution: {value!r}")
+    parts: list[str | graph.Scalar | None] = [name, len(args), *args, len(kwds)]
+    for key in sorted(kwds):
+        parts += [key, kwds[key]]
+    return parts
@@ -1,54 +1,143 @@
 """Code to evaluate a model in specific conditions."""
 
 from functools import reduce
+from typing import Iterable
 
 import numpy as np
 from scipy import interpolate, ndimage, stats
 
-from ..engine.frontend import graph, linearize
-from ..engine.numpybackend import executor
+from ..engine.frontend import graph
+from ..engine.numpybackend import blocks, executor, memory, precision, profiling
 from ..internal.sympyke import symbol
 from ..model.instantiated_model import InstantiatedModel
+from ..symbols.constraint import Constraint
 from ..symbols.context_variable import ContextVariable
-from ..symbols.index import Distribution, Index
+from ..symbols.index import Distribution, Index, cdf, sample
+from . import metrics, plan, tiling
 
 
 class Evaluation:
-    """Evaluate a model in specific conditions."""
-
-    def __init__(self, inst: InstantiatedModel, ensemble):
+    """Evaluate a model in specific conditions.
+
+    Set `optimize` to False to evaluate the model graph without folding
+    constants and simplifying it (see the `engine.frontend.simplify` module).
+
+    Set `lean` to True to drop intermediate values as soon as they are not
+    needed anymore, thus reducing the peak memory usage, and to reuse their
+    buffers for later results (see `engine.numpybackend.memory`). In this mode,
+    `index_vals` only contains the values of the model outputs (i.e., usages,
+    capacities and indexes) and of the `pinned` nodes.
+
+    Set `precision` to a `engine.numpybackend.precision.Policy` to evaluate
+    the model using the given floating-point dtype (e.g., float32). The policy
+    also applies to the weighted sum over the ensemble members, which uses the
+    policy accumulate dtype.
+
+    Set `workers` to a value greater than one to evaluate independent parts
+    of the model graph concurrently using threads (see the
+    `engine.numpybackend.parallel` module).
+
+    Set `masked` to True to compute the branches of piecewise functions only
+    where their condition holds (see the `engine.numpybackend.lazy` module),
+    which pays off when the branches are expensive. In this mode, `index_vals`
+    does not contain the values of the nodes private to a branch.
+
+    Set `blocks` to a `engine.numpybackend.blocks.Splitter` to split large
+    elementwise operations (including the capacity distributions cdfs) into
+    row blocks computed concurrently by multiple threads.
+
+    Set `processes` to a value greater than one to split the grid passed to
+    `evaluate_grid` into `tiles` tiles (by default, one per process), which
+    worker processes evaluate concurrently (see the `simulation.tiling`
+    module). In this mode, `index_vals` only contains the values sampled
+    before evaluating the model graph, which the tiles share, and the values
+    of the constant indexes.
+
+    Set `hook` to a callable the executor invokes after evaluating each node
+    (e.g., a `engine.numpybackend.profiling.Profiler` measuring the time
+    spent in each node). The hook does not observe the nodes evaluated by
+    worker processes in tiling mode.
+
+    Set `instrument` to True to measure the duration, the size of the arrays
+    and the number of sampled values of each phase of `evaluate_grid` and
+    `update_grid`, which we store into `metrics` (see the `simulation.metrics`
+    module).
+
+    Set `rng` to a `numpy.random.Generator` to sample the distribution
+    indexes from it. By default, we sample from the global NumPy random
+    state, such that `np.random.seed` makes the evaluation reproducible.
+    We sample the uniform, lognorm and triang SciPy distributions directly
+    using NumPy (see `symbols.index.sample`), and we compute their cdf for
+    the probabilistic constraints in closed form (see `symbols.index.cdf`).
+
+    After changing some indexes (e.g., the distribution of a capacity), use
+    `update_grid` to re-evaluate only the parts of the model depending on
+    them, reusing the results of the previous `evaluate_grid` call.
+    """
+
+    def __init__(
+        self,
+        inst: InstantiatedModel,
+        ensemble,
+        optimize: bool = True,
+        lean: bool = False,
+        pinned: Iterable[graph.Node] = (),
+        precision: precision.Policy | None = None,
+        workers: int = 1,
+        blocks: blocks.Splitter | None = None,
+        processes: int = 1,
+        tiles: int | None = None,
+        hook: profiling.Hook | None = None,
+        instrument: bool = False,
+        masked: bool = False,
+        rng: np.random.Generator | None = None,
+    ):
         self.inst = inst
         self.ensemble = ensemble
+        self.optimize = optimize
+        self.lean = lean
+        self.pinned = frozenset(pinned)
+        self.precision = precision
+        self.workers = workers
+        self.blocks = blocks
+        self.processes = processes
+        self.tiles = tiles
+        self.hook = hook
+        self.instrument = instrument
+        self.masked = masked
+        self.rng = rng
+        self.metrics: metrics.Metrics | None = None
         self.index_vals = None
         self.grid = None
         self.field = None
         self.field_elements = None
+        self._plan: plan.Plan | None = None
+        self._state: executor.State | None = None
+        self._c_weight: np.ndarray | None = None
 
     def evaluate_grid(self, grid):
         """Evaluate the model according to the grid."""
+        timer = metrics.Timer("evaluate_grid", enabled=self.instrument)
         if self.inst.values is None:
             assignments = {}
         else:
             assignments = self.inst.values
 
         # [pre] extract the weights and the size of the ensemble
-        c_weight = np.array([c[0] for c in self.ensemble])
+        c_weight = np.array([c[0] for c in self.ensemble], dtype=self._accumulate_dtype())
         c_size = c_weight.shape[0]
 
         # [pre] create empty placeholders
         c_subs: dict[graph.Node, np.ndarray] = {}
 
-        # [pre] add global unique symbols
-        for entry in symbol.symbol_table.values():
-            c_subs[entry.node] = np.array(entry.name)
-
         # [pre] add context variables
         collector: dict[ContextVariable, list[float]] = {}
         for _, entry in self.ensemble:
             for cv, value in entry.items():
                 collector.setdefault(cv, []).append(value)
         for key, values in collector.items():
-            c_subs[key.node] = np.asarray(values)
+            c_subs[key.node] = symbol.asarray(values)
+        timer.lap("ensemble", values=[c_weight, *c_subs.values()])
 
         # [pre] evaluate the indexes depending on distributions
         #
@@ -56,79 +145,222 @@ class Evaluation:
         # TODO(pistore): if index is in self.capacities AND type is Distribution,
         #  there is no need to compute the sample, as the cdf of the distribution is directly
         #  used in the constraint calculation below (unless index_vals is used)
+        sampled: list[np.ndarray] = []
+        samples = 0
         for index in self.inst.abs.indexes + self.inst.abs.capacities:
-            if index.name in assignments:
-                value = assignments[index.name]
-                if isinstance(value, Distribution):
-                    c_subs[index.node] = np.asarray(value.rvs(size=c_size))
-                else:
-                    c_subs[index.node] = np.full(c_size, value)
-            else:
-                if isinstance(index.value, Distribution):
-                    c_subs[index.node] = np.asarray(index.value.rvs(size=c_size))
-                # else: not needed, covered by default placeholder behavior
+            value = self._sample_index(index, assignments, c_size)
+            if value is not None:
+                c_subs[index.node] = value
+                sampled.append(value)
+                if isinstance(assignments.get(index.name, index.value), Distribution):
+                    samples += value.size
+        timer.lap("sampling", values=sampled, samples=samples)
 
         # [eval] expand dimensions for all values computed thus far
         for key in c_subs:
             c_subs[key] = np.expand_dims(c_subs[key], axis=(0, 1))
+        timer.lap("expansion", values=c_subs.values())
+
+        # [eval] evaluate the field elements, possibly splitting the grid into tiles
+        self._state = None
+        grid_shape = (grid[self.inst.abs.pvs[0]].size, grid[self.inst.abs.pvs[1]].size)
+        if self.processes > 1:
+            tiles = self.tiles if self.tiles is not None else self.processes
+            field_elements = tiling.evaluate(self, c_subs, c_weight, grid, grid_shape, self.processes, tiles)
+            timer.lap("tiles", values=field_elements.values())
+        else:
+            field_elements = self._evaluate_field_elements(c_subs, c_weight, grid, grid_shape, timer)
+
+        # [post] compute the sustainability field
+        field = np.ones(grid_shape)
+        for constraint in self.inst.abs.constraints:
+            field *= field_elements[constraint]
+        timer.lap("field", values=[field])
+
+        # [post] store the results
+        self.index_vals = c_subs
+        self.grid = grid
+        self.field = field
+        self.field_elements = field_elements
+        self.metrics = timer.metrics()
+        return self.field
 
+    def _evaluate_field_elements(
+        self,
+        c_subs: dict[graph.Node, np.ndarray],
+        c_weight: np.ndarray,
+        grid,
+        grid_shape: tuple[int, int],
+        timer: metrics.Timer | None = None,
+    ) -> dict:
+        """Evaluate the model graph over the grid and return the field element of each constraint.
+
+        This method adds the presence variables to `c_subs`, which also
+        receives the values of the evaluated nodes. When a timer is given, we
+        record the graph evaluation and the field elements computation phases.
+        """
         # [eval] add presence variables and expand dimensions
         assert len(self.inst.abs.pvs) == 2  # TODO: generalize
         for i, pv in enumerate(self.inst.abs.pvs):
             c_subs[pv.node] = np.expand_dims(grid[pv], axis=(i, 2))
 
-        # [eval] collect all the nodes to evaluate
-        all_nodes: list[graph.Node] = []
-        for constraint in self.inst.abs.constraints:
-            all_nodes.append(constraint.usage.node)
-            if not isinstance(constraint.capacity.value, Distribution):
-                all_nodes.append(constraint.capacity.node)
-        for index in self.inst.abs.indexes + self.inst.abs.capacities:
-            all_nodes.append(index.node)
+        # [eval] actually evaluate all the nodes using the cached plan
+        state = executor.State(
+            c_subs,
+            pool=memory.Pool() if self.lean else None,
+            precision=self.precision,
+            blocks=self.blocks,
+            hook=self.hook,
+        )
+        compiled = plan.get(self.inst.abs, optimize=self.optimize, pinned=self.pinned)
+        compiled.evaluate(state, lean=self.lean, pinned=self.pinned, workers=self.workers, masked=self.masked)
+        if timer is not None:
+            timer.lap("evaluation", values=c_subs.values())
 
-        # [eval] actually evaluate all the nodes
-        state = executor.State(c_subs)
-        for node in linearize.forest(*all_nodes):
-            executor.evaluate(state, node)
+        # [post] remember the state for incremental updates
+        self._plan = compiled
+        self._state = state
+        self._c_weight = c_weight
+
+        # [post] compute the field element of each constraint
+        field_elements = {}
+        for constraint in self.inst.abs.constraints:
+            field_elements[constraint] = self._field_element(constraint, c_subs, c_weight, grid_shape)
+        if timer is not None:
+            timer.lap("elements", values=field_elements.values())
+        return field_elements
+
+    def _field_element(
+        self,
+        constraint: Constraint,
+        c_subs: dict[graph.Node, np.ndarray],
+        c_weight: np.ndarray,
+        grid_shape: tuple[int, ...],
+    ) -> np.ndarray:
+        """Compute the field element of the constraint from the evaluated nodes."""
+        if self.inst.values is None:
+            assignments = {}
+        else:
+            assignments = self.inst.values
 
         # [fix] Ensure that we have the correct shape for operands
+        c_size = c_weight.shape[0]
+
         def _fix_shapes(value: np.ndarray) -> np.ndarray:
             if value.ndim == 3 and value.shape[2] == 1:
                 return np.broadcast_to(value, value.shape[:2] + (c_size,))
             return value
 
-        # [post] compute the sustainability field
-        grid_shape = (grid[self.inst.abs.pvs[0]].size, grid[self.inst.abs.pvs[1]].size)
-        field = np.ones(grid_shape)
-        field_elements = {}
-        for constraint in self.inst.abs.constraints:
-            # Get usage
-            usage = _fix_shapes(np.asarray(c_subs[constraint.usage.node]))
+        # Get usage
+        usage = _fix_shapes(np.asarray(c_subs[constraint.usage.node]))
+
+        # Get capacity
+        capacity = constraint.capacity
+        if capacity.name in assignments:
+            capacity_value = assignments[capacity.name]
+        else:
+            capacity_value = capacity.value
 
-            # Get capacity
-            capacity = constraint.capacity
-            if capacity.name in assignments:
-                capacity_value = assignments[capacity.name]
+        if not isinstance(capacity_value, Distribution):
+            unscaled_result = usage <= _fix_shapes(np.asarray(c_subs[capacity.node]))
+        else:
+            if self.blocks is not None:
+                unscaled_result = self.blocks.map(lambda block: cdf(capacity_value, block), usage)
             else:
-                capacity_value = capacity.value
+                unscaled_result = cdf(capacity_value, usage)
+            np.subtract(1.0, unscaled_result, out=unscaled_result)
+
+        # Apply weights
+        return np.broadcast_to(np.dot(unscaled_result, c_weight), grid_shape)
 
-            if not isinstance(capacity_value, Distribution):
-                unscaled_result = usage <= _fix_shapes(np.asarray(c_subs[capacity.node]))
+    def update_grid(self, *indexes: Index) -> np.ndarray:
+        """Re-evaluate the model on the previous grid after the given indexes changed.
+
+        We sample the changed indexes again, re-evaluate only the graph nodes
+        depending on them (see `Plan.update`), and only recompute the field
+        elements of the constraints whose usage or capacity changed. The
+        other indexes keep the values sampled by the previous evaluation.
+
+        We fall back to re-evaluating the whole grid when the previous state
+        is not available (i.e., in lean, masked or tiling mode) or when the model
+        graph changed (e.g., because of a new `ConstIndex` value).
+        """
+        assert self.grid is not None
+        assert self.field is not None
+        assert self.field_elements is not None
+        timer = metrics.Timer("update_grid", enabled=self.instrument)
+        state, c_weight = self._state, self._c_weight
+        compiled = plan.get(self.inst.abs, optimize=self.optimize, pinned=self.pinned)
+        if state is None or c_weight is None or self.lean or self.masked or compiled is not self._plan:
+            return self.evaluate_grid(self.grid)
+
+        if self.inst.values is None:
+            assignments = {}
+        else:
+            assignments = self.inst.values
+
+        # [pre] sample the changed indexes again
+        changed: list[graph.Node] = []
+        samples = 0
+        for index in indexes:
+            value = self._sample_index(index, assignments, c_weight.shape[0])
+            if value is None:
+                # Note: the index has no override anymore, hence we drop the
+                # previous values such that the plan computes its default
+                state.values.pop(index.node, None)
+                state.values.pop(compiled.mapping.get(index.node, index.node), None)
             else:
-                unscaled_result = 1.0 - capacity_value.cdf(usage)
+                if isinstance(assignments.get(index.name, index.value), Distribution):
+                    samples += value.size
+                value = np.expand_dims(value, axis=(0, 1))
+                state.values[index.node] = state.precision.cast(value) if state.precision is not None else value
+            changed.append(index.node)
+        timer.lap("sampling", values=(state.values[node] for node in changed if node in state.values), samples=samples)
+
+        # [eval] re-evaluate the nodes depending on the changed indexes
+        #
+        # Note: we use sets because nodes override `==`
+        updated = set(compiled.update(state, changed, pinned=self.pinned))
+        timer.lap("evaluation", values=(state.values[node] for node in updated))
+        capacities = {index.node for index in indexes}
+
+        # [post] recompute the field elements of the affected constraints
+        grid_shape = self.field.shape
+        field_elements = dict(self.field_elements)
+        recomputed: list[np.ndarray] = []
+        for constraint in self.inst.abs.constraints:
+            if (
+                constraint.usage.node in updated
+                or constraint.capacity.node in updated
+                or constraint.capacity.node in capacities
+            ):
+                field_elements[constraint] = self._field_element(constraint, state.values, c_weight, grid_shape)
+                recomputed.append(field_elements[constraint])
+        timer.lap("elements", values=recomputed)
 
-            # Apply weights and store the result
-            result = np.broadcast_to(np.dot(unscaled_result, c_weight), grid_shape)
-            field_elements[constraint] = result
-            field *= result
+        # [post] compute the sustainability field
+        field = np.ones(grid_shape)
+        for constraint in self.inst.abs.constraints:
+            field *= field_elements[constraint]
+        timer.lap("field", values=[field])
 
-        # [post] store the results
-        self.index_vals = c_subs
-        self.grid = grid
         self.field = field
         self.field_elements = field_elements
+        self.metrics = timer.metrics()
         return self.field
 
+    def _sample_index(self, index: Index, assignments: dict, c_size: int) -> np.ndarray | None:
+        """Return the values of the index for each ensemble member, or None if it needs no sampling."""
+        if index.name in assignments:
+            value = assignments[index.name]
+            if isinstance(value, Distribution):
+                return sample(value, c_size, self.rng)
+            return np.full(c_size, value)
+        if isinstance(index.value, Distribution):
+            return sample(index.value, c_size, self.rng)
+        # else: not needed, covered by default placeholder behavior
+        return None
+
     def evaluate_usage(self, presences):
         """Evaluate the model according to the presence argument."""
         if self.inst.values is None:
@@ -137,23 +369,19 @@ class Evaluation:
             assignments = self.inst.values
 
         # [pre] extract the weights and the size of the ensemble
-        c_weight = np.array([c[0] for c in self.ensemble])
+        c_weight = np.array([c[0] for c in self.ensemble], dtype=self._accumulate_dtype())
         c_size = c_weight.shape[0]
 
         # [pre] create empty placeholders
         c_subs: dict[graph.Node, np.ndarray] = {}
 
-        # [pre] add global unique symbols
-        for entry in symbol.symbol_table.values():
-            c_subs[entry.node] = np.array(entry.name)
-
         # [pre] add context variables
         collector: dict[ContextVariable, list[float]] = {}
         for _, entry in self.ensemble:
             for cv, value in entry.items():
                 collector.setdefault(cv, []).append(value)
         for key, values in collector.items():
-            c_subs[key.node] = np.asarray(values)
+            c_subs[key.node] = symbol.asarray(values)
 
         # [pre] evaluate the indexes depending on distributions
         #
@@ -162,16 +390,9 @@ class Evaluation:
         #  there is no need to compute the sample, as the cdf of the distribution is directly
         #  used in the constraint calculation below (unless index_vals is used)
         for index in self.inst.abs.indexes + self.inst.abs.capacities:
-            if index.name in assignments:
-                value = assignments[index.name]
-                if isinstance(value, Distribution):
-                    c_subs[index.node] = np.asarray(value.rvs(size=c_size))
-                else:
-                    c_subs[index.node] = np.full(c_size, value)
-            else:
-                if isinstance(index.value, Distribution):
-                    c_subs[index.node] = np.asarray(index.value.rvs(size=c_size))
-                # else: not needed, covered by default placeholder behavior
+            value = self._sample_index(index, assignments, c_size)
+            if value is not None:
+                c_subs[index.node] = value
 
         # [eval] expand dimensions for all values computed thus far
         for key in c_subs:
@@ -182,31 +403,31 @@ class Evaluation:
         for i, pv in enumerate(self.inst.abs.pvs):
             c_subs[pv.node] = np.expand_dims(presences[i], axis=1)  # CHANGED
 
-        # [eval] collect all the nodes to evaluate
-        all_nodes: list[graph.Node] = []
-        for constraint in self.inst.abs.constraints:
-            all_nodes.append(constraint.usage.node)
-            if not isinstance(constraint.capacity.value, Distribution):
-                all_nodes.append(constraint.capacity.node)
-        for index in self.inst.abs.indexes + self.inst.abs.capacities:
-            all_nodes.append(index.node)
-
-        # [eval] actually evaluate all the nodes
-        state = executor.State(c_subs)
-        for node in linearize.forest(*all_nodes):
-            executor.evaluate(state, node)
+        # [eval] actually evaluate all the nodes using the cached plan
+        state = executor.State(
+            c_subs,
+            pool=memory.Pool() if self.lean else None,
+            precision=self.precision,
+            blocks=self.blocks,
+            hook=self.hook,
+        )
+        compiled = plan.get(self.inst.abs, optimize=self.optimize, pinned=self.pinned)
+        compiled.evaluate(state, lean=self.lean, pinned=self.pinned, workers=self.workers, masked=self.masked)
 
         # CHANGED FROM HERE
         # [post] compute the usage map
         usage_elements = {}
         for constraint in self.inst.abs.constraints:
             # Compute and store constraint usage
-            usage = np.asarray(c_subs[constraint.usage.node]).mean(axis=1)
+            usage = np.asarray(c_subs[constraint.usage.node]).mean(axis=1, dtype=self._accumulate_dtype())
             usage_elements[constraint] = usage
 
         # [post] return the results
         return usage_elements
 
+    def _accumulate_dtype(self) -> np.dtype | None:
+        return self.precision.accumulate if self.precision is not None else None
+
     def get_index_value(self, i: Index) -> float:
         """Get the value of the given index."""
         assert self.index_vals is not None
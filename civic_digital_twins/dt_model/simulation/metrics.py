@@ -0,0 +1,160 @@
+"""Phase-level metrics for evaluations.
+
+Evaluating a model over a grid proceeds in phases (collecting the ensemble,
+sampling the indexes, expanding dimensions, evaluating the graph, and
+computing the field). When created with `instrument=True`, an `Evaluation`
+measures the duration of each phase, the size of the arrays it produces and
+the number of values it samples, and stores the result into its `metrics`
+attribute, which is a `Metrics` instance:
+
+    >>> evaluation = Evaluation(model, ensemble, instrument=True)
+    >>> evaluation.evaluate_grid(grid)
+    >>> for phase in evaluation.metrics.phases:
+    ...     print(phase.name, phase.duration)
+    >>> evaluation.metrics.write_prometheus("/var/lib/node_exporter/dt_model.prom")
+
+The `Metrics.prometheus` method formats the metrics using the Prometheus text
+exposition format, such that, e.g., the node exporter textfile collector can
+publish them. The `Timer` class collects the metrics of consecutive phases.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Mapping
+
+import numpy as np
+
+PREFIX = "dt_model_evaluation"
+"""Prefix of the names of the Prometheus metrics."""
+
+
+@dataclass(frozen=True)
+class Phase:
+    """
+    Metrics of a single evaluation phase.
+
+    Attributes
+    ----------
+        name: The name of the phase.
+        duration: The wall time in seconds.
+        nbytes: The total size in bytes of the arrays the phase produced.
+        samples: The number of values sampled from distributions.
+    """
+
+    name: str
+    duration: float
+    nbytes: int = 0
+    samples: int = 0
+
+
+@dataclass(frozen=True)
+class Metrics:
+    """
+    Metrics of an evaluation.
+
+    Attributes
+    ----------
+        method: The name of the evaluation method (e.g., "evaluate_grid").
+        phases: The metrics of each phase, in execution order.
+    """
+
+    method: str
+    phases: tuple[Phase, ...] = field(default_factory=tuple)
+
+    @property
+    def duration(self) -> float:
+        """Return the total wall time in seconds."""
+        return sum(phase.duration for phase in self.phases)
+
+    def prometheus(self, labels: Mapping[str, str] | None = None) -> str:
+        """Format the metrics using the Prometheus text exposition format.
+
+        Args:
+            labels: Additional labels to attach to each sample (e.g., the model name).
+        """
+        common = {"method": self.method, **(labels or {})}
+        families = (
+            ("phase_seconds", "Wall time of each evaluation phase in seconds.", "duration"),
+            ("phase_bytes", "Size in bytes of the arrays produced by each evaluation phase.", "nbytes"),
+            ("phase_samples", "Number of values sampled by each evaluation phase.", "samples"),
+        )
+        lines: list[str] = []
+        for suffix, description, attribute in families:
+            lines.append(f"# HELP {PREFIX}_{suffix} {description}")
+            lines.append(f"# TYPE {PREFIX}_{suffix} gauge")
+            for phase in self.phases:
+                value = getattr(phase, attribute)
+                lines.append(f"{PREFIX}_{suffix}{_labels({**common, 'phase': phase.name})} {value}")
+        lines.append(f"# HELP {PREFIX}_seconds Total wall time of the evaluation in seconds.")
+        lines.append(f"# TYPE {PREFIX}_seconds gauge")
+        lines.append(f"{PREFIX}_seconds{_labels(common)} {self.duration}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, labels: Mapping[str, str] | None = None) -> None:
+        """Write the metrics to the given path using the Prometheus text exposition format.
+
+        We write a temporary file and rename it, such that collectors
+        reading the file never observe a partially written file.
+
+        Args:
+            path: The path of the file to write.
+            labels: Additional labels to attach to each sample (e.g., the model name).
+        """
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as fp:
+            fp.write(self.prometheus(labels))
+        os.replace(temporary, path)
+
+
+class Timer:
+    """Collect the metrics of consecutive phases.
+
+    Each call to `lap` records a phase lasting since the previous call (or
+    since creating the timer). When the timer is disabled, `lap` does nothing
+    and `metrics` returns None, such that the instrumentation costs nothing.
+
+    Args:
+        method: The name of the evaluation method.
+        enabled: Whether to collect the metrics.
+    """
+
+    def __init__(self, method: str, enabled: bool = True) -> None:
+        self.method = method
+        self.enabled = enabled
+        self._phases: list[Phase] = []
+        self._last = time.perf_counter()
+
+    def lap(self, name: str, values: Iterable[np.ndarray] = (), samples: int = 0) -> None:
+        """Record a phase ending now.
+
+        Args:
+            name: The name of the phase.
+            values: The arrays the phase produced, which we only inspect
+                when the timer is enabled.
+            samples: The number of values the phase sampled.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        nbytes = sum(np.asarray(value).nbytes for value in values)
+        self._phases.append(Phase(name, now - self._last, nbytes, samples))
+        # Note: we exclude the time spent computing the sizes
+        self._last = time.perf_counter()
+
+    def metrics(self) -> Metrics | None:
+        """Return the metrics collected so far, or None if the timer is disabled."""
+        return Metrics(self.method, tuple(self._phases)) if self.enabled else None
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    """Format the labels of a sample, escaping their values."""
+    items = []
+    for key, value in labels.items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        items.append(f'{key}="{value}"')
+    return "{" + ",".join(items) + "}"
@@ -0,0 +1,347 @@
+"""Compiled execution plans for abstract models.
+
+Evaluating a model requires collecting the graph nodes we need to compute
+(constraint usages, deterministic capacities, and indexes) and sorting them
+topologically using `linearize.forest`. The resulting plan only depends on
+the structure of the AbstractModel, so we build it once and reuse it for
+all the subsequent evaluations of the same model.
+
+When building the plan, we eliminate common subexpressions (see the
+`engine.frontend.cse` module), such that each distinct computation runs
+only once. Unless disabled using `optimize=False`, we also fold constants
+and simplify the graph (see the `engine.frontend.simplify` module), and we
+compile the piecewise functions of the categorical context variables into
+table lookups using the symbol codes (see the `engine.frontend.lookup`
+module). Evaluating the plan stores the value of each output under the
+original output node, so callers do not need to know about these rewrites.
+
+Callers may override the value of the indexes and capacities by providing
+it in the state (e.g., `InstantiatedModel` values), hence we treat their
+nodes as inputs: before simplifying, we turn the constant ones into
+placeholders whose default value is the constant, and no pass merges or
+folds the other ones. Evaluating the plan moves the values provided for
+the original nodes to the nodes of the plan (see `Plan.mapping`).
+
+Likewise, the nodes whose value callers want to keep (i.e., the `pinned`
+nodes) must be known when building the plan, since simplifying may fold
+them into the nodes depending on them: we compile them as additional
+leaves, and evaluating the plan stores their values under the original
+nodes.
+
+The plan also records when the value of each node is last used (see the
+`engine.frontend.liveness` module), such that evaluating in lean mode drops
+the intermediate values as soon as no later node needs them.
+
+Finally, the plan binds each node to the NumPy function computing it (see
+`executor.bind`), so evaluating it does not dispatch on the node types.
+
+Evaluating in masked mode computes the branches of conditional nodes only
+where their condition holds (see the `engine.numpybackend.lazy` module).
+
+After changing the values of some placeholders, `Plan.update` re-evaluates
+only the nodes depending on them (see the `engine.frontend.dirty` module),
+reusing the values of the previous evaluation for all the other nodes.
+
+The `get` function caches the plan for each model and transparently
+rebuilds it when the model changes (e.g., when a `ConstIndex` value is
+modified, which replaces the index's graph node).
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Iterable
+
+from ..engine.frontend import cse, dirty, graph, linearize, liveness, lookup, rewrite, simplify
+from ..engine.numpybackend import dispatch, executor, lazy, parallel
+from ..internal.sympyke import symbol
+from ..model.abstract_model import AbstractModel
+from ..symbols.context_variable import CategoricalContextVariable, UniformCategoricalContextVariable
+from ..symbols.index import Distribution
+
+
+@dataclass(frozen=True)
+class Plan:
+    """
+    Compiled execution plan for an AbstractModel.
+
+    Attributes
+    ----------
+        outputs: The nodes whose values the evaluation needs.
+        targets: The optimized nodes computing each output.
+        nodes: The topologically sorted nodes to evaluate.
+        releases: The nodes that are not needed anymore after each step.
+        steps: The callables evaluating each node (see `executor.bind`).
+        mapping: The node of the plan computing the value of each original node.
+        schedule: The steps evaluating conditional nodes lazily (see `lazy.schedule`).
+        optimize: Whether we simplified the graph.
+    """
+
+    outputs: tuple[graph.Node, ...]
+    targets: tuple[graph.Node, ...]
+    nodes: tuple[graph.Node, ...]
+    releases: tuple[tuple[graph.Node, ...], ...]
+    steps: tuple[executor.Step, ...]
+    mapping: rewrite.Mapping
+    schedule: lazy.Schedule
+    optimize: bool = True
+
+    def matches(self, outputs: tuple[graph.Node, ...]) -> bool:
+        """Return whether the plan has been compiled for the given outputs.
+
+        We compare nodes by identity since nodes override `==`.
+        """
+        return len(self.outputs) == len(outputs) and all(a is b for a, b in zip(self.outputs, outputs))
+
+    def evaluate(
+        self,
+        state: executor.State,
+        *,
+        lean: bool = False,
+        pinned: Iterable[graph.Node] = (),
+        workers: int = 1,
+        masked: bool = False,
+    ) -> None:
+        """Evaluate all the nodes in the plan using the given state.
+
+        Args:
+            state: The executor state, containing the placeholder values
+                and possibly the values overriding the outputs.
+            lean: Whether to drop the intermediate values from the state as
+                soon as no later node needs them. We always keep the outputs.
+            pinned: Nodes whose value must be kept in lean mode. Like for the
+                outputs, we store their values under the given nodes, even when
+                the plan computes them using rewritten nodes (see `mapping`),
+                provided that we built the plan for these pinned nodes.
+            workers: The number of threads evaluating independent nodes
+                concurrently (see `engine.numpybackend.parallel`). With a
+                single worker, we evaluate the plan sequentially.
+            masked: Whether to compute the branches of conditional nodes only
+                where their condition holds (see `engine.numpybackend.lazy`).
+                In this mode, we evaluate the plan sequentially and the state
+                does not contain the values of the nodes private to a branch.
+        """
+        self._move_inputs(state, list(state.values))
+        originals = tuple(pinned)
+        pinned = tuple(self.mapping.get(node, node) for node in originals)
+        if masked:
+            schedule = self.schedule
+            if pinned:
+                schedule = lazy.schedule(self.nodes, keep=(*self.targets, *pinned))
+            _run(state, schedule.steps, schedule.releases if lean else None, pinned)
+        elif workers > 1:
+            keep = (*self.targets, *pinned) if lean else None
+            parallel.evaluate(state, self.nodes, workers=workers, keep=keep)
+        else:
+            _run(state, self.steps, self.releases if lean else None, pinned)
+        for output, target in zip(self.outputs, self.targets):
+            if output is not target:
+                state.values[output] = state.values[target]
+        for node, image in zip(originals, pinned):
+            if node is not image and image in state.values:
+                state.values[node] = state.values[image]
+        if lean:
+            # Note: we use sets because nodes override `==`
+            kept = {*self.outputs, *originals}
+            for image in (*self.targets, *pinned):
+                if image not in kept:
+                    state.values.pop(image, None)
+
+    def update(
+        self,
+        state: executor.State,
+        changed: Iterable[graph.Node],
+        *,
+        pinned: Iterable[graph.Node] = (),
+    ) -> tuple[graph.Node, ...]:
+        """Re-evaluate the nodes of the plan depending on the changed nodes.
+
+        The state must contain the values computed by a previous (non-lean)
+        evaluation of the plan, and the new values of the changed nodes
+        (e.g., placeholders). We only re-evaluate the nodes downstream of the
+        changed nodes (see `engine.frontend.dirty`) and reuse all the other values.
+
+        Args:
+            state: The executor state of the previous evaluation.
+            changed: The nodes whose value has changed. When the state does
+                not contain their value anymore, we compute it again (e.g.,
+                the default value of an index whose override was removed).
+            pinned: The pinned nodes, whose values we also store again under
+                the given nodes (see `evaluate`).
+
+        Returns
+        -------
+            The outputs whose value we have re-evaluated.
+        """
+        # Note: we use sets because nodes override `==`
+        changed_nodes = set(self._move_inputs(state, changed))
+        indexes = dirty.propagate(self.nodes, changed_nodes)
+        for index in indexes:
+            if self.nodes[index] not in changed_nodes:
+                state.values.pop(self.nodes[index], None)
+        for index in indexes:
+            self.steps[index](state)
+
+        updated = {self.nodes[index] for index in indexes}
+        result: list[graph.Node] = []
+        for output, target in zip(self.outputs, self.targets):
+            if target in updated:
+                state.values[output] = state.values[target]
+                result.append(output)
+        for node in pinned:
+            image = self.mapping.get(node, node)
+            if image is not node and image in updated:
+                state.values[node] = state.values[image]
+        return tuple(result)
+
+    def _move_inputs(self, state: executor.State, nodes: Iterable[graph.Node]) -> list[graph.Node]:
+        """Store the values of the given nodes under the nodes of the plan computing them.
+
+        Returns
+        -------
+            The nodes of the plan corresponding to the given nodes.
+        """
+        result: list[graph.Node] = []
+        for node in nodes:
+            image = self.mapping.get(node, node)
+            if image is not node and node in state.values:
+                state.values[image] = state.values[node]
+            result.append(image)
+        return result
+
+
+def _run(
+    state: executor.State,
+    steps: tuple[executor.Step, ...],
+    releases: tuple[tuple[graph.Node, ...], ...] | None,
+    pinned: Iterable[graph.Node],
+) -> None:
+    """Run the steps sequentially, releasing the dead values unless releases is None."""
+    if releases is None:
+        for step in steps:
+            step(state)
+        return
+    # Note: we use a set because nodes override `==`
+    kept = set(pinned)
+    for step, dead in zip(steps, releases):
+        step(state)
+        executor.release(state, (item for item in dead if item not in kept))
+
+
+def outputs(model: AbstractModel) -> tuple[graph.Node, ...]:
+    """Collect the nodes that evaluating the model requires."""
+    nodes: list[graph.Node] = []
+    for constraint in model.constraints:
+        nodes.append(constraint.usage.node)
+        if not isinstance(constraint.capacity.value, Distribution):
+            nodes.append(constraint.capacity.node)
+    for index in model.indexes + model.capacities:
+        nodes.append(index.node)
+    return tuple(nodes)
+
+
+def inputs(model: AbstractModel) -> tuple[graph.Node, ...]:
+    """Collect the nodes whose value callers may override (i.e., indexes and capacities)."""
+    return tuple(index.node for index in model.indexes + model.capacities)
+
+
+def categorical(model: AbstractModel) -> tuple[graph.Node, ...]:
+    """Collect the nodes of the categorical context variables, which evaluate to symbol codes."""
+    return tuple(
+        cv.node for cv in model.cvs if isinstance(cv, (CategoricalContextVariable, UniformCategoricalContextVariable))
+    )
+
+
+def build(model: AbstractModel, *, optimize: bool = True, pinned: Iterable[graph.Node] = ()) -> Plan:
+    """Build a new execution plan for the given model.
+
+    Args:
+        model: The model to build the plan for.
+        optimize: Whether to fold constants and simplify the graph.
+        pinned: The nodes whose value the evaluations may pin (see `Plan.evaluate`).
+    """
+    return _compile(outputs(model), optimize, inputs(model), tuple(pinned), categorical(model))
+
+
+def _compile(
+    leaves: tuple[graph.Node, ...],
+    optimize: bool,
+    overridable: tuple[graph.Node, ...] = (),
+    pinned: tuple[graph.Node, ...] = (),
+    categorical: tuple[graph.Node, ...] = (),
+) -> Plan:
+    # Note: we compile the pinned nodes as leaves such that each of
+    # them has a node of the plan computing its value
+    roots = (*leaves, *pinned)
+    mapping: rewrite.Mapping = {node: node for node in linearize.forest(*roots)}
+    keep = [node for node in overridable if not isinstance(node, (graph.constant, graph.placeholder))]
+
+    def _apply(result: rewrite.Mapping) -> None:
+        nonlocal mapping, keep
+        mapping = rewrite.compose(mapping, result)
+        keep = rewrite.apply(result, keep)
+
+    _apply(cse.forest(*roots, keep=keep))
+    if optimize:
+        # Note: we turn the constant inputs into placeholders such that
+        # we do not fold them into the nodes depending on them
+        replacements: rewrite.Mapping = {
+            mapping[node]: graph.placeholder(node.name, node.value)
+            for node in overridable
+            if isinstance(node, graph.constant)
+        }
+        _apply(rewrite.substitute(replacements, *rewrite.apply(mapping, roots)))
+        _apply(simplify.forest(*rewrite.apply(mapping, roots), operations=dispatch.operations, keep=keep))
+        codes: dict[graph.Node, int] = {entry.node: entry.code for entry in symbol.symbol_table.values()}
+        subjects = rewrite.apply(mapping, categorical)
+        _apply(lookup.forest(*rewrite.apply(mapping, roots), codes=codes, subjects=subjects))
+
+        # Simplifying may expose more common subexpressions (e.g.,
+        # equal folded constants), hence we run CSE again
+        _apply(cse.forest(*rewrite.apply(mapping, roots), keep=keep))
+    targets = rewrite.apply(mapping, leaves)
+    nodes = linearize.forest(*targets, *rewrite.apply(mapping, pinned))
+    return Plan(
+        outputs=leaves,
+        targets=tuple(targets),
+        nodes=tuple(nodes),
+        releases=tuple(liveness.releases(nodes, keep=targets)),
+        steps=tuple(executor.bind(node) for node in nodes),
+        mapping=mapping,
+        schedule=lazy.schedule(nodes, keep=targets),
+        optimize=optimize,
+    )
+
+
+_cache: weakref.WeakKeyDictionary[AbstractModel, dict[tuple[bool, frozenset[int]], Plan]] = weakref.WeakKeyDictionary()
+"""Caches the plans compiled for each model, indexed by the optimize flag and the ids of the pinned nodes."""
+
+_cache_lock = threading.Lock()
+"""Protects access to the _cache."""
+
+
+def get(model: AbstractModel, *, optimize: bool = True, pinned: Iterable[graph.Node] = ()) -> Plan:
+    """Return the cached execution plan for the model, building it if needed.
+
+    The cached plan is invalidated when the nodes the model requires
+    differ from the ones for which we compiled the plan.
+
+    Args:
+        model: The model to get the plan for.
+        optimize: Whether to fold constants and simplify the graph.
+        pinned: The nodes whose value the evaluations may pin (see `Plan.evaluate`).
+    """
+    leaves, pinned = outputs(model), tuple(pinned)
+    key = (optimize, frozenset(node.id for node in pinned))
+    with _cache_lock:
+        plan = _cache.get(model, {}).get(key)
+        if plan is not None and plan.matches(leaves):
+            return plan
+    plan = _compile(leaves, optimize, inputs(model), pinned, categorical(model))
+    with _cache_lock:
+        _cache.setdefault(model, {})[key] = plan
+    return plan
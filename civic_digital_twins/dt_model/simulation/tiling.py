@@ -0,0 +1,144 @@
+"""Evaluate presence grids by tiles using multiple processes.
+
+Evaluating a model over a fine presence grid is CPU bound and a single
+interpreter only uses a fraction of a large machine. This module splits the
+grid into tiles of consecutive field rows and evaluates them concurrently
+using a `concurrent.futures.ProcessPoolExecutor`:
+
+1. the parent process samples the index values, exactly like a single-process
+evaluation, such that all tiles share the same samples;
+
+2. each worker process receives the model, the ensemble and the sampled
+values once, when it starts, and compiles the model plan (see `plan.get`);
+
+3. each tile evaluates the model over its rows and writes the field elements
+into a `multiprocessing.shared_memory` buffer, so the parent does not
+need to unpickle the results.
+
+Since each field row only depends on the corresponding presence value and
+on the shared samples, the stitched field is identical to the field computed
+by a single process. See `Evaluation` for how to enable tiling.
+"""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from __future__ import annotations
+
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ..engine.frontend import graph
+from ..engine.numpybackend import executor
+from . import plan
+
+if TYPE_CHECKING:
+    from .evaluation import Evaluation
+
+
+def evaluate(
+    evaluation: Evaluation,
+    c_subs: dict[graph.Node, np.ndarray],
+    c_weight: np.ndarray,
+    grid,
+    grid_shape: tuple[int, int],
+    processes: int,
+    tiles: int,
+) -> dict:
+    """Evaluate the field element of each constraint by tiles.
+
+    Args:
+        evaluation: The evaluation whose model and settings to use.
+        c_subs: The values sampled before evaluating the model graph.
+        c_weight: The weights of the ensemble members.
+        grid: The presence grid.
+        grid_shape: The shape of the field.
+        processes: The number of worker processes.
+        tiles: The number of tiles.
+
+    Returns
+    -------
+        A dictionary mapping each constraint to its field element.
+    """
+    constraints = evaluation.inst.abs.constraints
+    rows = grid_shape[0]
+    count = max(1, min(tiles, rows))
+    bounds = [rows * index // count for index in range(count + 1)]
+    shape = (len(constraints), *grid_shape)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    try:
+        payload = (_worker_evaluation(evaluation), c_subs, c_weight, grid, grid_shape, memory.name)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_initialize, initargs=(payload,)) as pool:
+            futures = [pool.submit(_evaluate_tile, lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if lo < hi]
+            dtypes = [future.result() for future in futures][0]
+
+        # Like a single-process evaluation, include the values of the constant
+        # indexes, which do not depend on the grid, into the sampled values
+        state = executor.State(c_subs, precision=evaluation.precision)
+        for index in evaluation.inst.abs.indexes + evaluation.inst.abs.capacities:
+            if isinstance(index.node, graph.constant):
+                executor.evaluate(state, index.node)
+
+        # Note: we copy the elements out of the shared memory before releasing it
+        buffer = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        result = {constraint: buffer[index].astype(dtypes[index]) for index, constraint in enumerate(constraints)}
+        del buffer
+        return result
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _worker_evaluation(evaluation: Evaluation) -> Evaluation:
+    """Return a copy of the evaluation suitable for sending to the workers."""
+    result = copy.copy(evaluation)
+    result.processes = 1
+    result.hook = None
+    result.index_vals = None
+    result.grid = None
+    result.field = None
+    result.field_elements = None
+    result._plan = None
+    result._state = None
+    result._c_weight = None
+    return result
+
+
+_worker: tuple | None = None
+"""State of the current worker process (see `_initialize`)."""
+
+
+def _initialize(payload: tuple) -> None:
+    """Initialize a worker process by loading the payload and compiling the plan."""
+    global _worker
+    _worker = payload
+    evaluation = payload[0]
+    plan.get(evaluation.inst.abs, optimize=evaluation.optimize, pinned=evaluation.pinned)
+
+
+def _evaluate_tile(lo: int, hi: int) -> list[str]:
+    """Evaluate the field rows [lo, hi) and return the dtype of each field element."""
+    assert _worker is not None
+    evaluation, c_subs, c_weight, grid, grid_shape, name = _worker
+
+    # Rows of the field correspond to the values of the second presence variable
+    pvs = evaluation.inst.abs.pvs
+    tile = {pvs[0]: grid[pvs[0]], pvs[1]: grid[pvs[1]][lo:hi]}
+    elements = evaluation._evaluate_field_elements(dict(c_subs), c_weight, tile, (hi - lo, grid_shape[1]))
+
+    # Note: worker processes share the resource tracker of the parent, so
+    # attaching does not cause the shared memory to be unlinked on exit
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        constraints = evaluation.inst.abs.constraints
+        buffer = np.ndarray((len(constraints), *grid_shape), dtype=np.float64, buffer=memory.buf)
+        for index, constraint in enumerate(constraints):
+            buffer[index, lo:hi] = elements[constraint]
+        del buffer
+    finally:
+        memory.close()
+    return [elements[constraint].dtype.str for constraint in evaluation.inst.abs.constraints]
@@ -8,10 +8,11 @@ be a constant, a distribution, or a symbolic expression.
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 from typing import Protocol, cast, runtime_checkable
 
 import numpy as np
-from scipy import stats
+from scipy import special, stats
 
 from ..engine.frontend import graph
 from .context_variable import ContextVariable
@@ -47,6 +48,123 @@ class Distribution(Protocol):
         ...
 
 
+_UNIFORM = type(stats.uniform)
+_LOGNORM = type(stats.lognorm)
+_TRIANG = type(stats.triang)
+
+# Names of the positional parameters of the distributions we sample natively
+_PARAMETERS: dict[type, tuple[str, ...]] = {
+    _UNIFORM: ("loc", "scale"),
+    _LOGNORM: ("s", "loc", "scale"),
+    _TRIANG: ("c", "loc", "scale"),
+}
+
+
+def sample(distribution: Distribution, size: int, rng: np.random.Generator | None = None) -> np.ndarray:
+    """Sample values from the given distribution.
+
+    For frozen SciPy uniform, lognorm and triang distributions with valid
+    parameters, we draw the values directly using NumPy, skipping the
+    overhead of the SciPy `rvs` machinery. When `rng` is None, we draw from
+    the global NumPy random state like SciPy does, hence the values are the
+    same SciPy would return after the same `np.random.seed` call. For other
+    distributions, we fall back to their `rvs` method.
+
+    Args:
+        distribution: The distribution to sample from.
+        size: The number of values to sample.
+        rng: The generator to use, or None to use the global random state.
+    """
+    parameters = _native_parameters(distribution)
+    if parameters is None:
+        if rng is None:
+            return np.asarray(distribution.rvs(size=size))
+        return np.asarray(distribution.rvs(size=size, random_state=rng))
+
+    # Note: we use the same transformations as SciPy's `_rvs` methods
+    source = np.random if rng is None else rng
+    kind = type(distribution.dist)  # type: ignore
+    if kind is _UNIFORM:
+        values = source.uniform(0.0, 1.0, size)
+    elif kind is _LOGNORM:
+        values = np.exp(parameters["s"] * source.standard_normal(size))
+    else:
+        values = source.triangular(0.0, parameters["c"], 1.0, size)
+    return values * parameters.get("scale", 1.0) + parameters.get("loc", 0.0)
+
+
+def cdf(distribution: Distribution, x: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Compute the cumulative distribution function of the given distribution.
+
+    For frozen SciPy uniform, lognorm and triang distributions with valid
+    parameters, we compute the closed-form cdf in place into the result,
+    without the temporaries allocated by the SciPy `cdf` machinery. For
+    other distributions, we fall back to their `cdf` method.
+
+    Args:
+        distribution: The distribution whose cdf to compute.
+        x: The values at which to compute the cdf.
+        out: The array where to store the result, which must have the shape
+            of `x`, or None to allocate a new float64 array.
+    """
+    parameters = _native_parameters(distribution)
+    if out is None:
+        out = np.empty(np.shape(x), dtype=np.float64)
+    if parameters is None:
+        out[...] = distribution.cdf(x)
+        return out
+
+    # Note: we use the same expressions as SciPy's `_cdf` methods, applied
+    # to the standardized values, which we clip to the support (NaN stays NaN)
+    np.subtract(x, parameters.get("loc", 0.0), out=out)
+    out /= parameters.get("scale", 1.0)
+    kind = type(distribution.dist)  # type: ignore
+    if kind is _UNIFORM:
+        np.clip(out, 0.0, 1.0, out=out)
+
+    elif kind is _LOGNORM:
+        np.maximum(out, 0.0, out=out)
+        with np.errstate(divide="ignore"):
+            np.log(out, out=out)
+        out /= parameters["s"]
+        special.ndtr(out, out=out)
+
+    else:
+        c = parameters["c"]
+        np.clip(out, 0.0, 1.0, out=out)
+        squared = np.square(out)
+        left = np.less_equal(out, c) if c == 1.0 else np.less(out, c)
+        np.divide(squared, c, out=out, where=left)
+        right = np.logical_not(left, out=left)
+        np.multiply(out, -2.0, out=out, where=right)
+        np.add(out, squared, out=out, where=right)
+        np.add(out, c, out=out, where=right)
+        np.divide(out, c - 1.0, out=out, where=right)
+    return out
+
+
+def _native_parameters(distribution: Distribution) -> dict[str, float] | None:
+    """Return the parameters of a distribution we handle natively, or None."""
+    names = _PARAMETERS.get(type(getattr(distribution, "dist", None)))
+    if names is None:
+        return None
+    args, kwds = getattr(distribution, "args", ()), getattr(distribution, "kwds", {})
+    if len(args) > len(names) or not set(kwds).issubset(names):
+        return None
+    parameters = {**dict(zip(names, args)), **kwds}
+    if set(names[:-2]) - set(parameters):
+        return None
+
+    # Note: we let SciPy handle (i.e., reject) invalid parameters
+    try:
+        values = {name: float(value) for name, value in parameters.items()}
+    except (TypeError, ValueError):
+        return None
+    if not values.get("scale", 1.0) > 0 or not values.get("s", 1.0) > 0 or not 0 <= values.get("c", 0.0) <= 1:
+        return None
+    return values
+
+
 class Index:
     """Class to represent an index variable."""
 
@@ -86,7 +204,33 @@ class Index:
             self.node = graph.placeholder(name)
 
 
-class UniformDistIndex(Index):
+class _DistIndex(Index, ABC):
+    """Base class of the indexes whose value is a frozen SciPy distribution.
+
+    Freezing a SciPy distribution is expensive, hence the parameter setters
+    only drop the frozen distribution, which we freeze again when needed.
+    """
+
+    _frozen: Distribution | None = None
+
+    @property
+    def value(self) -> Distribution:
+        """Frozen distribution using the current parameters."""
+        if self._frozen is None:
+            self._frozen = self._freeze()
+        return self._frozen
+
+    @value.setter
+    def value(self, new_value: Distribution) -> None:
+        self._frozen = new_value
+
+    @abstractmethod
+    def _freeze(self) -> Distribution:
+        """Return the frozen distribution using the current parameters."""
+        ...
+
+
+class UniformDistIndex(_DistIndex):
     """Class to represent an index as a uniform distribution."""
 
     def __init__(
@@ -115,7 +259,7 @@ class UniformDistIndex(Index):
         """Location parameter setter."""
         if self._loc != new_loc:
             self._loc = new_loc
-            self.value = stats.uniform(loc=self._loc, scale=self._scale)
+            self._frozen = None
 
     @property
     def scale(self):
@@ -127,14 +271,17 @@ class UniformDistIndex(Index):
         """Scale parameter setter."""
         if self._scale != new_scale:
             self._scale = new_scale
-            self.value = stats.uniform(loc=self._loc, scale=self._scale)
+            self._frozen = None
+
+    def _freeze(self) -> Distribution:
+        return cast(Distribution, stats.uniform(loc=self._loc, scale=self._scale))
 
     def __str__(self):
         """Represent the index using a string."""
         return f"uniform_dist_idx({self.loc}, {self.scale})"
 
 
-class LognormDistIndex(Index):
+class LognormDistIndex(_DistIndex):
     """Class to represent an index as a lognorm distribution."""
 
     def __init__(
@@ -165,7 +312,7 @@ class LognormDistIndex(Index):
         """Set the location parameter of the lognorm distribution."""
         if self._loc != new_loc:
             self._loc = new_loc
-            self.value = stats.lognorm(loc=self._loc, scale=self._scale, s=self.s)
+            self._frozen = None
 
     @property
     def scale(self):
@@ -177,7 +324,7 @@ class LognormDistIndex(Index):
         """Set the scale parameter of the lognorm distribution."""
         if self._scale != new_scale:
             self._scale = new_scale
-            self.value = stats.lognorm(loc=self._loc, scale=self._scale, s=self._s)
+            self._frozen = None
 
     @property
     def s(self):
@@ -189,14 +336,17 @@ class LognormDistIndex(Index):
         """Set the shape parameter of the lognorm distribution."""
         if self._s != new_s:
             self._s = new_s
-            self.value = stats.lognorm(loc=self._loc, scale=self._scale, s=self._s)
+            self._frozen = None
+
+    def _freeze(self) -> Distribution:
+        return cast(Distribution, stats.lognorm(loc=self._loc, scale=self._scale, s=self._s))
 
     def __str__(self):
         """Represent the index using a string."""
         return f"longnorm_dist_idx({self.loc}, {self.scale}, {self.s})"
 
 
-class TriangDistIndex(Index):
+class TriangDistIndex(_DistIndex):
     """Class to represent an index as a triangular distribution."""
 
     def __init__(
@@ -227,7 +377,7 @@ class TriangDistIndex(Index):
         """Set the location parameter of the triangular distribution."""
         if self._loc != new_loc:
             self._loc = new_loc
-            self.value = stats.triang(loc=self._loc, scale=self._scale, c=self._c)
+            self._frozen = None
 
     @property
     def scale(self):
@@ -239,7 +389,7 @@ class TriangDistIndex(Index):
         """Set the scale parameter of the triangular distribution."""
         if self._scale != new_scale:
             self._scale = new_scale
-            self.value = stats.triang(loc=self._loc, scale=self._scale, c=self._c)
+            self._frozen = None
 
     @property
     def c(self):
@@ -251,7 +401,10 @@ class TriangDistIndex(Index):
         """Set the shape parameter of the triangular distribution."""
         if self._c != new_c:
             self._c = new_c
-            self.value = stats.triang(loc=self._loc, scale=self._scale, c=self._c)
+            self._frozen = None
+
+    def _freeze(self) -> Distribution:
+        return cast(Distribution, stats.triang(loc=self._loc, scale=self._scale, c=self._c))
 
     def __str__(self):
         """Return a string representation of the triangular distribution index."""
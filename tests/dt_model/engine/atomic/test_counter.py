@@ -0,0 +1,35 @@
+"""Tests for the civic_digital_twins.dt_model.engine.atomic.Counter type."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import threading
+
+from civic_digital_twins.dt_model.engine.atomic import Counter
+
+
+def test_counter_basic():
+    """Test that the counter returns increasing values from the start value."""
+    counter = Counter(start=1)
+    assert [counter.next() for _ in range(3)] == [1, 2, 3]
+    assert Counter().next() == 0
+
+
+def test_counter_thread_safety():
+    """Test that concurrent threads never obtain the same value."""
+    counter = Counter()
+    iterations = 1000
+    threads = 10
+    results: list[list[int]] = [[] for _ in range(threads)]
+
+    def allocate(values: list[int]):
+        for _ in range(iterations):
+            values.append(counter.next())
+
+    thread_list = [threading.Thread(target=allocate, args=(values,)) for values in results]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+
+    allocated = [value for values in results for value in values]
+    assert sorted(allocated) == list(range(threads * iterations))
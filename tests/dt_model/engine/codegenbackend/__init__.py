@@ -0,0 +1,3 @@
+"""Tests for the civic_digital_twins.dt_model.engine.codegenbackend package."""
+
+# SPDX-License-Identifier: Apache-2.0
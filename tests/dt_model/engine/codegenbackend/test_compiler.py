@@ -0,0 +1,146 @@
+"""Tests for the civic_digital_twins.dt_model.engine.codegenbackend.compiler module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import gc
+import linecache
+
+import numpy as np
+import pytest
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.codegenbackend import compiler
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+from civic_digital_twins.dt_model.simulation import plan
+
+
+def _execute(nodes: list[graph.Node], values: dict[graph.Node, np.ndarray]) -> dict[graph.Node, np.ndarray]:
+    state = executor.State(dict(values))
+    for node in nodes:
+        executor.evaluate(state, node)
+    return state.values
+
+
+def test_source():
+    """Test the generated source code."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y", default_value=2.0)
+    z = graph.where(x > y, graph.exp(x), graph.project_using_sum(graph.expand_dims(y, axis=0), axis=0))
+    program = compiler.compile(linearize.forest(z), outputs=[z])
+    assert program.source == (
+        "def program(n0, n1):\n"
+        "    n2 = f_greater(n0, n1)\n"
+        "    n3 = f_exp(n0)\n"
+        "    del n0\n"
+        "    n4 = f_expand_dims(n1, a4)\n"
+        "    del n1\n"
+        "    n5 = f_reduce_sum(n4, a5)\n"
+        "    del n4\n"
+        "    n6 = f_where(n2, n3, n5)\n"
+        "    del n2, n3, n5\n"
+        "    return (n6,)\n"
+    )
+    assert program.inputs == (x, y)
+    assert program.outputs == (z,)
+
+
+def test_source_registration():
+    """Test that we register the source for tracebacks and drop it with the program."""
+    x = graph.placeholder("x")
+    program = compiler.compile(linearize.forest(graph.exp(x)))
+    filename = program.function.__code__.co_filename
+    assert linecache.getline(filename, 1) == "def program(n0):\n"
+
+    del program
+    gc.collect()
+    assert filename not in linecache.cache
+
+
+def test_results_match_executor():
+    """Test that programs compute the same values as the executor."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y", default_value=0.5)
+    a = graph.exp(x * y - 1.0)
+    b = graph.project_using_mean(graph.expand_dims(a, axis=(0, 1)), axis=0)
+    c = graph.multi_clause_where([(x > 0.5, b), (x > 0.2, a)], graph.log(a) + graph.maximum(x, y))
+    d = graph.logical_not(c < 0.0) & (x != y)
+
+    nodes = linearize.forest(c, d)
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(0.0, 1.0, 11)}
+    expected = _execute(nodes, values)
+    got = compiler.compile(nodes, outputs=[c, d])(values)
+    assert list(got.keys()) == [c, d]
+    for node, value in got.items():
+        assert value.dtype == expected[node].dtype
+        assert np.array_equal(value, expected[node])
+
+
+def test_inputs_override_nodes():
+    """Test that we can provide the value of any node as an input."""
+    x = graph.placeholder("x")
+    k = graph.constant(1.0)
+    y = x + k
+    program = compiler.compile(linearize.forest(y), inputs=[x, k])
+    assert program({x: np.array(1.0), k: np.array(41.0)})[y] == 42.0
+
+    with pytest.raises(executor.NodeValueNotFound):
+        program({x: np.array(1.0)})
+
+
+def test_errors():
+    """Test the errors raised when compiling and evaluating."""
+    x = graph.placeholder("x")
+    program = compiler.compile(linearize.forest(x + 1.0))
+    with pytest.raises(executor.PlaceholderValueNotProvided):
+        program({})
+
+    with pytest.raises(executor.PlaceholderValueNotProvided):
+        compiler.compile(linearize.forest(x + 1.0), inputs=[])
+
+    with pytest.raises(ValueError):
+        compiler.compile(linearize.forest(x), outputs=[graph.placeholder("y")])
+
+    class unknown(graph.UnaryOp):
+        pass
+
+    with pytest.raises(executor.UnsupportedOperation):
+        compiler.compile(linearize.forest(unknown(x)))
+
+
+def test_debug_flags(capsys, monkeypatch):
+    """Test that the program honours the debug flags."""
+    prompts = []
+    monkeypatch.setattr("builtins.input", lambda prompt: prompts.append(prompt))
+
+    x = graph.placeholder("x")
+    y = graph.tracepoint(x * 2.0)
+    z = graph.breakpoint(y + 1.0)
+    program = compiler.compile(linearize.forest(z))
+    assert program({x: np.array(1.0)})[z] == 3.0
+    assert capsys.readouterr().out.count("=== begin tracepoint ===") == 2
+    assert len(prompts) == 1
+
+    program = compiler.compile(linearize.forest(x + 1.0), flags=graph.NODE_FLAG_TRACE)
+    program({x: np.array(1.0)})
+    assert capsys.readouterr().out.count("=== begin tracepoint ===") == 3
+
+
+def test_molveno_matches_evaluation():
+    """Test that compiling the Molveno plan reproduces the evaluation results exactly."""
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {}))[:5])
+    evaluation.evaluate_grid({PV_tourists: np.linspace(0, 10000, 6), PV_excursionists: np.linspace(0, 10000, 6)})
+    assert evaluation.index_vals is not None
+
+    compiled = plan.get(M_Base)
+    placeholders = [node for node in compiled.nodes if isinstance(node, graph.placeholder)]
+    program = compiler.compile(compiled.nodes, outputs=compiled.targets)
+    got = program({node: evaluation.index_vals[node] for node in placeholders})
+    for output, target in zip(compiled.outputs, compiled.targets):
+        assert np.array_equal(got[target], evaluation.index_vals[output])
@@ -0,0 +1,116 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.cse module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import cse, graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor
+from civic_digital_twins.dt_model.internal.sympyke import Eq, Piecewise, Symbol
+
+
+def test_merge_identical_subtrees():
+    """Test that structurally identical subtrees are merged."""
+    x = graph.placeholder("x")
+    a = graph.exp(x + 1.0)
+    b = graph.exp(x + 1.0)
+    out = a * b
+
+    mapping = cse.forest(out)
+    assert mapping[a] is mapping[b]
+    assert mapping[x] is x
+
+    # x, 1.0, add, exp, multiply
+    assert len(linearize.forest(mapping[out])) == 5
+
+
+def test_constants_of_different_types_are_not_merged():
+    """Test that 1, 1.0 and True are different constants."""
+    one_int = graph.constant(1)
+    one_float = graph.constant(1.0)
+    one_bool = graph.constant(True)
+    mapping = cse.forest(one_int, one_float, one_bool, graph.constant(1.0))
+    assert mapping[one_int] is not mapping[one_float]
+    assert mapping[one_float] is not mapping[one_bool]
+    assert len({id(node) for node in mapping.values()}) == 3
+
+
+def test_named_and_signed_zero_constants_are_not_merged():
+    """Test that named constants and constants differing only in the sign of zero are kept distinct."""
+    tourists = graph.constant(2.5, "tourists factor")
+    excursionists = graph.constant(2.5, "excursionists factor")
+    zero, negative_zero = graph.constant(0.0), graph.constant(-0.0)
+    mapping = cse.forest(tourists, excursionists, zero, negative_zero, graph.constant(0.0))
+    assert mapping[tourists] is tourists
+    assert mapping[excursionists] is excursionists
+    assert mapping[zero] is not mapping[negative_zero]
+    assert len({id(node) for node in mapping.values()}) == 4
+
+
+def test_kept_nodes_are_not_merged():
+    """Test that kept nodes are not merged with identical nodes."""
+    x = graph.placeholder("x")
+    kept = graph.exp(x)
+    other = graph.exp(x)
+    again = graph.exp(x)
+    mapping = cse.forest(kept, other, again, keep=[kept])
+    assert mapping[kept] is kept
+    assert mapping[other] is not kept
+    assert mapping[again] is mapping[other]
+
+
+def test_placeholders_and_flagged_nodes_are_not_merged():
+    """Test that placeholders and nodes with debug flags are kept distinct."""
+    x1 = graph.placeholder("x")
+    x2 = graph.placeholder("x")
+    traced = graph.tracepoint(graph.exp(x1))
+    plain = graph.exp(x1)
+
+    mapping = cse.forest(x1, x2, traced, plain)
+    assert mapping[x1] is x1
+    assert mapping[x2] is x2
+    assert mapping[traced] is traced
+    assert mapping[plain] is plain
+
+
+def test_axis_ops():
+    """Test that axis operations are merged only when the axis matches."""
+    x = graph.placeholder("x")
+    s0 = graph.reduce_sum(x, axis=0)
+    s0bis = graph.reduce_sum(x, axis=0)
+    s1 = graph.reduce_sum(x, axis=1)
+    mean0 = graph.reduce_mean(x, axis=0)
+
+    mapping = cse.forest(s0, s0bis, s1, mean0)
+    assert mapping[s0] is mapping[s0bis]
+    assert mapping[s0] is not mapping[s1]
+    assert mapping[s0] is not mapping[mean0]
+
+
+def test_piecewise_sharing_and_results():
+    """Test that repeated Piecewise conditions are shared and results do not change."""
+    weather = graph.placeholder("weather")
+    presence = graph.placeholder("presence")
+    f1 = Piecewise((0.55, Eq(weather, Symbol("bad"))), (0.80, True))
+    f2 = Piecewise((0.25, Eq(weather, Symbol("bad"))), (0.80, True))
+    out = presence * f1 + presence * f2
+
+    mapping = cse.forest(out)
+    g1, g2 = mapping[f1], mapping[f2]
+    assert isinstance(g1, graph.multi_clause_where)
+    assert isinstance(g2, graph.multi_clause_where)
+    assert g1.clauses[0][0] is g2.clauses[0][0]
+    assert g1.default_value is g2.default_value
+
+    inputs: dict[graph.Node, np.ndarray] = {
+        weather: np.array(["bad", "good", "bad"]),
+        presence: np.array([1.0, 2.0, 3.0]),
+        Symbol("bad").node: np.array("bad"),
+    }
+    expect = executor.State(dict(inputs))
+    for node in linearize.forest(out):
+        executor.evaluate(expect, node)
+    got = executor.State(dict(inputs))
+    for node in linearize.forest(mapping[out]):
+        executor.evaluate(got, node)
+    assert np.array_equal(expect.values[out], got.values[mapping[out]])
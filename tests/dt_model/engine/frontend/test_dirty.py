@@ -0,0 +1,27 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.dirty module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from civic_digital_twins.dt_model.engine.frontend import dirty, graph, linearize
+
+
+def test_propagate():
+    """Test that we mark the changed nodes and all the nodes depending on them."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    a = graph.exp(x)
+    b = graph.log(y)
+    c = graph.add(a, b)
+    d = graph.multiply(b, graph.constant(2.0))
+    plan = linearize.forest(c, d)
+
+    def _dirty(*changed: graph.Node) -> list[graph.Node]:
+        return [plan[index] for index in dirty.propagate(plan, changed)]
+
+    assert [node.id for node in _dirty(x)] == [x.id, a.id, c.id]
+    assert {node.id for node in _dirty(y)} == {y.id, b.id, c.id, d.id}
+    assert len(_dirty(x, y)) == 6
+    assert _dirty() == []
+
+    # Changing an intermediate node only affects its consumers
+    assert [node.id for node in _dirty(a)] == [a.id, c.id]
@@ -0,0 +1,87 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.fingerprint module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from civic_digital_twins.dt_model.engine.frontend import fingerprint, graph, serialize
+
+
+def _model() -> graph.Node:
+    x = graph.placeholder("x", 1.5)
+    cv = graph.placeholder("cv")
+    y = graph.where(x > 1, graph.exp(x) * 2, graph.take([0.5, 0.8], cv))
+    return graph.project_using_sum(graph.expand_dims(y, (0, 1)), 0)
+
+
+def test_structural_equality():
+    """Test that structurally identical graphs have the same digests."""
+    first, second = _model(), _model()
+    assert first.id != second.id
+    assert fingerprint.forest(first)[first] == fingerprint.forest(second)[second]
+
+    (loaded,) = serialize.loads(serialize.dumps(first))
+    assert fingerprint.forest(loaded)[loaded] == fingerprint.forest(first)[first]
+
+
+def test_names_and_flags():
+    """Test that only the names of placeholders change the digests."""
+    x = graph.placeholder("x")
+    y = graph.exp(x)
+    traced = graph.tracepoint(graph.exp(x))
+    traced.name = "traced"
+    assert fingerprint.forest(y)[y] == fingerprint.forest(traced)[traced]
+
+    z = graph.exp(graph.placeholder("z"))
+    assert fingerprint.forest(y)[y] != fingerprint.forest(z)[z]
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        (graph.constant(1), graph.constant(1.0)),
+        (graph.constant(1), graph.constant(True)),
+        (graph.constant(0.0), graph.constant(-0.0)),
+        (graph.placeholder("x"), graph.placeholder("x", 0.0)),
+        (graph.expand_dims(graph.placeholder("x"), 0), graph.expand_dims(graph.placeholder("x"), (0,))),
+        (graph.placeholder("x") - graph.placeholder("y"), graph.placeholder("y") - graph.placeholder("x")),
+        (graph.placeholder("x") + 1, graph.placeholder("x") * 1),
+    ],
+)
+def test_differences(left: graph.Node, right: graph.Node):
+    """Test that attributes, input order and node types change the digests."""
+    assert fingerprint.forest(left)[left] != fingerprint.forest(right)[right]
+
+
+def test_symbols():
+    """Test that we identify the placeholders of symbols by name only."""
+    left, right = graph.placeholder("good", 0), graph.placeholder("good", 3)
+    assert fingerprint.forest(left, symbols=[left])[left] == fingerprint.forest(right, symbols=[right])[right]
+    assert fingerprint.forest(left)[left] != fingerprint.forest(right)[right]
+
+
+def test_numpy_scalars():
+    """Test that NumPy scalars have the digest of the corresponding Python scalars."""
+    values = [np.float64(0.5), np.int64(3), np.bool_(True)]
+    for value, expected in zip(values, [0.5, 3, True]):
+        left, right = graph.constant(value), graph.constant(expected)
+        assert fingerprint.forest(left)[left] == fingerprint.forest(right)[right]
+
+
+def test_stable_across_processes():
+    """Test that the digest does not depend on the process computing it."""
+    code = (
+        "from civic_digital_twins.dt_model.engine.frontend import graph\n"
+        "from tests.dt_model.engine.frontend.test_fingerprint import _model\n"
+        "from civic_digital_twins.dt_model.engine.frontend import fingerprint\n"
+        "graph.placeholder('shift the node ids')\n"
+        "root = _model()\n"
+        "print(fingerprint.forest(root)[root])\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    root = _model()
+    assert output.strip() == fingerprint.forest(root)[root]
@@ -2,6 +2,8 @@
 
 # SPDX-License-Identifier: Apache-2.0
 
+import pickle
+
 from civic_digital_twins.dt_model.engine.frontend import graph
 
 
@@ -411,3 +413,29 @@ def test_ensure_node_function():
     result_bool = graph.ensure_node(True)
     assert isinstance(result_bool, graph.constant)
     assert result_bool.value is True
+
+
+def test_compact_layout():
+    """Test that nodes do not carry a __dict__ and survive pickling."""
+    x = graph.placeholder("x", 1.0)
+    nodes = [
+        x,
+        graph.constant(2.0),
+        x + 1.0,
+        graph.exp(x),
+        graph.where(x > 0.0, x, graph.constant(0.0)),
+        graph.multi_clause_where([(x > 0.0, x)], graph.constant(0.0)),
+        graph.take([1.0, 2.0], x),
+        graph.expand_dims(x, 0),
+        graph.project_using_sum(x, (0, 1)),
+    ]
+    for node in nodes:
+        assert not hasattr(node, "__dict__")
+        copy = pickle.loads(pickle.dumps(node))
+        assert type(copy) is type(node)
+        assert (copy.id, copy.name, copy.flags) == (node.id, node.name, node.flags)
+
+    copy = pickle.loads(pickle.dumps(nodes[4]))
+    assert isinstance(copy, graph.where)
+    assert isinstance(copy.condition, graph.greater)
+    assert copy.then is copy.condition.left
@@ -2,6 +2,8 @@
 
 # SPDX-License-Identifier: Apache-2.0
 
+import sys
+
 import pytest
 
 from civic_digital_twins.dt_model.engine.frontend import graph, linearize
@@ -239,3 +241,34 @@ def test_unknown_node_type():
 
     with pytest.raises(TypeError, match="unknown node type"):
         linearize.forest(custom_node)
+
+
+def test_deep_graph():
+    """Test that we linearize graphs deeper than the recursion limit."""
+    x = graph.placeholder("x")
+    total = x
+    for index in range(sys.getrecursionlimit() * 5):
+        total = graph.add(total, graph.constant(float(index)))
+
+    plan = linearize.forest(total)
+    assert len(plan) == sys.getrecursionlimit() * 10 + 1
+    assert plan[0] is x and plan[-1] is total
+
+
+def test_depth_first_ordering():
+    """Test that we schedule the dependencies depth first and in order."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    zero = graph.constant(0.0)
+    a = graph.exp(x)
+    gt = graph.greater(x, y)
+    log = graph.log(y)
+    b = graph.where(gt, a, log)
+    positive = graph.greater(x, zero)
+    negative = graph.greater(y, zero)
+    c = graph.multi_clause_where([(positive, b), (negative, a)], x)
+    d = graph.exp(a)
+
+    plan = linearize.forest(c, b, d)
+    expected = [x, zero, positive, y, gt, a, log, b, negative, c, d]
+    assert [n.id for n in plan] == [n.id for n in expected]
@@ -0,0 +1,47 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.liveness module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, liveness
+
+
+def test_last_uses():
+    """Test that we compute the last step using each node."""
+    x = graph.placeholder("x")
+    a = graph.exp(x)
+    b = graph.log(x)
+    c = graph.add(a, b)
+    plan = linearize.forest(c)
+    assert [node.id for node in plan] == [x.id, a.id, b.id, c.id]
+
+    uses = liveness.last_uses(plan)
+    assert uses[x] == 2
+    assert uses[a] == 3
+    assert uses[b] == 3
+    assert uses[c] == 3
+
+
+def test_releases():
+    """Test that we release nodes after their last use unless kept."""
+    x = graph.placeholder("x")
+    a = graph.exp(x)
+    b = graph.log(x)
+    c = graph.add(a, b)
+    d = graph.multiply(a, graph.constant(2.0))
+    plan = linearize.forest(c, d)
+
+    steps = liveness.releases(plan, keep=[c, d])
+    assert len(steps) == len(plan)
+
+    def position(target: graph.Node) -> int:
+        return next(index for index, node in enumerate(plan) if node is target)
+
+    released = {node: index for index, step in enumerate(steps) for node in step}
+    assert set(released.keys()) == {x, a, b, d.right}
+    assert released[x] == position(b)
+    assert released[a] == position(d)
+    assert released[b] == position(c)
+
+    # Kept nodes are never released
+    steps = liveness.releases(plan, keep=[c, d, a])
+    assert all(node is not a for step in steps for node in step)
@@ -0,0 +1,100 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.lookup module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, lookup, pretty
+from civic_digital_twins.dt_model.engine.numpybackend import executor, precision
+
+
+def _symbols() -> tuple[graph.Node, graph.Node, graph.Node, dict[graph.Node, int]]:
+    good = graph.placeholder("good", 0)
+    unsettled = graph.placeholder("unsettled", 1)
+    bad = graph.placeholder("bad", 2)
+    return good, unsettled, bad, {good: 0, unsettled: 1, bad: 2}
+
+
+def _evaluate(node: graph.Node, inputs: dict[graph.Node, np.ndarray], **kwargs) -> np.ndarray:
+    state = executor.State(dict(inputs), **kwargs)
+    for item in linearize.forest(node):
+        executor.bind(item)(state)
+    return state.values[node]
+
+
+def test_rewrite():
+    """Test that categorical piecewise functions become lookups where the first clause wins."""
+    good, unsettled, bad, codes = _symbols()
+    cv = graph.placeholder("weather")
+    node = graph.multi_clause_where(
+        [
+            (graph.equal(cv, bad), graph.constant(0.25)),
+            (graph.equal(unsettled, cv), graph.constant(0.5)),
+            (graph.equal(cv, bad), graph.constant(1.0)),
+        ],
+        graph.constant(0.75),
+    )
+    node.name = "factor"
+    got = lookup.forest(node, codes=codes, subjects=[cv])[node]
+    assert isinstance(got, graph.take)
+    assert got.indices is cv
+    assert got.table == (0.75, 0.5, 0.25, 0.75)
+    assert got.name == "factor"
+    assert pretty.format(got) == "factor = take([0.75, 0.5, 0.25, 0.75], weather)"
+
+    # The lookup computes the same values, including for unknown codes
+    values: dict[graph.Node, np.ndarray] = {cv: np.array([[0, 1, 2], [2, 1, 7]], dtype=np.int8)}
+    expected = _evaluate(node, values)
+    assert np.array_equal(_evaluate(got, values), expected)
+    assert _evaluate(got, values).dtype == expected.dtype
+
+    # The lookup honours the precision policy
+    assert _evaluate(got, values, precision=precision.FLOAT32).dtype == np.float32
+
+
+def test_non_categorical_nodes_are_preserved():
+    """Test that we only rewrite the piecewise functions matching the pattern."""
+    good, unsettled, bad, codes = _symbols()
+    cv = graph.placeholder("weather")
+    other = graph.placeholder("season")
+    x = graph.placeholder("x")
+
+    def _clause(condition: graph.Node, value: graph.Node | float = 1.0) -> graph.Node:
+        return graph.multi_clause_where([(condition, graph.ensure_node(value))], graph.constant(0.0))
+
+    for node in (
+        _clause(graph.equal(cv, bad), x),  # not a constant value
+        _clause(graph.equal(cv, bad), 1),  # mixed types
+        _clause(graph.equal(cv, other)),  # not a symbol
+        _clause(graph.equal(bad, good)),  # two symbols
+        _clause(graph.less(cv, bad)),  # not an equality
+        _clause(graph.tracepoint(graph.equal(cv, bad))),  # flagged condition
+        graph.tracepoint(_clause(graph.equal(cv, bad))),  # flagged node
+        graph.multi_clause_where(
+            [(graph.equal(cv, bad), graph.constant(1.0)), (graph.equal(other, good), graph.constant(2.0))],
+            graph.constant(0.0),
+        ),  # different subjects
+    ):
+        assert isinstance(lookup.forest(node, codes=codes, subjects=[cv])[node], graph.multi_clause_where)
+
+
+def test_unknown_subjects_are_preserved():
+    """Test that we only rewrite the piecewise functions whose subject evaluates to codes."""
+    _, _, bad, codes = _symbols()
+    cv, x = graph.placeholder("weather"), graph.placeholder("x")
+    for subject in (x, graph.exp(cv)):
+        node = graph.multi_clause_where([(graph.equal(subject, bad), graph.constant(2.0))], graph.constant(1.0))
+        assert lookup.forest(node, codes=codes, subjects=[cv])[node] is node
+
+
+def test_consumers_are_rebuilt():
+    """Test that the consumers of rewritten nodes use the lookup."""
+    _, _, bad, codes = _symbols()
+    cv = graph.placeholder("weather")
+    x = graph.placeholder("x")
+    factor = graph.multi_clause_where([(graph.equal(cv, bad), graph.constant(2.0))], graph.constant(1.0))
+    node = x * factor
+    got = lookup.forest(node, codes=codes, subjects=[cv])[node]
+    assert isinstance(got, graph.multiply)
+    assert got.left is x
+    assert isinstance(got.right, graph.take)
@@ -0,0 +1,29 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.operations module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import ast
+import pathlib
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, operations, simplify
+
+
+def test_frontend_does_not_import_backends():
+    """Test that the frontend modules do not depend on the backends."""
+    for path in pathlib.Path(operations.__file__).parent.glob("*.py"):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.ImportFrom):
+                assert "backend" not in (node.module or ""), path.name
+            elif isinstance(node, ast.Import):
+                assert all("backend" not in alias.name for alias in node.names), path.name
+
+
+def test_custom_operations():
+    """Test that constant folding uses the given operations."""
+    table = operations.Operations(binary={graph.add: np.subtract}, unary={}, axes={})
+    node = graph.constant(3.0) + graph.constant(1.0)
+    folded = simplify.forest(node, operations=table)[node]
+    assert isinstance(folded, graph.constant)
+    assert folded.value == 2.0
@@ -333,3 +333,57 @@ def test_nested_logical_precedence():
     expr6 = graph.logical_and(graph.logical_or(x, y), graph.logical_or(z, w))
     result6 = pretty.format(expr6)
     assert result6 == "(x | y) & (z | w)"
+
+
+def test_take_pretty_printing():
+    """Test pretty printing of take operation."""
+    codes = graph.placeholder("codes")
+    expr = graph.take([1.0, 2.0], codes)
+    assert pretty.format(expr) == "take([1.0, 2.0], codes)"
+
+
+def test_format_dag_binds_shared_subexpressions():
+    """Test that format_dag binds anonymous nodes used more than once."""
+    x = graph.placeholder("x")
+    t = graph.exp(x)
+    u = graph.multiply(t, t)
+    v = graph.multiply(graph.add(u, graph.constant(1.0)), u)
+    assert pretty.format_dag(v) == "let t1 = exp(x)\nlet t2 = t1 * t1\n(t2 + 1.0) * t2"
+
+    # Without sharing, the output matches format
+    w = graph.multiply(graph.add(x, graph.constant(1.0)), graph.exp(x))
+    assert pretty.format_dag(w) == pretty.format(w) == "(x + 1.0) * exp(x)"
+
+
+def test_format_dag_named_nodes():
+    """Test that format_dag stops at named nodes unless expanding them."""
+    x = graph.placeholder("x")
+    t1 = graph.exp(x)
+    t1.name = "t1"
+    shared = graph.add(t1, x)
+    y = graph.multiply(shared, shared)
+    y.name = "y"
+    assert pretty.format_dag(y) == "let t2 = t1 + x\ny = t2 * t2"
+    assert pretty.format_dag(y, expand_names=True) == "let t1 = exp(x)\nlet t2 = t1 + x\ny = t2 * t2"
+
+
+def test_format_dag_linear_output():
+    """Test that the output of format_dag grows linearly with nested sharing."""
+    x = graph.placeholder("x")
+    node: graph.Node = x
+    for _ in range(64):
+        node = graph.add(node, node)
+    lines = pretty.format_dag(node).splitlines()
+    assert len(lines) == 64
+    assert lines[0] == "let t1 = x + x"
+    assert lines[-1] == "t63 + t63"
+
+
+def test_deep_graph_pretty_printing():
+    """Test formatting graphs deeper than the recursion limit."""
+    x = graph.placeholder("x")
+    node: graph.Node = x
+    for _ in range(5000):
+        node = graph.add(node, graph.constant(1.0))
+    assert pretty.format(node) == "x" + " + 1.0" * 5000
+    assert pretty.format_dag(node) == pretty.format(node)
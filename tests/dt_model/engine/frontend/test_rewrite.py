@@ -0,0 +1,107 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.rewrite module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+
+from civic_digital_twins.dt_model.engine.frontend import graph, rewrite
+
+
+def test_inputs():
+    """Test that inputs returns the direct inputs in order."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    c = graph.constant(1.0)
+
+    node = graph.multi_clause_where([(x, y)], c)
+    got = rewrite.inputs(node)
+    assert len(got) == 3
+    assert got[0] is x and got[1] is y and got[2] is c
+
+    assert rewrite.inputs(c) == []
+
+
+def test_rebuild_unchanged_returns_same_node():
+    """Test that rebuild returns the original node when inputs do not change."""
+    x = graph.placeholder("x")
+    node = graph.exp(x)
+    assert rewrite.rebuild(node, [x]) is node
+
+
+def test_rebuild_copies_type_name_and_flags():
+    """Test that rebuild preserves type, name, flags, and attributes."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    z = graph.placeholder("z")
+
+    binary = graph.tracepoint(graph.subtract(x, y))
+    binary.name = "diff"
+    copy = rewrite.rebuild(binary, [z, y])
+    assert isinstance(copy, graph.subtract)
+    assert copy is not binary
+    assert copy.left is z and copy.right is y
+    assert copy.name == "diff"
+    assert copy.flags == binary.flags
+    assert copy.id != binary.id
+
+    unary = graph.log(x)
+    assert isinstance(rewrite.rebuild(unary, [z]), graph.log)
+
+    axis = graph.reduce_mean(x, axis=(0, 1))
+    axis_copy = rewrite.rebuild(axis, [z])
+    assert isinstance(axis_copy, graph.project_using_mean)
+    assert axis_copy.axis == (0, 1)
+
+    where = graph.where(x, y, z)
+    where_copy = rewrite.rebuild(where, [z, y, x])
+    assert isinstance(where_copy, graph.where)
+    assert where_copy.condition is z and where_copy.otherwise is x
+
+    multi = graph.multi_clause_where([(x, y), (y, z)], x)
+    multi_copy = rewrite.rebuild(multi, [z, z, x, x, y])
+    assert isinstance(multi_copy, graph.multi_clause_where)
+    assert multi_copy.clauses[1][0] is x and multi_copy.clauses[1][1] is x
+    assert multi_copy.default_value is y
+
+    take = graph.take([1.0, 2.0], x)
+    take_copy = rewrite.rebuild(take, [z])
+    assert isinstance(take_copy, graph.take)
+    assert take_copy.indices is z and take_copy.table == (1.0, 2.0)
+
+
+def test_rebuild_errors():
+    """Test that rebuild rejects mismatching inputs and unknown node types."""
+    x = graph.placeholder("x")
+    with pytest.raises(ValueError):
+        rewrite.rebuild(graph.exp(x), [x, x])
+
+    class custom(graph.Node):
+        pass
+
+    with pytest.raises(TypeError, match="unknown node type"):
+        rewrite.rebuild(custom(), [])
+
+
+def test_apply():
+    """Test that apply maps nodes and leaves unmapped nodes alone."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    got = rewrite.apply({x: y}, [x, y])
+    assert got[0] is y and got[1] is y
+
+
+def test_substitute_and_compose():
+    """Test that substitute replaces nodes in the graph and compose chains mappings."""
+    x = graph.placeholder("x")
+    c = graph.constant(2.0, "c")
+    y = graph.exp(x * c)
+    p = graph.placeholder("c", 2.0)
+
+    first = rewrite.substitute({c: p}, y)
+    assert first[x] is x and first[c] is p
+    assert isinstance(first[y], graph.exp) and first[y].node.right is p  # type: ignore
+
+    second: rewrite.Mapping = {first[y]: x, x: x}
+    composed = rewrite.compose(first, second)
+    assert composed[y] is x and composed[x] is x
+    assert c not in composed
@@ -0,0 +1,163 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.serialize module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import struct
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, pretty, serialize
+from civic_digital_twins.dt_model.engine.numpybackend import executor
+from civic_digital_twins.dt_model.internal.sympyke import Symbol, symbol
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import M_Base
+from civic_digital_twins.dt_model.simulation import plan
+
+
+def _all_types() -> graph.Node:
+    x = graph.placeholder("x", 1.5)
+    codes = graph.placeholder("codes")
+    a = graph.exp(x) + graph.log(x) - x * 2 / graph.power(x, graph.constant(3)) + graph.maximum(x, graph.constant(-1))
+    b = (x < 1) & (x <= 2) | (x > 3) ^ (x >= 4)
+    c = graph.logical_not(b) & (x == True) & (x != 0)  # noqa: E712
+    d = graph.where(c, a, graph.constant(False))
+    e = graph.multi_clause_where([(b, d), (c, a)], graph.take([1.0, 2, True], codes))
+    e.name = "e"
+    f = graph.project_using_sum(graph.expand_dims(e, (0, 2)), 0)
+    g = graph.project_using_mean(graph.squeeze(f, -1), (0,))
+    return graph.tracepoint(g)
+
+
+def test_round_trip():
+    """Test that decoding preserves the type, name, flags and attributes of each node."""
+    root = _all_types()
+    (loaded,) = serialize.loads(serialize.dumps(root))
+
+    expected = linearize.forest(root)
+    got = linearize.forest(loaded)
+    assert len(got) == len(expected)
+    for old, new in zip(expected, got):
+        assert old is not new
+        assert type(new) is type(old)
+        assert (new.name, new.flags) == (old.name, old.flags)
+        for attribute in ("value", "default_value", "table", "axis"):
+            if hasattr(old, attribute):
+                assert getattr(new, attribute) == getattr(old, attribute)
+                assert type(getattr(new, attribute)) is type(getattr(old, attribute))
+    assert pretty.format_dag(loaded, expand_names=True) == pretty.format_dag(root, expand_names=True)
+
+
+def test_sharing():
+    """Test that decoding preserves the sharing of nodes across paths and roots."""
+    x = graph.placeholder("x")
+    shared = graph.exp(x)
+    y = shared * shared
+    z = graph.where(x > 0.0, shared, y)
+
+    loaded_y, loaded_z, loaded_x = serialize.loads(serialize.dumps(y, z, x))
+    assert isinstance(loaded_y, graph.multiply) and isinstance(loaded_z, graph.where)
+    assert loaded_y.left is loaded_y.right
+    assert loaded_z.then is loaded_y.left
+    assert loaded_z.otherwise is loaded_y
+    assert isinstance(loaded_z.condition, graph.greater)
+    assert loaded_z.condition.left is loaded_x
+
+
+def test_plan():
+    """Test that plans keep the order of their nodes."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    nodes = [y, x, graph.exp(x), graph.log(y)]
+    loaded = serialize.loads_plan(serialize.dumps_plan(nodes))
+    assert [type(node) for node in loaded] == [type(node) for node in nodes]
+    assert [node.name for node in loaded] == ["y", "x", "", ""]
+    assert isinstance(loaded[2], graph.exp) and loaded[2].node is loaded[1]
+
+    with pytest.raises(ValueError, match="does not precede"):
+        serialize.dumps_plan(nodes[1:])
+
+
+def test_numpy_scalars():
+    """Test that we preserve the type of NumPy scalars."""
+    values = [np.float64(0.5), np.int64(-3), np.bool_(True), np.float32(0.1), np.int8(-7), 0.5, -3, True]
+    loaded = serialize.loads(serialize.dumps(*(graph.constant(value) for value in values)))
+    got = [node.value for node in loaded if isinstance(node, graph.constant)]
+    assert got == values
+    assert [type(value) for value in got] == [type(value) for value in values]
+
+
+def test_symbols():
+    """Test that we re-intern the placeholders of symbols by name."""
+    code = (
+        "import sys\n"
+        "from civic_digital_twins.dt_model.engine.frontend import serialize\n"
+        "from civic_digital_twins.dt_model.internal.sympyke import Symbol\n"
+        "for name in ('shift', 'the', 'symbol', 'codes'):\n"
+        "    Symbol(name)\n"
+        "bad = Symbol('bad').node\n"
+        "sys.stdout.buffer.write(serialize.dumps(bad, symbols=[bad]))\n"
+    )
+    data = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True).stdout
+    (loaded,) = serialize.loads(data, intern=lambda name: Symbol(name).node)
+    assert loaded is Symbol("bad").node
+
+    with pytest.raises(serialize.FormatError, match="without intern"):
+        serialize.loads(data)
+
+    # Loading does not modify the interned symbols
+    bad = Symbol("bad").node
+    traced = graph.placeholder("bad", 0)
+    traced.flags = graph.NODE_FLAG_TRACE
+    with pytest.raises(serialize.FormatError, match="does not match"):
+        serialize.loads(serialize.dumps(traced, symbols=[traced]), intern=lambda name: Symbol(name).node)
+    assert bad.flags == 0 and bad.name == "bad"
+
+
+def test_model_round_trip():
+    """Test that the decoded graph of a model evaluates to the same values."""
+    outputs = plan.outputs(M_Base)
+    symbols = [entry.node for entry in symbol.symbol_table.values()]
+    loaded = serialize.loads(serialize.dumps(*outputs, symbols=symbols), intern=lambda name: Symbol(name).node)
+
+    def _evaluate(leaves) -> list[np.ndarray]:
+        # Note: the decoded placeholders are new nodes, so we provide
+        # the same values for the placeholders of each graph
+        nodes = linearize.forest(*leaves)
+        values: dict[graph.Node, np.ndarray] = {
+            node: np.linspace(1.0, 2.0, 5) for node in nodes if isinstance(node, graph.placeholder)
+        }
+        state = executor.State(values)
+        for node in nodes:
+            executor.evaluate(state, node)
+        return [state.values[leaf] for leaf in leaves]
+
+    for got, expected in zip(_evaluate(loaded), _evaluate(outputs)):
+        assert np.array_equal(got, expected)
+
+
+def test_format_errors():
+    """Test that decoding invalid data raises FormatError."""
+    data = serialize.dumps(_all_types())
+    with pytest.raises(serialize.FormatError, match="not a serialized graph"):
+        serialize.loads(b"XXXX" + data[4:])
+    with pytest.raises(serialize.FormatError, match="unsupported version"):
+        serialize.loads(data[:4] + struct.pack("<H", serialize.VERSION + 1) + data[6:])
+    with pytest.raises(serialize.FormatError, match="truncated"):
+        serialize.loads(data[:3])
+    for size in (10, len(data) // 2, len(data) - 1):
+        with pytest.raises(serialize.FormatError, match="corrupted"):
+            serialize.loads(data[:size])
+    with pytest.raises(serialize.FormatError, match="trailing"):
+        serialize.loads(data + b"\x00")
+
+
+def test_unsupported_node_type():
+    """Test that encoding an unknown node type raises TypeError."""
+
+    class CustomNode(graph.Node):
+        pass
+
+    with pytest.raises(TypeError, match="unsupported node type"):
+        serialize.dumps_plan([CustomNode()])
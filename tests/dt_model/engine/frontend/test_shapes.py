@@ -0,0 +1,108 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.shapes module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pytest
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, shapes
+from civic_digital_twins.dt_model.engine.numpybackend import dispatch, executor
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+from civic_digital_twins.dt_model.simulation import plan
+
+
+def _check(nodes: list[graph.Node], values: dict[graph.Node, np.ndarray]) -> dict[graph.Node, shapes.Spec]:
+    """Infer the specs and check them against the values computed by the executor."""
+    specs = shapes.infer(nodes, {node: shapes.Spec.of(value) for node, value in values.items()}, dispatch.operations)
+    state = executor.State(dict(values))
+    for node in nodes:
+        executor.evaluate(state, node)
+        assert specs[node] == shapes.Spec.of(state.values[node]), node
+    return specs
+
+
+def test_spec():
+    """Test the Spec properties."""
+    spec = shapes.Spec((3, 4), np.dtype(np.float32))
+    assert spec.size == 12
+    assert spec.nbytes == 48
+    assert shapes.Spec.of(1.0) == shapes.Spec((), np.dtype(np.float64))
+    assert shapes.nbytes({graph.placeholder("x"): spec}).popitem()[1] == 48
+
+
+def test_infer_matches_executor():
+    """Test that the inferred specs match the evaluated values for all node types."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y", default_value=2)
+    z = graph.placeholder("z")
+    monday = graph.placeholder("monday")
+    w = graph.placeholder("w")
+    a = graph.exp(x * y - 1)
+    b = graph.expand_dims(a, axis=(0, 2))
+    c = graph.project_using_mean(b, axis=(0, -1))
+    d = graph.project_using_sum(a > 1.0, axis=0)
+    e = graph.multi_clause_where([(x > 0.5, c), (graph.equal(z, monday), y)], graph.log(a))
+    f = graph.power(graph.where(graph.logical_not(e > 0.0), d, graph.maximum(y, graph.constant(1))), graph.constant(2))
+    g = graph.take([0.5, 1.0], w)
+
+    values: dict[graph.Node, np.ndarray] = {
+        x: np.linspace(0.0, 1.0, 12, dtype=np.float32).reshape(3, 4),
+        z: np.array(["monday", "tuesday", "monday", "friday"]),
+        monday: np.array("monday"),
+        w: np.array([[0, 1, 3]], dtype=np.int8),
+    }
+    specs = _check(linearize.forest(e, f, g), values)
+    assert specs[f].shape == (3, 4)
+    assert specs[g] == shapes.Spec((1, 3), np.dtype(np.float64))
+    assert specs[d] == shapes.Spec((4,), np.dtype(np.int64))
+
+
+def test_broadcast_errors():
+    """Test that incompatible shapes raise before evaluating."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    node = x + y
+    node.name = "sum"
+    inputs: dict[graph.Node, shapes.Spec] = {
+        x: shapes.Spec((3,), np.dtype(np.float64)),
+        y: shapes.Spec((4,), np.dtype(np.float64)),
+    }
+    with pytest.raises(shapes.ShapeError, match="sum"):
+        shapes.infer(linearize.forest(node), inputs, dispatch.operations)
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(linearize.forest(graph.where(x > 0, x, y)), inputs, dispatch.operations)
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(linearize.forest(graph.project_using_sum(x, axis=1)), inputs, dispatch.operations)
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(
+            linearize.forest(graph.multi_clause_where([(x, x)], y)), {x: inputs[x], y: inputs[x]}, dispatch.operations
+        )
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(linearize.forest(x), {}, dispatch.operations)
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(linearize.forest(graph.take([1.0], x)), inputs, dispatch.operations)
+
+    with pytest.raises(shapes.ShapeError):
+        shapes.infer(linearize.forest(graph.squeeze(x, axis=0)), inputs, dispatch.operations)
+
+
+def test_molveno():
+    """Test that inference matches the actual evaluation of the Molveno model."""
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {}))[:5])
+    evaluation.evaluate_grid({PV_tourists: np.linspace(0, 10000, 6), PV_excursionists: np.linspace(0, 10000, 6)})
+    assert evaluation.index_vals is not None
+
+    compiled = plan.get(M_Base)
+    placeholders = [node for node in compiled.nodes if isinstance(node, graph.placeholder)]
+    _check(list(compiled.nodes), {node: evaluation.index_vals[node] for node in placeholders})
@@ -0,0 +1,154 @@
+"""Tests for the civic_digital_twins.dt_model.engine.frontend.simplify module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, pretty, simplify
+from civic_digital_twins.dt_model.engine.numpybackend import dispatch, executor
+
+
+def _evaluate(node: graph.Node, inputs: dict[graph.Node, np.ndarray]) -> np.ndarray:
+    state = executor.State(dict(inputs))
+    for item in linearize.forest(node):
+        executor.evaluate(state, item)
+    return state.values[node]
+
+
+def test_constant_folding():
+    """Test that subgraphs depending only on constants are folded."""
+    a = graph.constant(2.5, "a")
+    b = graph.constant(1.02, "b")
+    product = graph.multiply(a, b)
+    product.name = "product"
+    comparison = graph.less(product, graph.constant(3.0))
+    exponential = graph.exp(graph.constant(0.0))
+    selected = graph.where(comparison, graph.constant(1.0), graph.constant(2.0))
+    multi = graph.multi_clause_where([(graph.constant(False), graph.constant(1.0))], graph.constant(4.0))
+
+    mapping = simplify.forest(product, comparison, exponential, selected, multi, operations=dispatch.operations)
+
+    folded = mapping[product]
+    assert isinstance(folded, graph.constant)
+    assert folded.value == np.multiply(2.5, 1.02)
+    assert folded.name == "product"
+
+    for node, expect in ((comparison, True), (exponential, 1.0), (selected, 1.0), (multi, 4.0)):
+        got = mapping[node]
+        assert isinstance(got, graph.constant)
+        assert got.value == expect
+        assert type(got.value) is type(expect)
+
+
+def test_axis_operations_are_not_folded():
+    """Test that axis operations on constants are not folded since they change the shape."""
+    node = graph.expand_dims(graph.constant(1.0), axis=0)
+    mapping = simplify.forest(node, operations=dispatch.operations)
+    assert mapping[node] is node
+
+
+def test_identities():
+    """Test that algebraic identities are simplified."""
+    x = graph.placeholder("x")
+    for node in (x * 1.0, 1 * x, x + 0, 0.0 + x, x - 0, x / 1.0, graph.power(x, graph.constant(1))):
+        assert simplify.forest(node, operations=dispatch.operations)[node] is x
+
+    square = graph.power(x, graph.constant(2.0))
+    got = simplify.forest(square, operations=dispatch.operations)[square]
+    assert isinstance(got, graph.multiply)
+    assert got.left is x and got.right is x
+
+    # Boolean constants are not numeric identities
+    node = x * True
+    assert simplify.forest(node, operations=dispatch.operations)[node] is node
+
+
+def test_division_by_constant():
+    """Test that division by a constant becomes multiplication."""
+    x = graph.placeholder("x")
+    node = x / 4.0
+    got = simplify.forest(node, operations=dispatch.operations)[node]
+    assert pretty.format(got) == "x * 0.25"
+
+    # Division by zero is left alone
+    node = x / 0.0
+    assert simplify.forest(node, operations=dispatch.operations)[node] is node
+
+
+def test_reassociation():
+    """Test that constant factors are combined before broadcasting."""
+    tourists = graph.placeholder("tourists")
+    factor = graph.placeholder("factor")
+    per_vehicle = graph.constant(2.5)
+    rotation = graph.constant(1.02)
+    usage = graph.constant(0.02)
+
+    node = tourists * usage / (per_vehicle * rotation)
+    got = simplify.forest(node, operations=dispatch.operations)[node]
+    assert isinstance(got, graph.multiply)
+    assert got.left is tourists
+    assert isinstance(got.right, graph.constant)
+    assert got.right.value == np.multiply(0.02, np.divide(1.0, np.multiply(2.5, 1.02)))
+
+    # The constant is combined with the first factor, before the product
+    node = tourists * factor * 2.0 * 3.0
+    got = simplify.forest(node, operations=dispatch.operations)[node]
+    assert pretty.format(got) == "tourists * 6.0 * factor"
+
+    # Constants cancelling out remove the multiplication entirely
+    node = tourists * 2.0 * 0.5
+    assert simplify.forest(node, operations=dispatch.operations)[node] is tourists
+
+
+def test_shared_products_are_not_flattened():
+    """Test that we do not flatten products with multiple consumers."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    shared = x * y
+    first = shared * 2.0
+    second = shared + 1.0
+
+    mapping = simplify.forest(first, second, operations=dispatch.operations)
+    got = mapping[first]
+    assert isinstance(got, graph.multiply)
+    assert got.left is shared
+    assert mapping[second].left is shared  # type: ignore
+
+
+def test_flagged_nodes_are_preserved():
+    """Test that nodes with debug flags are not simplified."""
+    x = graph.placeholder("x")
+    node = graph.tracepoint(x * 1.0)
+    assert simplify.forest(node, operations=dispatch.operations)[node] is node
+
+
+def test_kept_nodes_are_preserved():
+    """Test that kept nodes are neither folded nor simplified, nor folded into their consumers."""
+    x = graph.placeholder("x")
+    folded = graph.constant(2.0) * 3.0
+    identity = x * 1.0
+    y = (folded * x) + identity
+    mapping = simplify.forest(y, operations=dispatch.operations, keep=[folded, identity])
+    assert mapping[folded] is folded
+    assert mapping[identity] is identity
+    assert isinstance(mapping[y], graph.add)
+    assert mapping[y].right is identity  # type: ignore
+
+
+def test_results_are_preserved():
+    """Test that the simplified graph computes the same values."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    cond = graph.placeholder("cond")
+    node = graph.where(
+        cond,
+        (x * 2.0 + 0.0) / (graph.constant(3.0) * 4.0) * graph.power(y, graph.constant(2)),
+        graph.exp(x / 2.0) * (graph.constant(1.0) + 1.0),
+    )
+    inputs: dict[graph.Node, np.ndarray] = {
+        x: np.linspace(0.0, 1.0, 7).reshape(7, 1),
+        y: np.linspace(1.0, 2.0, 5).reshape(1, 5),
+        cond: np.array([True, False, True, False, True]),
+    }
+    got = simplify.forest(node, operations=dispatch.operations)[node]
+    assert np.allclose(_evaluate(node, inputs), _evaluate(got, inputs), rtol=1e-15, atol=0)
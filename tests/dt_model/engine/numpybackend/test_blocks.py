@@ -0,0 +1,86 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.blocks module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+from scipy import stats
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import blocks, executor, memory
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def test_small_outputs_are_not_split():
+    """Test that small outputs and unsupported functions take the single-threaded path."""
+    splitter = blocks.Splitter(workers=4, threshold=1024)
+    small = np.zeros((4, 4))
+    large = np.zeros((64, 64))
+    assert splitter.ufunc(np.add, [small, small]) is None
+    assert splitter.ufunc(np.where, [large, large]) is None
+    assert splitter.ufunc(np.add, [large, np.zeros(3)]) is None
+    assert splitter.ufunc(np.add, [np.zeros((1, 4096)), np.zeros(4096)]) is None
+    assert blocks.Splitter(workers=1, threshold=0).ufunc(np.add, [large, large]) is None
+
+
+def test_results_match():
+    """Test that splitting operations computes identical results."""
+    splitter = blocks.Splitter(workers=3, threshold=0)
+    rng = np.random.default_rng(0)
+    x = rng.uniform(size=(7, 5, 3))
+    row = rng.uniform(size=(1, 5, 1))
+    column = rng.uniform(size=(5, 1))
+    cond = x > 0.5
+
+    got = splitter.ufunc(np.multiply, [x, row])
+    assert got is not None and np.array_equal(got, np.multiply(x, row))
+    got = splitter.ufunc(np.less, [column, x])
+    assert got is not None and np.array_equal(got, np.less(column, x))
+    got = splitter.where(cond, x, np.asarray(2))
+    assert got is not None and np.array_equal(got, np.where(cond, x, 2))
+    got = splitter.select([cond, x < 0.1], [x, row], np.asarray(-1.0))
+    assert got is not None and np.array_equal(got, np.select([cond, x < 0.1], [x, row], default=-1.0))
+    assert np.array_equal(splitter.map(stats.norm.cdf, x), stats.norm.cdf(x))
+
+    out = np.empty_like(x)
+    assert splitter.ufunc(np.exp, [x], out) is out
+    assert np.array_equal(out, np.exp(x))
+
+
+def test_executor_blocks():
+    """Test that the executor computes identical results using row blocks."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    a = graph.exp(x * y)
+    b = graph.where(a > 1.5, a, x + 1.0)
+    c = graph.multi_clause_where([(a > 2.0, b), (a > 1.2, y)], a - b)
+    plan = linearize.forest(c)
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(0.0, 1.0, 50).reshape(50, 1), y: np.linspace(0.0, 1.0, 40)}
+
+    expected = executor.State(dict(values))
+    for node in plan:
+        executor.evaluate(expected, node)
+
+    for pool in (None, memory.Pool(threshold=0)):
+        state = executor.State(dict(values), pool=pool, blocks=blocks.Splitter(workers=4, threshold=0))
+        for node in plan:
+            executor.bind(node)(state)
+        for node in plan:
+            assert np.array_equal(state.values[node], expected.values[node])
+
+
+def test_evaluation_blocks():
+    """Test that evaluating Molveno using row blocks gives identical results."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    grid = {PV_tourists: np.linspace(0, 10000, 21), PV_excursionists: np.linspace(0, 10000, 21)}
+
+    fields = []
+    for splitter in (None, blocks.Splitter(workers=4, threshold=0)):
+        np.random.seed(4)
+        fields.append(Evaluation(model, ensemble, blocks=splitter).evaluate_grid(grid))
+    assert np.array_equal(fields[0], fields[1])
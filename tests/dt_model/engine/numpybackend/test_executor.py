@@ -270,6 +270,23 @@ def test_debug_flags(capsys, monkeypatch):
     assert len(mock_input_calls) > 0
 
 
+def test_trace_shared_subexpressions(capsys):
+    """Test that tracing binds shared subexpressions rather than expanding them."""
+    x = graph.placeholder("x")
+    y = x
+    for _ in range(32):
+        y = graph.add(y, y)
+    traced = graph.tracepoint(y)
+
+    state = executor.State({x: np.array([1.0])})
+    for node in linearize.forest(traced):
+        executor.evaluate(state, node)
+
+    captured = capsys.readouterr()
+    assert "formula:\n    let t1 = x + x\n" in captured.out
+    assert "    t31 + t31\n" in captured.out
+
+
 def test_error_handling():
     """Test error handling in the executor."""
     # Create a node with missing dependency
@@ -663,3 +680,66 @@ def test_state_post_init_tracing(capsys):
 
     # Verify the cached indication is shown
     assert "cached: True" in output
+
+
+def test_release():
+    """Test that release drops values from the state and ignores missing nodes."""
+    x = graph.placeholder("x")
+    y = graph.exp(x)
+    state = executor.State({x: np.array([0.0, 1.0])})
+    for node in linearize.forest(y):
+        executor.evaluate(state, node)
+
+    executor.release(state, [x, graph.placeholder("z")])
+    assert x not in state.values
+    assert y in state.values
+
+
+def test_bind():
+    """Test that bound steps compute the same values as evaluate."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y", default_value=2.0)
+    a = graph.exp(x * y - 1.0)
+    b = graph.expand_dims(a, axis=0)
+    c = graph.project_using_sum(b, axis=0)
+    d = graph.where(c > 1.0, c, graph.constant(0.5))
+    e = graph.multi_clause_where([(x > 0.5, d), (x > 0.2, a)], graph.log(c))
+    plan = linearize.forest(e)
+
+    expected = executor.State({x: np.linspace(0.0, 1.0, 5)})
+    for node in plan:
+        executor.evaluate(expected, node)
+
+    state = executor.State({x: np.linspace(0.0, 1.0, 5)})
+    steps = [executor.bind(node) for node in plan]
+    for step in steps:
+        step(state)
+
+    assert state.values.keys() == expected.values.keys()
+    for node, value in expected.values.items():
+        assert np.array_equal(state.values[node], value)
+
+    # Evaluating again returns the cached values
+    assert steps[-1](state) is state.values[e]
+
+
+def test_bind_debug_flags_and_errors(capsys):
+    """Test that bound steps honour debug flags and report errors when evaluated."""
+    x = graph.placeholder("x")
+    y = graph.tracepoint(x + 1.0)
+    state = executor.State({x: np.array(1.0)})
+    for node in linearize.forest(y):
+        executor.bind(node)(state)
+    assert "=== begin tracepoint ===" in capsys.readouterr().out
+    assert np.array_equal(state.values[y], np.array(2.0))
+
+    class unknown(graph.BinaryOp):
+        pass
+
+    step = executor.bind(unknown(x, x))
+    with pytest.raises(executor.UnsupportedOperation):
+        step(state)
+
+    step = executor.bind(graph.placeholder("z"))
+    with pytest.raises(executor.PlaceholderValueNotProvided):
+        step(state)
@@ -0,0 +1,149 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.lazy module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor, lazy, profiling
+
+
+def _evaluate_eagerly(leaves: list[graph.Node], values: dict[graph.Node, np.ndarray]) -> executor.State:
+    state = executor.State(dict(values))
+    # Note: the executor also computes the discarded elements of the branches
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for node in linearize.forest(*leaves):
+            executor.evaluate(state, node)
+    return state
+
+
+def _evaluate_lazily(
+    leaves: list[graph.Node], values: dict[graph.Node, np.ndarray], **kwargs
+) -> tuple[executor.State, lazy.Schedule]:
+    schedule = lazy.schedule(linearize.forest(*leaves), keep=leaves)
+    state = executor.State(dict(values), **kwargs)
+    for step in schedule.steps:
+        step(state)
+    return state, schedule
+
+
+def test_where():
+    """Test that we only compute the branches of a where where needed."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    then = graph.log(x) * y
+    otherwise = graph.exp(y) + 1.0
+    z = graph.where(x > 1.0, then, otherwise)
+    values: dict[graph.Node, np.ndarray] = {
+        x: np.linspace(-1.0, 3.0, 12).reshape(3, 4),
+        y: np.arange(4.0).reshape(1, 4),
+    }
+
+    profiler = profiling.Profiler()
+    state, schedule = _evaluate_lazily([z], values, hook=profiler)
+    expected = _evaluate_eagerly([z], values)
+    assert np.array_equal(state.values[z], expected.values[z])
+    assert state.values[z].dtype == expected.values[z].dtype
+
+    # The branches are private, so they are neither scheduled nor stored
+    scheduled = set(schedule.nodes)
+    assert then not in scheduled and otherwise not in scheduled
+    assert then not in state.values and otherwise not in state.values
+
+    # The hook observes the nodes evaluated over the compressed elements
+    sizes = {record.node: record.shape for record in profiler.records}
+    assert sizes[then] == (np.count_nonzero(values[x] > 1.0),)
+    assert sizes[z] == (3, 4)
+
+
+def test_hook_does_not_count_branches_twice():
+    """Test that the conditional nodes only report the time spent outside their branches."""
+    x = graph.placeholder("x")
+    z = graph.where(x > 0.5, graph.exp(graph.log(x) * 2.0) + 1.0, graph.exp(x) * 3.0)
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(0.0, 1.0, 1 << 20)}
+
+    profiler = profiling.Profiler()
+    start = time.perf_counter_ns()
+    _evaluate_lazily([z], values, hook=profiler)
+    elapsed = time.perf_counter_ns() - start
+    assert len({record.node for record in profiler.records}) == len(profiler.records)
+    assert profiler.total() <= elapsed
+
+
+def test_multi_clause_where():
+    """Test that the first true clause wins and that the default applies otherwise."""
+    x = graph.placeholder("x")
+    clauses = [
+        (x < 0.0, graph.exp(x)),
+        (x < 1.0, x * x + 2.0),
+        (x < -5.0, graph.log(x)),  # never the first true clause
+    ]
+    z = graph.multi_clause_where(clauses, graph.log(x + 3.0))
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(-2.0, 2.0, 17)}
+
+    state, _ = _evaluate_lazily([z], values)
+    expected = _evaluate_eagerly([z], values)
+    assert np.array_equal(state.values[z], expected.values[z])
+
+
+def test_all_true_and_all_false_masks():
+    """Test the branches whose mask is either all true or all false."""
+    x = graph.placeholder("x")
+    z = graph.where(x > 0.0, graph.log(x), graph.log(x * -1.0))
+    for value in (np.array([1.0, 2.0, 3.0]), np.array([-1.0, -2.0, -3.0]), np.array(2.0)):
+        state, _ = _evaluate_lazily([z], {x: value})
+        assert np.array_equal(state.values[z], np.log(np.abs(value)))
+        assert state.values[z].shape == value.shape
+
+
+def test_shared_and_kept_nodes_are_not_private():
+    """Test that nodes needed outside a branch are evaluated eagerly."""
+    x = graph.placeholder("x")
+    shared = graph.exp(x)
+    kept = graph.log(x)
+    z = graph.where(x > 1.0, shared + kept, graph.constant(0.0))
+    w = shared * 2.0
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(0.5, 1.5, 5)}
+
+    state, schedule = _evaluate_lazily([z, w, kept], values)
+    scheduled = set(schedule.nodes)
+    assert shared in scheduled and kept in scheduled
+    expected = _evaluate_eagerly([z, w, kept], values)
+    for node in (z, w):
+        assert np.array_equal(state.values[node], expected.values[node])
+
+
+def test_nested_conditionals():
+    """Test conditional nodes private to the branch of another conditional node."""
+    x = graph.placeholder("x")
+    inner = graph.where(x > 1.0, graph.log(x), graph.exp(x))
+    z = graph.where(x > 0.0, inner * 2.0, graph.constant(-1.0))
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(-2.0, 2.0, 9)}
+
+    state, schedule = _evaluate_lazily([z], values)
+    assert inner not in set(schedule.nodes)
+    expected = _evaluate_eagerly([z], values)
+    assert np.array_equal(state.values[z], expected.values[z])
+
+
+def test_non_elementwise_nodes_are_not_private():
+    """Test that reductions and dimension expansions remain in the plan."""
+    x = graph.placeholder("x")
+    total = graph.project_using_sum(graph.exp(x), axis=0)
+    z = graph.where(total > 1.0, graph.log(total), graph.constant(0.0))
+    values: dict[graph.Node, np.ndarray] = {x: np.linspace(-1.0, 1.0, 6).reshape(2, 3)}
+
+    state, schedule = _evaluate_lazily([z], values)
+    assert total in set(schedule.nodes)
+    expected = _evaluate_eagerly([z], values)
+    assert np.array_equal(state.values[z], expected.values[z])
+
+
+def test_constant_branches_are_evaluated_eagerly():
+    """Test that we do not compress values when the branches only contain constants."""
+    x = graph.placeholder("x")
+    z = graph.multi_clause_where([(x > 0.0, graph.constant(1.0))], graph.constant(2.0))
+    schedule = lazy.schedule(linearize.forest(z), keep=[z])
+    assert all(a is b for a, b in zip(schedule.nodes, linearize.forest(z), strict=True))
@@ -0,0 +1,79 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.memory module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize, liveness
+from civic_digital_twins.dt_model.engine.numpybackend import executor, memory
+
+
+def _run(node: graph.Node, inputs: dict[graph.Node, np.ndarray], pool: memory.Pool | None) -> np.ndarray:
+    plan = linearize.forest(node)
+    state = executor.State(dict(inputs), pool=pool)
+    for item, dead in zip(plan, liveness.releases(plan, keep=[node])):
+        executor.evaluate(state, item)
+        executor.release(state, dead)
+    return state.values[node]
+
+
+def test_output_buffers():
+    """Test that output returns buffers only for large enough ufunc results."""
+    pool = memory.Pool(threshold=64)
+    small = np.zeros(4)
+    large = np.zeros((8, 8))
+    row = np.zeros((1, 8), dtype=np.int64)
+
+    assert pool.output(np.add, small, small) is None
+    assert pool.output(np.where, large, large) is None
+
+    out = pool.output(np.add, large, row)
+    assert out is not None
+    assert out.shape == (8, 8)
+    assert out.dtype == np.float64
+
+    out = pool.output(np.less, large, row)
+    assert out is not None
+    assert out.dtype == np.bool_
+
+    # Operands that do not broadcast are left for the ufunc to report
+    assert pool.output(np.add, large, np.zeros(3)) is None
+    assert pool.allocations == 2
+
+
+def test_reuse_after_release():
+    """Test that released buffers are reused, unless views still refer to them."""
+    pool = memory.Pool(threshold=0)
+    buffer = pool.empty((2, 2), np.dtype(np.float64))
+    pool.track(buffer)
+    view = np.expand_dims(buffer, 0)
+    pool.track(view)
+
+    pool.release(buffer)
+    assert pool.empty((2, 2), np.dtype(np.float64)) is not buffer
+
+    pool.release(view)
+    assert pool.empty((2, 2), np.dtype(np.float64)) is buffer
+    assert pool.reuses == 1
+
+    # Values not coming from the pool are ignored
+    pool.release(np.zeros(3))
+
+
+def test_results_match_and_buffers_are_reused():
+    """Test that evaluating with a pool produces the same results while reusing buffers."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    a = graph.exp(x * y)
+    b = graph.log(a + 1.0)
+    c = graph.expand_dims(b, axis=0)
+    d = graph.reduce_sum(c * 2.0, axis=0)
+    out = graph.where(d > 1.0, d - x, graph.logical_not(d > 2.0) * 1.0)
+
+    inputs: dict[graph.Node, np.ndarray] = {
+        x: np.linspace(0.0, 1.0, 64).reshape(64, 1),
+        y: np.linspace(0.0, 1.0, 32).reshape(1, 32),
+    }
+    pool = memory.Pool(threshold=0)
+    assert np.array_equal(_run(out, inputs, None), _run(out, inputs, pool))
+    assert pool.reuses > 0
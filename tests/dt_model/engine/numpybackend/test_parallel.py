@@ -0,0 +1,91 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.parallel module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+import pytest
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor, memory, parallel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def _graph() -> tuple[graph.placeholder, list[graph.Node]]:
+    x = graph.placeholder("x")
+    branches = []
+    for index in range(8):
+        node = graph.exp(x * float(index)) + graph.log(x + 1.0)
+        node = graph.where(node > 2.0, node, x * x)
+        branches.append(graph.project_using_sum(graph.expand_dims(node, axis=0), axis=0))
+    total = branches[0]
+    for branch in branches[1:]:
+        total = total + branch
+    return x, [total, *branches[:2]]
+
+
+def test_results_match_sequential():
+    """Test that parallel evaluation computes the same values as the sequential executor."""
+    x, leaves = _graph()
+    plan = linearize.forest(*leaves)
+    value = np.linspace(0.0, 1.0, 1000)
+
+    expected = executor.State({x: value})
+    for node in plan:
+        executor.evaluate(expected, node)
+
+    for workers in (1, 2, 4):
+        state = executor.State({x: value})
+        parallel.evaluate(state, plan, workers=workers)
+        assert state.values.keys() == expected.values.keys()
+        for node, got in state.values.items():
+            assert np.array_equal(got, expected.values[node])
+
+
+def test_release_and_pool():
+    """Test that parallel evaluation releases intermediate values and may share a pool."""
+    x, leaves = _graph()
+    plan = linearize.forest(*leaves)
+    value = np.linspace(0.0, 1.0, 10000)
+
+    expected = executor.State({x: value})
+    for node in plan:
+        executor.evaluate(expected, node)
+
+    state = executor.State({x: value}, pool=memory.Pool(threshold=0))
+    parallel.evaluate(state, plan, workers=4, keep=leaves)
+    assert set(state.values.keys()) == set(leaves)
+    for node in leaves:
+        assert np.array_equal(state.values[node], expected.values[node])
+
+
+def test_errors_propagate():
+    """Test that exceptions raised while evaluating propagate to the caller."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y")
+    with pytest.raises(executor.PlaceholderValueNotProvided):
+        parallel.evaluate(executor.State({x: np.array(1.0)}), linearize.forest(x + y), workers=2)
+
+    class unknown(graph.UnaryOp):
+        pass
+
+    with pytest.raises(executor.UnsupportedOperation):
+        parallel.evaluate(executor.State({x: np.array(1.0)}), linearize.forest(unknown(x) + x), workers=2)
+
+
+def test_evaluation_workers():
+    """Test that evaluating Molveno using threads gives identical results."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    grid = {PV_tourists: np.linspace(0, 10000, 21), PV_excursionists: np.linspace(0, 10000, 21)}
+
+    fields = []
+    for workers, lean in ((1, False), (4, False), (4, True)):
+        np.random.seed(4)
+        fields.append(Evaluation(model, ensemble, lean=lean, workers=workers).evaluate_grid(grid))
+    assert np.array_equal(fields[0], fields[1])
+    assert np.array_equal(fields[0], fields[2])
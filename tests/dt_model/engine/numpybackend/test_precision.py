@@ -0,0 +1,72 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.precision module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor, precision
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def test_policy():
+    """Test casting values and constants."""
+    policy = precision.FLOAT32
+    assert policy.cast(np.zeros(3)).dtype == np.float32
+    assert policy.cast(np.zeros(3, dtype=np.int64)).dtype == np.int64
+    assert policy.cast(np.array("monday")).dtype.kind == "U"
+    assert policy.constant(1).dtype == np.float32
+    assert policy.constant(0.5).dtype == np.float32
+    assert policy.constant(True).dtype == np.bool_
+    assert policy.reduce(graph.expand_dims, np.zeros(3), 0) is None
+    assert policy.reduce(graph.project_using_sum, np.zeros(3, dtype=np.int64), 0) is None
+
+
+def test_executor_precision():
+    """Test that the executor computes using the policy dtypes."""
+    x = graph.placeholder("x")
+    y = graph.placeholder("y", default_value=2.0)
+    total = graph.project_using_sum(graph.exp(x * y) + 1, axis=0)
+    mean = graph.project_using_mean(x, axis=0)
+    plan = linearize.forest(total, mean)
+
+    # Use values whose float32 sum is inaccurate
+    value = np.full(1_000_000, 0.1)
+    for policy, dtype in (
+        (precision.FLOAT64, np.float64),
+        (precision.MIXED, np.float32),
+        (precision.FLOAT32, np.float32),
+    ):
+        for bound in (False, True):
+            state = executor.State({x: value}, precision=policy)
+            for node in plan:
+                if bound:
+                    executor.bind(node)(state)
+                else:
+                    executor.evaluate(state, node)
+            assert all(item.dtype == dtype for item in state.values.values())
+            expected = np.float32(np.mean(np.full(1_000_000, np.float32(0.1), dtype=np.float64)))
+            if policy is precision.MIXED:
+                assert state.values[mean] == expected
+            if policy is precision.FLOAT32:
+                assert state.values[mean] != expected
+
+
+def test_evaluation_precision():
+    """Test that evaluating Molveno in float32 is accurate to well within three significant digits."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    grid = {PV_tourists: np.linspace(0, 10000, 21), PV_excursionists: np.linspace(0, 10000, 21)}
+
+    fields = {}
+    for policy in (None, precision.MIXED, precision.FLOAT32):
+        np.random.seed(4)
+        evaluation = Evaluation(model, ensemble, precision=policy)
+        fields[policy] = evaluation.evaluate_grid(grid)
+    assert np.allclose(fields[precision.MIXED], fields[None], rtol=0, atol=1e-4)
+    assert np.allclose(fields[precision.FLOAT32], fields[None], rtol=0, atol=1e-4)
@@ -0,0 +1,114 @@
+"""Tests for the civic_digital_twins.dt_model.engine.numpybackend.profiling module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
+from civic_digital_twins.dt_model.engine.numpybackend import executor, parallel, profiling
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+from civic_digital_twins.dt_model.simulation import plan
+
+
+def _graph() -> tuple[graph.Node, graph.Node, graph.Node, graph.Node]:
+    x = graph.placeholder("x")
+    y = graph.exp(x)
+    y.name = "y"
+    z = graph.expand_dims(y, axis=0)
+    w = graph.add(z, graph.constant(1.0))
+    return x, y, z, w
+
+
+def test_profiler_records_every_node():
+    """Test that both the evaluate and the bind paths invoke the hook."""
+    x, y, z, w = _graph()
+    nodes = linearize.forest(w)
+    for run in (
+        lambda state: [executor.evaluate(state, node) for node in nodes],
+        lambda state: [executor.bind(node)(state) for node in nodes],
+        lambda state: parallel.evaluate(state, nodes, workers=2),
+    ):
+        profiler = profiling.Profiler()
+        run(executor.State({x: np.zeros(1000)}, hook=profiler))
+
+        # Note: the placeholder value comes from the state
+        records = {record.node.id: record for record in profiler.records}
+        assert set(records) == {node.id for node in nodes} - {x.id}
+        assert records[y.id].shape == (1000,)
+        assert records[y.id].dtype == np.float64
+        assert records[y.id].nbytes == 8000
+        assert records[z.id].nbytes == 0  # a view
+        assert records[w.id].shape == (1, 1000)
+        assert all(record.duration >= 0 for record in profiler.records)
+        assert profiler.total() == sum(record.duration for record in profiler.records)
+
+
+def test_exports():
+    """Test the text table, the Chrome trace, and the cumulative times."""
+    x, y, z, w = _graph()
+    profiler = profiling.Profiler()
+    state = executor.State({x: np.zeros(1000)}, hook=profiler)
+    for node in linearize.forest(w):
+        executor.evaluate(state, node)
+
+    table = profiler.table(limit=2).splitlines()
+    assert len(table) == 3
+    assert table[0].split() == ["time", "(ms)", "%", "bytes", "dtype", "shape", "node"]
+    durations = [float(line.split()[0]) for line in table[1:]]
+    assert durations == sorted(durations, reverse=True)
+    assert f"y (exp #{y.id})" in profiler.table()
+
+    trace = json.loads(json.dumps(profiler.trace_events()))
+    events = trace["traceEvents"]
+    assert len(events) == len(profiler.records)
+    assert {event["ph"] for event in events} == {"X"}
+    assert min(event["ts"] for event in events) == 0
+    event = next(event for event in events if event["name"] == f"y (exp #{y.id})")
+    assert event["cat"] == "exp"
+    assert event["args"] == {"shape": [1000], "dtype": "float64", "bytes": 8000}
+
+    cumulative = profiler.cumulative({"y": y, "w": w})
+    durations = {record.node.id: record.duration for record in profiler.records}
+    assert cumulative["y"] == durations[y.id]
+    assert cumulative["w"] == profiler.total()
+
+
+def test_evaluation_hook(tmp_path):
+    """Test that the evaluation passes the hook to the executor."""
+    profiler = profiling.Profiler()
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {})), hook=profiler)
+    evaluation.evaluate_grid({PV_tourists: np.linspace(0, 10000, 11), PV_excursionists: np.linspace(0, 10000, 11)})
+    assert any(record.shape[:2] == (11, 11) for record in profiler.records)
+
+    path = tmp_path / "trace.json"
+    profiler.write_trace(str(path))
+    with open(path) as fp:
+        assert len(json.load(fp)["traceEvents"]) == len(profiler.records)
+
+
+def test_cumulative_optimized_plan():
+    """Test that we attribute the wall time to the nodes of an optimized plan."""
+    profiler = profiling.Profiler()
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {})), hook=profiler, optimize=True)
+    evaluation.evaluate_grid({PV_tourists: np.linspace(0, 10000, 11), PV_excursionists: np.linspace(0, 10000, 11)})
+    compiled = plan.get(M_Base)
+    assert any(compiled.mapping[c.usage.node] is not c.usage.node for c in M_Base.constraints)
+
+    durations: dict[graph.Node, int] = {}
+    for record in profiler.records:
+        durations[record.node] = durations.get(record.node, 0) + record.duration
+    roots = {c.name: c.usage.node for c in M_Base.constraints}
+    cumulative = profiler.cumulative(roots, mapping=compiled.mapping)
+    for name, root in roots.items():
+        nodes = linearize.forest(compiled.mapping[root])
+        assert cumulative[name] == sum(durations.get(node, 0) for node in nodes)
+        assert cumulative[name] > 0
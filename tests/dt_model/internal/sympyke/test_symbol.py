@@ -4,7 +4,7 @@
 
 import numpy as np
 
-from civic_digital_twins.dt_model.engine.frontend import linearize
+from civic_digital_twins.dt_model.engine.frontend import graph, linearize
 from civic_digital_twins.dt_model.engine.numpybackend import executor
 from civic_digital_twins.dt_model.internal.sympyke import Symbol
 
@@ -111,3 +111,39 @@ def test_symbol_table_values():
     finally:
         # Restore the original symbol table
         symbol_mod.symbol_table = original_table
+
+
+def test_symbol_codes():
+    """Test that symbols are interned to integer codes used as placeholder defaults."""
+    import civic_digital_twins.dt_model.internal.sympyke.symbol as symbol_mod
+
+    original_table = symbol_mod.symbol_table
+    symbol_mod.symbol_table = symbol_mod._SymbolTable()
+
+    try:
+        a = Symbol("a")
+        b = Symbol("b")
+        assert (a.code, b.code) == (0, 1)
+        assert Symbol("a").code == 0
+        assert a.node.default_value == 0
+
+        # Comparing symbols with context variable values is an integer comparison
+        values = symbol_mod.asarray([b, a, b])
+        assert values.dtype == np.int8
+        node = graph.equal(graph.placeholder("cv"), a.node)
+        state = executor.State({node.left: values})
+        for item in linearize.forest(node):
+            executor.evaluate(state, item)
+        assert np.array_equal(state.values[node], np.array([False, True, False]))
+
+        # We widen the dtype as needed and leave other values alone
+        for index in range(200):
+            Symbol(f"s{index}")
+        assert symbol_mod.asarray([Symbol("s199")]).dtype == np.int16
+        assert symbol_mod.asarray([1.0, 2.0]).dtype == np.float64
+
+        # We intern strings as symbols
+        assert np.array_equal(symbol_mod.asarray(["b", a, "new"]), [1, 0, Symbol("new").code])
+        assert symbol_mod.asarray([]).size == 0
+    finally:
+        symbol_mod.symbol_table = original_table
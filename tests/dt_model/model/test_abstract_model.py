@@ -0,0 +1,90 @@
+"""Tests for civic_digital_twins.dt_model.model.AbstractModel class."""
+# SPDX-License-Identifier: Apache-2.0
+
+import subprocess
+import sys
+from typing import cast
+
+import pytest
+from scipy import stats
+from scipy.stats import rv_continuous
+
+from civic_digital_twins.dt_model import (
+    CategoricalContextVariable,
+    Constraint,
+    ContinuousContextVariable,
+    Index,
+    PresenceVariable,
+    UniformDistIndex,
+)
+from civic_digital_twins.dt_model.internal.sympyke import Symbol
+from civic_digital_twins.dt_model.model.abstract_model import AbstractModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import M_Base
+from civic_digital_twins.dt_model.symbols.index import Distribution
+
+
+def _model(scale: float = 5.0) -> AbstractModel:
+    a = Index("a", 1.0)
+    d = UniformDistIndex("d", loc=10.0, scale=scale)
+    capacity = Index("capacity", cast(Distribution, stats.lognorm(s=0.5, scale=100.0)))
+    usage = Index("usage", a.node * d.node)
+    return AbstractModel("M", [], [], [a, d, usage], [capacity], [Constraint(usage.node, capacity, "c")])
+
+
+def test_fingerprint():
+    """Test that the fingerprint depends on the content of the model only."""
+    assert _model().fingerprint() == _model().fingerprint()
+    assert _model().fingerprint() != _model(scale=6.0).fingerprint()
+
+    model = _model()
+    before = model.fingerprint()
+    cast(UniformDistIndex, model.indexes[1]).scale = 7.0
+    assert model.fingerprint() != before
+
+
+def test_fingerprint_variables():
+    """Test that the fingerprint covers the context and presence variables."""
+
+    def _variables(probability: float = 0.4, loc: float = 0.0, name: str = "p") -> AbstractModel:
+        weather = CategoricalContextVariable("weather", {Symbol("good"): probability, Symbol("bad"): 1 - probability})
+        temperature = ContinuousContextVariable("temperature", cast(rv_continuous, stats.norm(loc=loc, scale=1.0)))
+        return AbstractModel("M", [weather, temperature], [PresenceVariable(name, [weather])], [], [], [])
+
+    assert _variables().fingerprint() == _variables().fingerprint()
+    assert _variables().fingerprint() != _variables(probability=0.5).fingerprint()
+    assert _variables().fingerprint() != _variables(loc=1.0).fingerprint()
+    assert _variables().fingerprint() != _variables(name="q").fingerprint()
+
+
+def test_fingerprint_stable_across_processes():
+    """Test that the fingerprint does not depend on the order of creation of the symbols."""
+    code = (
+        "from civic_digital_twins.dt_model.internal.sympyke import Symbol\n"
+        "for name in ('shift', 'the', 'symbol', 'codes'):\n"
+        "    Symbol(name)\n"
+        "from civic_digital_twins.dt_model.reference_models.molveno.overtourism import M_Base\n"
+        "print(M_Base.fingerprint())\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == M_Base.fingerprint()
+
+
+def test_fingerprint_unsupported_distribution():
+    """Test that the fingerprint rejects distributions it cannot describe."""
+
+    class Custom:
+        def cdf(self, x, *args, **kwds):
+            return x
+
+        def rvs(self, size=None, **kwargs):
+            return 0.0
+
+        def mean(self, *args, **kwds):
+            return 0.0
+
+        def std(self, *args, **kwds):
+            return 0.0
+
+    model = AbstractModel("M", [], [], [Index("custom", Custom())], [], [])
+    with pytest.raises(TypeError, match="unsupported distribution"):
+        model.fingerprint()
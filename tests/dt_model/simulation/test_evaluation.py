@@ -0,0 +1,153 @@
+"""Tests for the civic_digital_twins.dt_model.simulation.evaluation module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import cast
+
+import numpy as np
+from scipy import stats
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.frontend import graph
+from civic_digital_twins.dt_model.internal.sympyke import Symbol
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    C_accommodation,
+    C_beach,
+    C_food,
+    C_parking,
+    CV_season,
+    CV_weather,
+    CV_weekday,
+    I_C_parking,
+    I_U_tourists_beach,
+    I_Xa_excursionists_per_vehicle,
+    I_Xa_tourists_per_vehicle,
+    I_Xo_tourists_beach,
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+_GRID = {PV_tourists: np.linspace(0, 10000, 21), PV_excursionists: np.linspace(0, 10000, 21)}
+
+
+def _evaluate(values: dict, **kwargs) -> Evaluation:
+    model = InstantiatedModel(M_Base, values=values)
+    evaluation = Evaluation(model, list(Ensemble(model, {})), **kwargs)
+    np.random.seed(11)
+    evaluation.evaluate_grid(_GRID)
+    return evaluation
+
+
+def test_update_grid():
+    """Test that updating the grid matches a full evaluation and reuses the unaffected elements."""
+    for kwargs in ({}, {"optimize": False}, {"workers": 2}):
+        values = {I_Xo_tourists_beach.name: 2.0, I_C_parking.name: stats.uniform(loc=350.0, scale=100.0)}
+        got = _evaluate(values, **kwargs)
+        assert got.field_elements is not None
+        before = got.field_elements
+
+        # Change a usage index and a capacity distribution
+        values[I_Xo_tourists_beach.name] = 1.5
+        values[I_C_parking.name] = stats.uniform(loc=250.0, scale=100.0)
+        field = got.update_grid(I_Xo_tourists_beach, I_C_parking)
+
+        expected = _evaluate(dict(values), **kwargs)
+        assert expected.field is not None and expected.field_elements is not None
+        assert np.array_equal(field, expected.field)
+        for constraint in (C_parking, C_beach, C_accommodation, C_food):
+            assert np.array_equal(got.field_elements[constraint], expected.field_elements[constraint])
+        assert np.array_equal(got.get_index_value(I_Xo_tourists_beach), expected.get_index_value(I_Xo_tourists_beach))
+
+        # The elements of the unaffected constraints are reused
+        assert got.field_elements[C_food] is before[C_food]
+        assert got.field_elements[C_accommodation] is before[C_accommodation]
+        assert got.field_elements[C_beach] is not before[C_beach]
+
+
+def test_update_grid_removed_override():
+    """Test that updating the grid after removing an override restores the default value."""
+    denominator = cast(graph.divide, C_parking.usage.node).right
+    for kwargs in ({}, {"optimize": False}):
+        values = {I_Xa_tourists_per_vehicle.name: 3.5}
+        got = _evaluate(values, pinned=[denominator], **kwargs)
+        del values[I_Xa_tourists_per_vehicle.name]
+        field = got.update_grid(I_Xa_tourists_per_vehicle)
+
+        expected = _evaluate(dict(values), pinned=[denominator], **kwargs)
+        assert expected.field is not None
+        assert np.array_equal(field, expected.field)
+        assert got.index_vals is not None and expected.index_vals is not None
+        assert np.array_equal(got.index_vals[denominator], expected.index_vals[denominator])
+        assert np.array_equal(
+            got.get_index_value(I_Xa_tourists_per_vehicle), expected.get_index_value(I_Xa_tourists_per_vehicle)
+        )
+
+
+def test_update_grid_fallback():
+    """Test that updating the grid re-evaluates it when the previous state is not available."""
+    for kwargs in ({"lean": True}, {"masked": True}):
+        values = {I_Xo_tourists_beach.name: 2.0}
+        got = _evaluate(values, **kwargs)
+        values[I_Xo_tourists_beach.name] = 1.5
+        np.random.seed(11)
+        field = got.update_grid(I_Xo_tourists_beach)
+        expected = _evaluate(dict(values))
+        assert expected.field is not None
+        assert np.array_equal(field, expected.field)
+
+
+def test_constant_index_override():
+    """Test that overriding a constant index changes the field regardless of the optimizations."""
+    fields = []
+    for optimize in (False, True):
+        baseline = _evaluate({}, optimize=optimize)
+        overridden = _evaluate({I_Xa_excursionists_per_vehicle.name: 0.5}, optimize=optimize)
+        assert baseline.field is not None and overridden.field is not None
+        assert not np.array_equal(baseline.field, overridden.field)
+        fields.append(overridden.field)
+    assert np.allclose(fields[0], fields[1])
+
+
+def test_generator():
+    """Test that evaluating using a generator is reproducible and independent of the global random state."""
+    model = InstantiatedModel(M_Base)
+    ensemble = list(Ensemble(model, {}))
+    first = Evaluation(model, ensemble, rng=np.random.default_rng(3))
+    np.random.seed(1)
+    first.evaluate_grid(_GRID)
+    second = Evaluation(model, ensemble, rng=np.random.default_rng(3))
+    np.random.seed(2)
+    second.evaluate_grid(_GRID)
+    assert first.field is not None and second.field is not None
+    assert np.array_equal(first.field, second.field)
+
+
+def test_categorical_context_variables():
+    """Test that context variables become integer codes matching the model symbols."""
+    model = InstantiatedModel(M_Base)
+    ensemble = [
+        (0.5, {CV_weekday: Symbol("monday"), CV_season: Symbol("high"), CV_weather: Symbol(weather)})
+        for weather in ("good", "bad")
+    ]
+    evaluation = Evaluation(model, ensemble)
+    evaluation.evaluate_grid(_GRID)
+    assert evaluation.index_vals is not None
+    assert evaluation.index_vals[CV_weather.node].dtype == np.int8
+    assert np.array_equal(evaluation.get_index_value(I_U_tourists_beach), np.array([[[0.5, 0.25]]]))
+
+
+def test_string_context_variables():
+    """Test that context variables given as strings evaluate like the corresponding symbols."""
+    model = InstantiatedModel(M_Base)
+    fields = []
+    for convert in (Symbol, str):
+        ensemble = [
+            (0.5, {CV_weekday: convert("monday"), CV_season: convert("high"), CV_weather: convert(weather)})
+            for weather in ("good", "bad")
+        ]
+        evaluation = Evaluation(model, ensemble)
+        np.random.seed(11)
+        fields.append(evaluation.evaluate_grid(_GRID))
+        assert np.array_equal(evaluation.get_index_value(I_U_tourists_beach), np.array([[[0.5, 0.25]]]))
+    assert np.array_equal(fields[0], fields[1])
@@ -0,0 +1,84 @@
+"""Tests for the civic_digital_twins.dt_model.simulation.metrics module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    I_Xo_tourists_beach,
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+from civic_digital_twins.dt_model.simulation import metrics
+
+_GRID = {PV_tourists: np.linspace(0, 10000, 11), PV_excursionists: np.linspace(0, 10000, 11)}
+
+
+def test_timer():
+    """Test that the timer records consecutive phases only when enabled."""
+    timer = metrics.Timer("method")
+    timer.lap("first", values=[np.zeros(10), np.zeros((2, 3), dtype=np.float32)], samples=7)
+    timer.lap("second")
+    got = timer.metrics()
+    assert got is not None
+    assert got.method == "method"
+    assert [phase.name for phase in got.phases] == ["first", "second"]
+    assert got.phases[0].nbytes == 80 + 24
+    assert got.phases[0].samples == 7
+    assert got.duration == sum(phase.duration for phase in got.phases)
+
+    disabled = metrics.Timer("method", enabled=False)
+    disabled.lap("first", values=iter([np.zeros(10)]))
+    assert disabled.metrics() is None
+
+
+def test_prometheus(tmp_path):
+    """Test the Prometheus text exposition format."""
+    got = metrics.Metrics("evaluate_grid", (metrics.Phase("sampling", 0.5, 1024, 42),))
+    text = got.prometheus({"model": 'a "quoted"\\name'})
+    lines = text.splitlines()
+    assert "# TYPE dt_model_evaluation_phase_seconds gauge" in lines
+    labels = 'method="evaluate_grid",model="a \\"quoted\\"\\\\name",phase="sampling"'
+    assert f"dt_model_evaluation_phase_seconds{{{labels}}} 0.5" in lines
+    assert f"dt_model_evaluation_phase_bytes{{{labels}}} 1024" in lines
+    assert f"dt_model_evaluation_phase_samples{{{labels}}} 42" in lines
+    assert lines[-1] == 'dt_model_evaluation_seconds{method="evaluate_grid",model="a \\"quoted\\"\\\\name"} 0.5'
+    assert text.endswith("\n")
+
+    path = tmp_path / "dt_model.prom"
+    got.write_prometheus(str(path))
+    assert path.read_text() == got.prometheus()
+    assert [item.name for item in tmp_path.iterdir()] == ["dt_model.prom"]
+
+
+def test_evaluation_metrics():
+    """Test that evaluations record the metrics of each phase when instrumented."""
+    values = {I_Xo_tourists_beach.name: 2.0}
+    model = InstantiatedModel(M_Base, values=values)
+    ensemble = list(Ensemble(model, {}))
+
+    evaluation = Evaluation(model, ensemble)
+    evaluation.evaluate_grid(_GRID)
+    assert evaluation.metrics is None
+
+    evaluation = Evaluation(model, ensemble, instrument=True)
+    evaluation.evaluate_grid(_GRID)
+    got = evaluation.metrics
+    assert got is not None
+    assert got.method == "evaluate_grid"
+    names = ["ensemble", "sampling", "expansion", "evaluation", "elements", "field"]
+    assert [phase.name for phase in got.phases] == names
+    phases = {phase.name: phase for phase in got.phases}
+    # The four capacities are distributions, sampled for each ensemble member
+    assert phases["sampling"].samples == 4 * len(ensemble)
+    assert phases["field"].nbytes == 11 * 11 * 8
+
+    values[I_Xo_tourists_beach.name] = 1.5
+    evaluation.update_grid(I_Xo_tourists_beach)
+    got = evaluation.metrics
+    assert got is not None
+    assert got.method == "update_grid"
+    assert [phase.name for phase in got.phases] == ["sampling", "evaluation", "elements", "field"]
+    assert got.phases[0].samples == 0
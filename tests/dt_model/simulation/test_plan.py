@@ -0,0 +1,242 @@
+"""Tests for the civic_digital_twins.dt_model.simulation.plan module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import cast
+
+import numpy as np
+from scipy import stats
+
+from civic_digital_twins.dt_model import AbstractModel, ConstIndex, Constraint, Index, PresenceVariable
+from civic_digital_twins.dt_model.engine.frontend import graph
+from civic_digital_twins.dt_model.engine.numpybackend import executor
+from civic_digital_twins.dt_model.simulation import plan
+from civic_digital_twins.dt_model.symbols.index import Distribution
+
+
+def _make_model() -> tuple[AbstractModel, PresenceVariable, ConstIndex, Index]:
+    pv = PresenceVariable("visitors", [])
+    factor = ConstIndex("factor", 2.0)
+    capacity = Index("capacity", cast(Distribution, stats.uniform(loc=10.0, scale=5.0)))
+    constraint = Constraint(usage=pv.node * factor.node, capacity=capacity, name="c")
+    model = AbstractModel("M", [], [pv], [factor], [capacity], [constraint])
+    return model, pv, factor, capacity
+
+
+def test_outputs():
+    """Test that we collect usages, deterministic capacities, and indexes."""
+    model, pv, factor, capacity = _make_model()
+    leaves = plan.outputs(model)
+    assert len(leaves) == 3
+    assert leaves[0] is model.constraints[0].usage.node
+    assert leaves[1] is factor.node
+    assert leaves[2] is capacity.node
+
+
+def test_get_caches_plan():
+    """Test that get returns the same plan until the model changes."""
+    model, _, factor, _ = _make_model()
+    first = plan.get(model)
+    assert plan.get(model) is first
+
+    # Changing a ConstIndex value replaces its node, thus invalidating the plan
+    factor.v = 3.0
+    second = plan.get(model)
+    assert second is not first
+    assert any(node is second.mapping[factor.node] for node in second.nodes)
+    assert plan.get(model) is second
+
+
+def test_evaluate():
+    """Test that evaluating the plan computes all the outputs."""
+    model, pv, factor, capacity = _make_model()
+    compiled = plan.build(model)
+    state = executor.State({pv.node: np.array([1.0, 2.0]), capacity.node: np.array([11.0, 12.0])})
+    compiled.evaluate(state)
+    assert np.array_equal(state.values[model.constraints[0].usage.node], np.array([2.0, 4.0]))
+    assert np.array_equal(state.values[factor.node], np.array(2.0))
+
+
+def test_evaluate_with_shared_subexpressions():
+    """Test that outputs merged by common-subexpression elimination still get a value."""
+    pv = PresenceVariable("visitors", [])
+    capacity = Index("capacity", 10.0)
+    first = Constraint(usage=pv.node * 2.0, capacity=capacity, name="first")
+    second = Constraint(usage=pv.node * 2.0, capacity=capacity, name="second")
+    model = AbstractModel("M", [], [pv], [], [capacity], [first, second])
+
+    compiled = plan.build(model)
+    # visitors, 2.0, visitors * 2.0, 10.0
+    assert len(compiled.nodes) == 4
+
+    state = executor.State({pv.node: np.array([1.0, 2.0])})
+    compiled.evaluate(state)
+    assert np.array_equal(state.values[first.usage.node], np.array([2.0, 4.0]))
+    assert np.array_equal(state.values[second.usage.node], np.array([2.0, 4.0]))
+    assert np.array_equal(state.values[capacity.node], np.array(10.0))
+
+
+def test_named_constants_are_not_merged():
+    """Test that constant indexes sharing a value stay distinct nodes."""
+    pv = PresenceVariable("visitors", [])
+    first = ConstIndex("first", 2.0)
+    second = ConstIndex("second", 2.0)
+    capacity = Index("capacity", 10.0)
+    constraint = Constraint(usage=pv.node * first.node + pv.node * second.node, capacity=capacity, name="c")
+    model = AbstractModel("M", [], [pv], [first, second], [capacity], [constraint])
+
+    compiled = plan.build(model, optimize=False)
+    nodes = set(compiled.nodes)
+    assert first.node in nodes and second.node in nodes
+
+    state = executor.State({pv.node: np.array([1.0, 2.0]), second.node: np.array(3.0)})
+    compiled.evaluate(state)
+    assert np.array_equal(state.values[constraint.usage.node], np.array([5.0, 10.0]))
+    assert np.array_equal(state.values[first.node], np.array(2.0))
+
+
+def test_override_constant_index():
+    """Test that values provided for constant indexes override them in optimized plans."""
+    model, pv, factor, capacity = _make_model()
+    compiled = plan.build(model)
+    assert isinstance(compiled.mapping[factor.node], graph.placeholder)
+
+    inputs = {pv.node: np.array([1.0, 2.0]), capacity.node: np.array([11.0, 12.0])}
+    state = executor.State({**inputs, factor.node: np.array(3.0)})
+    compiled.evaluate(state)
+    assert np.array_equal(state.values[model.constraints[0].usage.node], np.array([3.0, 6.0]))
+    assert np.array_equal(state.values[factor.node], np.array(3.0))
+
+    state = executor.State(dict(inputs))
+    compiled.evaluate(state)
+    state.values[factor.node] = np.array(4.0)
+    assert compiled.update(state, [factor.node]) == (model.constraints[0].usage.node, factor.node)
+    assert np.array_equal(state.values[model.constraints[0].usage.node], np.array([4.0, 8.0]))
+
+
+def test_optimize_switch():
+    """Test that the optimize flag controls graph simplification and caching."""
+    pv = PresenceVariable("visitors", [])
+    per_vehicle = ConstIndex("per vehicle", 2.5)
+    rotation = ConstIndex("rotation", 1.02)
+    capacity = Index("capacity", 10.0)
+    constraint = Constraint(
+        usage=pv.node / (graph.constant(2.5) * 1.02) * per_vehicle.node, capacity=capacity, name="c"
+    )
+    model = AbstractModel("M", [], [pv], [per_vehicle, rotation], [capacity], [constraint])
+
+    optimized = plan.get(model)
+    plain = plan.get(model, optimize=False)
+    assert optimized is not plain
+    assert plan.get(model) is optimized
+    assert plan.get(model, optimize=False) is plain
+
+    def _operations(compiled: plan.Plan) -> int:
+        return sum(1 for node in compiled.nodes if not isinstance(node, (graph.constant, graph.placeholder)))
+
+    assert _operations(optimized) == 2
+    assert _operations(plain) == 3
+
+    values = []
+    for compiled in (optimized, plain):
+        state = executor.State({pv.node: np.array([1.0, 2.0])})
+        compiled.evaluate(state)
+        values.append(state.values[constraint.usage.node])
+    assert np.allclose(values[0], values[1])
+
+
+def test_lean_evaluation():
+    """Test that lean evaluation keeps only the outputs and the pinned nodes."""
+    pv = PresenceVariable("visitors", [])
+    factor = Index("factor", cast(Distribution, stats.uniform(loc=1.0, scale=1.0)))
+    capacity = Index("capacity", 10.0)
+    intermediate = graph.exp(pv.node)
+    constraint = Constraint(usage=intermediate * factor.node + pv.node, capacity=capacity, name="c")
+    model = AbstractModel("M", [], [pv], [factor], [capacity], [constraint])
+    compiled = plan.build(model)
+
+    inputs: dict[graph.Node, np.ndarray] = {pv.node: np.array([0.0, 1.0]), factor.node: np.array([2.0, 3.0])}
+    full = executor.State(dict(inputs))
+    compiled.evaluate(full)
+
+    lean = executor.State(dict(inputs))
+    compiled.evaluate(lean, lean=True)
+    assert set(lean.values.keys()) == set(compiled.outputs)
+    for output in compiled.outputs:
+        assert np.array_equal(lean.values[output], full.values[output])
+
+    pinned = executor.State(dict(inputs))
+    compiled.evaluate(pinned, lean=True, pinned=[intermediate, pv.node])
+    assert set(pinned.values.keys()) == set(compiled.outputs) | {intermediate, pv.node}
+
+
+def test_pinned_rewritten_nodes():
+    """Test that we keep the pinned nodes that the optimizations rewrite."""
+    pv = PresenceVariable("visitors", [])
+    factor = Index("factor", cast(Distribution, stats.uniform(loc=1.0, scale=1.0)))
+    capacity = Index("capacity", 10.0)
+    first, duplicate = graph.exp(pv.node), graph.exp(pv.node)
+    scaled = pv.node * 2.0 / 4.0
+    constraint = Constraint(usage=first * factor.node + duplicate * scaled, capacity=capacity, name="c")
+    model = AbstractModel("M", [], [pv], [factor], [capacity], [constraint])
+    compiled = plan.build(model, pinned=[duplicate, scaled])
+    assert compiled.mapping[duplicate] is compiled.mapping[first]
+    assert compiled.mapping[scaled] is not scaled
+
+    visitors = np.array([0.0, 1.0])
+    inputs: dict[graph.Node, np.ndarray] = {pv.node: visitors, factor.node: np.array([2.0, 3.0])}
+    for kwargs in ({"lean": True}, {"lean": True, "masked": True}, {"lean": True, "workers": 2}):
+        state = executor.State(dict(inputs))
+        compiled.evaluate(state, pinned=[duplicate, scaled], **kwargs)
+        assert np.array_equal(state.values[duplicate], np.exp(visitors))
+        assert np.array_equal(state.values[scaled], visitors * 0.5)
+        assert set(state.values.keys()) == set(compiled.outputs) | {duplicate, scaled}
+
+
+def test_masked_evaluation():
+    """Test that masked evaluation computes the same outputs without storing the private nodes."""
+    pv = PresenceVariable("visitors", [])
+    factor = Index("factor", cast(Distribution, stats.uniform(loc=1.0, scale=1.0)))
+    capacity = Index("capacity", 10.0)
+    expensive = graph.exp(pv.node) * factor.node
+    usage = graph.where(pv.node > 1.0, expensive, pv.node)
+    constraint = Constraint(usage=usage, capacity=capacity, name="c")
+    model = AbstractModel("M", [], [pv], [factor], [capacity], [constraint])
+    compiled = plan.build(model)
+
+    inputs: dict[graph.Node, np.ndarray] = {pv.node: np.array([0.0, 1.0, 2.0]), factor.node: np.array([2.0])}
+    full = executor.State(dict(inputs))
+    compiled.evaluate(full)
+
+    for lean in (False, True):
+        masked = executor.State(dict(inputs))
+        compiled.evaluate(masked, lean=lean, masked=True)
+        assert expensive not in masked.values
+        for output in compiled.outputs:
+            assert np.array_equal(masked.values[output], full.values[output])
+
+    pinned = executor.State(dict(inputs))
+    compiled.evaluate(pinned, masked=True, pinned=[expensive])
+    assert np.array_equal(pinned.values[expensive], full.values[expensive])
+
+
+def test_update():
+    """Test that updating the plan only re-evaluates the nodes depending on the changed nodes."""
+    pv = PresenceVariable("visitors", [])
+    factor = Index("factor", cast(Distribution, stats.uniform(loc=1.0, scale=1.0)))
+    other = Index("other", cast(Distribution, stats.uniform(loc=1.0, scale=1.0)))
+    capacity = Index("capacity", 10.0)
+    first = Constraint(usage=pv.node * factor.node + 1.0, capacity=capacity, name="first")
+    second = Constraint(usage=pv.node * other.node, capacity=capacity, name="second")
+    model = AbstractModel("M", [], [pv], [factor, other], [capacity], [first, second])
+
+    compiled = plan.build(model)
+    state = executor.State({pv.node: np.array([1.0, 2.0]), factor.node: np.array(2.0), other.node: np.array(3.0)})
+    compiled.evaluate(state)
+    unchanged = state.values[second.usage.node]
+
+    state.values[factor.node] = np.array(4.0)
+    updated = compiled.update(state, [factor.node])
+    assert {node.id for node in updated} == {first.usage.node.id, factor.node.id}
+    assert np.array_equal(state.values[first.usage.node], np.array([5.0, 9.0]))
+    assert state.values[second.usage.node] is unchanged
@@ -0,0 +1,49 @@
+"""Tests for the civic_digital_twins.dt_model.simulation.tiling module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+import numpy as np
+
+from civic_digital_twins.dt_model import Ensemble, Evaluation, InstantiatedModel
+from civic_digital_twins.dt_model.engine.numpybackend import blocks, precision
+from civic_digital_twins.dt_model.reference_models.molveno.overtourism import (
+    I_P_tourists_reduction_factor,
+    I_Xo_tourists_beach,
+    M_Base,
+    PV_excursionists,
+    PV_tourists,
+)
+
+
+def _evaluate(**kwargs) -> Evaluation:
+    model = InstantiatedModel(M_Base)
+    evaluation = Evaluation(model, list(Ensemble(model, {})), **kwargs)
+    np.random.seed(7)
+    evaluation.evaluate_grid({PV_tourists: np.linspace(0, 10000, 23), PV_excursionists: np.linspace(0, 10000, 23)})
+    return evaluation
+
+
+def test_tiles_match_single_process():
+    """Test that the stitched field is identical to the single-process field."""
+    expected = _evaluate()
+    assert expected.field is not None and expected.field_elements is not None
+
+    for kwargs in ({"processes": 2}, {"processes": 2, "tiles": 5}, {"processes": 3, "tiles": 100, "lean": True}):
+        got = _evaluate(**kwargs)
+        assert got.field is not None and got.field_elements is not None
+        assert np.array_equal(got.field, expected.field)
+        for constraint, element in expected.field_elements.items():
+            assert np.array_equal(got.field_elements[constraint], element)
+            assert got.field_elements[constraint].dtype == element.dtype
+
+        # The sampled values and the constant indexes are available
+        for index in (I_Xo_tourists_beach, I_P_tourists_reduction_factor):
+            assert np.array_equal(got.get_index_value(index), expected.get_index_value(index))
+
+
+def test_tiles_with_other_settings():
+    """Test that tiling composes with the precision policy and the row-block splitter."""
+    expected = _evaluate(precision=precision.FLOAT32)
+    got = _evaluate(precision=precision.FLOAT32, processes=2, blocks=blocks.Splitter(workers=2, threshold=0))
+    assert got.field is not None and expected.field is not None
+    assert np.array_equal(got.field, expected.field)
@@ -0,0 +1,102 @@
+"""Tests for civic_digital_twins.dt_model.symbols.index module."""
+
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import cast
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from civic_digital_twins.dt_model import LognormDistIndex, TriangDistIndex, UniformDistIndex
+from civic_digital_twins.dt_model.symbols.index import Distribution, _DistIndex, cdf, sample
+
+_DISTRIBUTIONS = [
+    stats.uniform(loc=10.0, scale=5.0),
+    stats.uniform(3.0),
+    stats.lognorm(s=0.5, loc=1.0, scale=100.0),
+    stats.lognorm(0.25),
+    stats.triang(c=0.3, loc=1.0, scale=4.0),
+    stats.triang(1.0, 2.0),
+    stats.triang(0.0),
+]
+
+
+@pytest.mark.parametrize("distribution", _DISTRIBUTIONS)
+def test_sample_matches_scipy(distribution):
+    """Test that sampling natively returns the values SciPy returns."""
+    np.random.seed(4)
+    expected = distribution.rvs(size=100)
+    np.random.seed(4)
+    got = sample(distribution, 100)
+    np.testing.assert_array_equal(got, expected)
+
+    expected = distribution.rvs(size=100, random_state=np.random.default_rng(4))
+    got = sample(distribution, 100, np.random.default_rng(4))
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_sample_fallback():
+    """Test that we sample other and invalid distributions using SciPy."""
+    distribution = cast(Distribution, stats.norm(loc=2.0, scale=1.0))
+    expected = distribution.rvs(size=10, random_state=np.random.default_rng(1))
+    np.testing.assert_array_equal(sample(distribution, 10, np.random.default_rng(1)), expected)
+
+    with pytest.raises(ValueError):
+        sample(cast(Distribution, stats.triang(c=2.0)), 10)
+
+    class Constant:
+        def rvs(self, size: int = 1, **kwargs):
+            return [1.0] * size
+
+    np.testing.assert_array_equal(sample(cast(Distribution, Constant()), 3), [1.0, 1.0, 1.0])
+
+
+@pytest.mark.parametrize("distribution", _DISTRIBUTIONS)
+def test_cdf_matches_scipy(distribution):
+    """Test that the closed-form cdf matches the SciPy cdf, including outside the support."""
+    low, high = distribution.support()
+    lower, upper = distribution.ppf([1e-9, 1 - 1e-9])
+    x = np.linspace(lower - 1.0, upper + 1.0, 10_000).reshape(100, 100)
+    x[0, :6] = [low, high, np.nan, np.inf, -np.inf, distribution.median()]
+    expected = distribution.cdf(x)
+    np.testing.assert_allclose(cdf(distribution, x), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(
+        cdf(distribution, x.astype(np.float32)), distribution.cdf(x.astype(np.float32)), atol=1e-12
+    )
+
+    out = np.empty_like(x)
+    assert cdf(distribution, x, out=out) is out
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-12)
+
+
+def test_cdf_fallback():
+    """Test that we compute the cdf of other and invalid distributions using SciPy."""
+    x = np.linspace(-3.0, 3.0, 7)
+    for distribution in (stats.norm(loc=0.5), stats.uniform(scale=-1.0), stats.lognorm(s=0.0)):
+        out = np.empty_like(x)
+        got = cdf(cast(Distribution, distribution), x, out=out)
+        assert got is out
+        np.testing.assert_array_equal(got, distribution.cdf(x))
+
+
+def test_lazy_freezing():
+    """Test that the distribution indexes freeze their distribution using the current parameters."""
+    index = UniformDistIndex("u", loc=1.0, scale=2.0)
+    index.loc, index.scale = 3.0, 4.0
+    assert index.value.kwds == {"loc": 3.0, "scale": 4.0}  # type: ignore
+    assert index.value is index.value
+
+    index = LognormDistIndex("l", loc=0.0, scale=1.0, s=0.5)
+    index.s = 0.75
+    assert index.value.kwds == {"loc": 0.0, "scale": 1.0, "s": 0.75}  # type: ignore
+
+    index = TriangDistIndex("t", loc=0.0, scale=1.0, c=0.5)
+    index.c = 0.25
+    assert index.value.kwds == {"loc": 0.0, "scale": 1.0, "c": 0.25}  # type: ignore
+
+
+def test_dist_index_is_abstract():
+    """Test that the distribution indexes must define how to freeze their distribution."""
+    with pytest.raises(TypeError, match="abstract"):
+        _DistIndex("x", None)  # type: ignore[abstract]